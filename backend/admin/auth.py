@@ -23,11 +23,15 @@ def validate_password_complexity(password):
 
 class Auth:
     def __init__(self, app=None):
-        self.USERS = get_users_collection()
         self.app = app
         if app:
             self.register_routes(app)
 
+    @property
+    def USERS(self):
+        # Looked up on each use, forked workers replace the Mongo client
+        return get_users_collection()
+
     def create_user(self, username, password, role):
         is_valid, message = validate_password_complexity(password)
         if not is_valid:
@@ -1,4 +1,7 @@
-from flask import redirect, session, url_for
+import copy
+import datetime
+
+from flask import g, redirect, session, url_for
 from flask_admin.contrib.pymongo import ModelView
 from flask_admin.contrib.pymongo.filters import (
     FilterEqual,
@@ -9,6 +12,8 @@ from flask_admin.contrib.pymongo.filters import (
 )
 from markupsafe import Markup
 
+from app.post_events import post_changed
+
 from .forms import PostForm
 
 
@@ -55,8 +60,10 @@ class PostView(ModelView):
     # Format the image display using a formatter function
     def _image_formatter(view, context, model, name):
         from markupsafe import escape
-        if model.get('content', {}).get('image'):
-            image_url = escape(model["content"]["image"])
+        content = model.get('content', {})
+        if content.get('image'):
+            # The thumbnail is a fraction of the size, use it when the post has one
+            image_url = escape(content.get('thumbnail') or content['image'])
             return Markup(
                 f'<img src="{image_url}" style="max-width: 100px; max-height: 100px;">'
             )
@@ -93,12 +100,24 @@ class PostView(ModelView):
             model['optional_tags'] = [tag_item.strip() for tag_item in model['optionalTags'].split(',') if tag_item.strip()]
             # Remove optionalTags after converting to snake_case
             del model['optionalTags']
+
+        # Store new posts in the same shape as the public API does
+        now = datetime.datetime.now(datetime.timezone.utc)
+        if is_created:
+            model['created_at'] = now
+            model.setdefault('optional_tags', [])
+        # Lets /api/posts/changes pick up admin edits and approvals
+        model['updated_at'] = now
         
         # Create content dictionary
+        previous_content = model.get('content') or {}
         model['content'] = {
             'description': form.content_description.data,
             'image': form.content_image.data if form.content_image.data else None
         }
+        # Keep the generated thumbnail while the image stays the same
+        if model['content']['image'] and model['content']['image'] == previous_content.get('image'):
+            model['content']['thumbnail'] = previous_content.get('thumbnail')
         
         # Create location dictionary
         model['location'] = {
@@ -115,6 +134,18 @@ class PostView(ModelView):
             if field in model:
                 del model[field]
 
+    def update_model(self, form, model):
+        # Keep the stored version so listeners can see what the edit changed
+        g.post_before = copy.deepcopy(model)
+        return super(PostView, self).update_model(form, model)
+
+    def after_model_change(self, form, model, is_created):
+        before = None if is_created else g.pop('post_before', None)
+        post_changed(before, model)
+
+    def after_model_delete(self, model):
+        post_changed(model, None)
+
     def on_form_prefill(self, form, id):
         model = self.get_one(id)
         
@@ -1,10 +1,6 @@
 import os
 
-from app.__init__ import create_app
-from app.posts_routes import posts_routes_blueprint
-
-app = create_app()
-app.register_blueprint(posts_routes_blueprint)
+from wsgi import app
 
 
 if __name__ == "__main__":
@@ -1,29 +1,67 @@
 # app/__init__.py
+import pymongo
 from flask import Flask
+from pymongo.errors import PyMongoError
 
 from admin.__init__ import init_admin
 from admin.auth import Auth
+from app.commands import register_commands
+from app.compression import init_compression
 from app.config import Config
-from app.extensions import cors, mongo
+from app.extensions import cors, mongo, mongo_client_options
+from app.image_jobs import start_image_workers
+from app.json_provider import init_json
+from repos.indexes import check_indexes, log_index_report, log_sync_report, sync_indexes
 
 #from app.routes import register_blueprints
 from swagger import init_swagger
 
 auth = []
 
+def prepare_indexes(app):
+    """Make sure the indexes used by the post queries exist and report the ones that don't.
+
+    Each step is bounded by STARTUP_INDEX_TIMEOUT so an unreachable or slow MongoDB
+    cannot hold up the worker's start; a failure is logged and the app starts anyway.
+    """
+    with app.app_context():
+        if app.config['SYNC_INDEXES_ON_STARTUP']:
+            try:
+                with pymongo.timeout(app.config['STARTUP_INDEX_TIMEOUT']):
+                    log_sync_report(sync_indexes())
+            except PyMongoError as e:
+                print(f"Could not sync indexes on startup: {e}")
+        try:
+            with pymongo.timeout(app.config['STARTUP_INDEX_TIMEOUT']):
+                log_index_report(check_indexes())
+        except PyMongoError as e:
+            print(f"Could not check indexes on startup: {e}")
+
 def create_app():
-    app = Flask(__name__, static_folder="static", static_url_path="/")
+    # The React build is served by the posts blueprint (app/assets.py), which negotiates precompressed files
+    app = Flask(__name__, static_folder=None)
     app.config.from_object(Config)
 
     # Initialize core extensions
-    mongo.init_app(app)
+    mongo.init_app(app, **mongo_client_options())
+    # After Flask-PyMongo, which installs its own (extended JSON) provider
+    init_json(app)
     cors.init_app(app)
     init_swagger(app)
+    init_compression(app)
 
     # Initialize app logic
     auth = Auth(app)
     init_admin(app)
 
+    prepare_indexes(app)
+
+    register_commands(app)
+
+    # Upload images of new posts in the background
+    if app.config['START_IMAGE_WORKERS']:
+        start_image_workers(app)
+
     # Register all routes
     #register_blueprints(app)
 
@@ -0,0 +1,107 @@
+import gzip
+import mimetypes
+import os
+import re
+import sys
+
+from flask import abort, request, send_file
+from werkzeug.security import safe_join
+
+from app.config import Config
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip siblings are still used without it
+    brotli = None
+
+# Vite names bundled files assets/<name>-<8 character hash>.<ext>, their URL changes with their content
+HASHED_ASSET = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+
+# Text formats worth precompressing, images and fonts are compressed already
+COMPRESSIBLE_EXTENSIONS = {'.js', '.mjs', '.css', '.html', '.json', '.geojson', '.svg', '.map', '.txt', '.xml', '.wasm'}
+MIN_COMPRESS_SIZE = 1024
+
+# Preferred first; (Accept-Encoding token, file suffix)
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def _pick_encoding(path):
+    """Return (encoding, path) of the best precompressed sibling the client accepts"""
+    accepted = request.accept_encodings
+    for encoding, suffix in ENCODINGS:
+        if accepted[encoding] and os.path.isfile(path + suffix):
+            return encoding, path + suffix
+    return None, path
+
+
+def send_asset(filename):
+    """Serve a file of the React build, preferring a precompressed .br/.gz sibling.
+
+    Content-hashed bundles are cached for a year as immutable, index.html only
+    briefly so new deploys are picked up, everything else for STATIC_MAX_AGE.
+    ETag/Last-Modified conditional requests are answered by send_file.
+    """
+    path = safe_join(Config.STATIC_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    encoding, served_path = _pick_encoding(path)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    if filename.endswith('.geojson'):
+        mimetype = 'application/geo+json'
+
+    if HASHED_ASSET.match(filename):
+        max_age, immutable = Config.STATIC_IMMUTABLE_MAX_AGE, True
+    elif filename == 'index.html':
+        max_age, immutable = Config.STATIC_INDEX_MAX_AGE, False
+    else:
+        max_age, immutable = Config.STATIC_MAX_AGE, False
+
+    response = send_file(served_path, mimetype=mimetype, conditional=True, etag=True, max_age=max_age)
+    if encoding:
+        response.content_encoding = encoding
+    # The body depends on Accept-Encoding whether or not this client got a compressed copy
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if immutable:
+        response.cache_control.immutable = True
+    elif max_age == 0:
+        response.cache_control.no_cache = True
+    return response
+
+
+def precompress(directory):
+    """Write .gz (and .br when Brotli is installed) siblings for the compressible files of a build.
+
+    A sibling is only kept if it is smaller than the original. Returns the
+    number of files written.
+    """
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            with open(path, 'rb') as source:
+                data = source.read()
+
+            variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(data, quality=11)))
+            for suffix, compressed in variants:
+                if len(compressed) < len(data):
+                    with open(path + suffix, 'wb') as target:
+                        target.write(compressed)
+                    written += 1
+    return written
+
+
+if __name__ == '__main__':
+    # Used by build.sh: python -m app.assets [directory]
+    target = sys.argv[1] if len(sys.argv) > 1 else Config.STATIC_DIR
+    if brotli is None:
+        print("Brotli is not installed, writing gzip siblings only")
+    print(f"Precompressed {precompress(target)} files in {target}")
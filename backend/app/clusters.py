@@ -0,0 +1,160 @@
+import math
+
+from app.cache import LRUCache
+from app.config import Config
+from app.geo import (
+    MAX_MERCATOR_LAT,
+    lat_to_tile_y,
+    lon_to_tile_x,
+    post_point,
+    tile_bounds,
+    tiles_containing,
+    within_bbox,
+)
+from app.post_events import on_post_change, on_posts_reset
+from repos.repos import get_posts_collection
+
+MAX_ZOOM = 22
+TAGS = ('Positive', 'Neutral', 'Negative')
+
+# Clusters of one map tile for one tag filter, keyed by (zoom, x, y, filter_key)
+cluster_cache = LRUCache(maxsize=Config.CLUSTER_CACHE_SIZE, ttl=Config.CLUSTER_CACHE_TTL)
+
+
+class TooManyTilesError(ValueError):
+    pass
+
+
+def filter_key(args):
+    """Normalize the tag and time filters of a request into a hashable cache key part"""
+    return (
+        args.get('tag'),
+        tuple(sorted(set(args.get('optionalTags') or []))),
+        args.get('date_from'),
+        args.get('date_to'),
+    )
+
+
+def _cell_expression(coordinate, cells):
+    """Aggregation expression numbering Web Mercator grid cells along one axis"""
+    if coordinate == 'lon':
+        fraction = {'$divide': [{'$add': ['$lon', 180]}, 360]}
+    else:
+        lat = {'$max': [{'$min': ['$lat', MAX_MERCATOR_LAT]}, -MAX_MERCATOR_LAT]}
+        mercator = {'$asinh': {'$tan': {'$degreesToRadians': lat}}}
+        fraction = {'$divide': [{'$subtract': [1, {'$divide': [mercator, math.pi]}]}, 2]}
+    cell = {'$floor': {'$multiply': [fraction, cells]}}
+    return {'$max': [{'$min': [cell, cells - 1]}, 0]}
+
+
+def _cluster_pipeline(query, zoom):
+    cells = (2 ** zoom) * Config.CLUSTER_GRID_SIZE
+    tag_counts = {
+        tag: {'$sum': {'$cond': [{'$eq': ['$tag', tag]}, 1, 0]}}
+        for tag in TAGS
+    }
+    return [
+        {'$match': query},
+        {'$project': {
+            'tag': 1,
+            'lon': {'$arrayElemAt': ['$location.coordinates', 0]},
+            'lat': {'$arrayElemAt': ['$location.coordinates', 1]},
+        }},
+        {'$match': {'lon': {'$type': 'number'}, 'lat': {'$type': 'number'}}},
+        {'$group': {
+            '_id': {'x': _cell_expression('lon', cells), 'y': _cell_expression('lat', cells)},
+            'count': {'$sum': 1},
+            'lon': {'$avg': '$lon'},
+            'lat': {'$avg': '$lat'},
+            **tag_counts,
+        }},
+    ]
+
+
+def _tile_range(bbox, zoom):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return (
+        lon_to_tile_x(min_lon, zoom), lat_to_tile_y(max_lat, zoom),
+        lon_to_tile_x(max_lon, zoom), lat_to_tile_y(min_lat, zoom),
+    )
+
+
+def _compute_tiles(query, zoom, min_x, min_y, max_x, max_y):
+    """Run one aggregation over a block of tiles and group the cells by tile"""
+    west, _, _, north = tile_bounds(zoom, min_x, min_y)
+    _, south, east, _ = tile_bounds(zoom, max_x, max_y)
+    match = dict(query, location=within_bbox((west, south, east, north)))
+
+    tiles = {
+        (x, y): []
+        for x in range(min_x, max_x + 1)
+        for y in range(min_y, max_y + 1)
+    }
+    grid = Config.CLUSTER_GRID_SIZE
+    POSTS = get_posts_collection()
+    for group in POSTS.aggregate(_cluster_pipeline(match, zoom)):
+        cell_x, cell_y = int(group['_id']['x']), int(group['_id']['y'])
+        tile = (cell_x // grid, cell_y // grid)
+        # Points right on the block edge can match the polygon but belong to a neighbour
+        if tile not in tiles:
+            continue
+        tiles[tile].append({
+            'id': f"{zoom}/{cell_x}/{cell_y}",
+            'coordinates': [group['lon'], group['lat']],
+            'count': group['count'],
+            'tags': {tag: group[tag] for tag in TAGS},
+        })
+    return tiles
+
+
+def get_clusters(query, args):
+    """Return the clusters covering the request's bbox, computing only uncached tiles.
+
+    ``query`` is the tag and time filter built by build_posts_query without a bbox.
+    """
+    zoom = args['zoom']
+    bbox = args.get('bbox') or (-180.0, -90.0, 180.0, 90.0)
+    min_x, min_y, max_x, max_y = _tile_range(bbox, zoom)
+    if (max_x - min_x + 1) * (max_y - min_y + 1) > Config.CLUSTER_MAX_TILES:
+        raise TooManyTilesError('bbox covers too many tiles for this zoom level')
+
+    key = filter_key(args)
+    clusters = []
+    missing = []
+    for x in range(min_x, max_x + 1):
+        for y in range(min_y, max_y + 1):
+            cached = cluster_cache.get((zoom, x, y, key))
+            if cached is None:
+                missing.append((x, y))
+            else:
+                clusters.extend(cached)
+
+    if missing:
+        # One aggregation over the smallest block of tiles holding every miss
+        block = (
+            min(x for x, _ in missing), min(y for _, y in missing),
+            max(x for x, _ in missing), max(y for _, y in missing),
+        )
+        computed = _compute_tiles(query, zoom, *block)
+        for (x, y), tile_clusters in computed.items():
+            cluster_cache.set((zoom, x, y, key), tile_clusters)
+            if (x, y) in missing:
+                clusters.extend(tile_clusters)
+
+    return clusters
+
+
+@on_post_change
+def evict_post_clusters(before, after):
+    """Drop the cached tiles holding the old or new position of a changed post"""
+    stale = set()
+    for point in (post_point(before), post_point(after)):
+        if point:
+            stale.update(tiles_containing(point, MAX_ZOOM))
+    if stale:
+        cluster_cache.evict(lambda key: key[:3] in stale)
+
+
+@on_posts_reset
+def clear_clusters():
+    cluster_cache.clear()
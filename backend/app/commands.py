@@ -0,0 +1,132 @@
+import sys
+import time
+
+import click
+from bson.objectid import ObjectId
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.config import Config
+from app.export import build_export_query, export_chunks, export_cursor
+from app.facets import reconcile_facets
+from app.image_jobs import drain_image_jobs
+from app.post_events import posts_reset
+from repos.indexes import check_indexes, log_index_report, log_sync_report, sync_indexes
+from repos.imports import import_posts, read_import_records
+from repos.migrations import normalize_posts
+from schemas.schema import EXPORT_FORMATS, POST_STATUSES
+
+indexes_cli = AppGroup('indexes', help='Manage the MongoDB indexes declared in repos.INDEXES.')
+posts_cli = AppGroup('posts', help='Maintenance jobs for the stories collection.')
+images_cli = AppGroup('images', help='Background image upload queue.')
+
+
+@indexes_cli.command('sync')
+def sync_indexes_command():
+    """Create any declared index that is missing, exit 1 if one conflicts with an existing index."""
+    synced = log_sync_report(sync_indexes())
+    if not log_index_report(check_indexes()) or not synced:
+        sys.exit(1)
+
+
+@indexes_cli.command('check')
+def check_indexes_command():
+    """Report missing, undeclared and unused indexes, exit 1 if any declared index is missing."""
+    if not log_index_report(check_indexes()):
+        sys.exit(1)
+    click.echo('All declared indexes exist')
+
+
+@posts_cli.command('normalize')
+@click.option('--batch-size', default=500, show_default=True, help='Stories per bulk_write.')
+@click.option('--start-after', default=None, help='Only normalize stories with a larger _id.')
+@click.option('--resume', is_flag=True, help='Continue after the last _id a previous run saved.')
+def normalize_posts_command(batch_size, start_after, resume):
+    """Rewrite legacy stories to the canonical created_at/optional_tags shape."""
+    if start_after is not None and not ObjectId.is_valid(start_after):
+        raise click.BadParameter('must be a post _id', param_hint='--start-after')
+
+    def report(scanned, modified, last_id):
+        click.echo(f"scanned {scanned}, modified {modified}, last _id {last_id}")
+
+    scanned, modified = normalize_posts(
+        batch_size=batch_size,
+        start_after=ObjectId(start_after) if start_after else None,
+        resume=resume,
+        on_batch=report
+    )
+    if modified:
+        # Cached listings and ETags still describe the old documents
+        posts_reset()
+    click.echo(f"Done: {scanned} legacy stories scanned, {modified} modified")
+
+
+@posts_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--batch-size', default=Config.IMPORT_BATCH_SIZE, show_default=True, help='Stories per insert_many.')
+@click.option('--status', type=click.Choice(POST_STATUSES), default='approved', show_default=True,
+              help='Status for records that do not set one.')
+def import_posts_command(source, batch_size, status):
+    """Import stories from NDJSON, a GeoJSON FeatureCollection or a JSON array ('-' reads stdin)."""
+    def report(received, inserted, failed):
+        click.echo(f"received {received}, inserted {inserted}, failed {failed}")
+
+    summary = import_posts(
+        read_import_records(source),
+        batch_size=batch_size,
+        default_status=status,
+        max_errors=Config.IMPORT_MAX_ERRORS,
+        on_batch=report
+    )
+    for error in summary['errors']:
+        click.echo(f"record {error['record']}: {error['errors']}", err=True)
+    if summary['inserted']:
+        posts_reset()
+    click.echo(f"Done: {summary['inserted']} of {summary['received']} stories imported")
+    if summary['failed']:
+        sys.exit(1)
+
+
+@posts_cli.command('export')
+@click.option('--format', 'export_format', type=click.Choice(list(EXPORT_FORMATS)), default='geojson', show_default=True)
+@click.option('--status', type=click.Choice(POST_STATUSES), default=None, help='Only stories with this status.')
+@click.option('--tag', type=click.Choice(['Positive', 'Neutral', 'Negative']), default=None)
+@click.option('--from', 'date_from', type=click.DateTime(), default=None, help='Only stories created at or after this time.')
+@click.option('--to', 'date_to', type=click.DateTime(), default=None, help='Only stories created before this time.')
+@click.option('--gzip', is_flag=True, help='Compress the output.')
+@click.option('-o', '--output', type=click.File('wb'), default='-', help='File to write, stdout by default.')
+def export_posts_command(export_format, status, tag, date_from, date_to, gzip, output):
+    """Stream stories to a GeoJSON, NDJSON or CSV file."""
+    cursor = export_cursor(build_export_query(status, tag, date_from, date_to))
+    try:
+        for chunk in export_chunks(cursor, export_format, current_app.json.dumps, gzip):
+            output.write(chunk if gzip else chunk.encode('utf-8'))
+    finally:
+        cursor.close()
+
+
+@posts_cli.command('reconcile-facets')
+def reconcile_facets_command():
+    """Recount the tag facet counters from the stories, e.g. from a cron job."""
+    counts = reconcile_facets()
+    for name, values in counts.items():
+        click.echo(f"{name}: {len(values)} values, {sum(values.values())} posts")
+
+
+@images_cli.command('work')
+@click.option('--once', is_flag=True, help='Exit when no job is due instead of polling.')
+def work_images_command(once):
+    """Upload queued images, for deployments running with IMAGE_WORKERS=0."""
+    while True:
+        processed = drain_image_jobs()
+        if processed:
+            click.echo(f"processed {processed} image jobs")
+        if once:
+            return
+        time.sleep(Config.IMAGE_JOB_POLL_INTERVAL)
+
+
+def register_commands(app):
+    app.cli.add_command(indexes_cli)
+    app.cli.add_command(posts_cli)
+    app.cli.add_command(images_cli)
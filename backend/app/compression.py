@@ -0,0 +1,102 @@
+import gzip
+import zlib
+
+from flask import request
+
+from app.config import Config
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, clients then get gzip
+    brotli = None
+
+# Only text formats shrink, images, archives and fonts are compressed already
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/geo+json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+}
+
+# Server-Sent Events must reach the client event by event, unbuffered; proxies and
+# EventSource implementations are not reliable with an encoded stream
+UNCOMPRESSED_MIMETYPES = {
+    'text/event-stream',
+}
+
+
+def _is_compressible(mimetype):
+    return bool(mimetype) and mimetype not in UNCOMPRESSED_MIMETYPES and (
+        mimetype in COMPRESSIBLE_MIMETYPES or mimetype.startswith('text/') or mimetype.endswith('+json')
+    )
+
+
+def _pick_encoding():
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=Config.COMPRESS_BR_QUALITY)
+    return gzip.compress(data, compresslevel=Config.COMPRESS_LEVEL)
+
+
+def _compress_stream(chunks, encoding):
+    """Compress a streamed body chunk by chunk, flushing so each chunk still reaches the client promptly"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=Config.COMPRESS_BR_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(Config.COMPRESS_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip framing
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(response):
+    """after_request hook gzip/brotli-encoding text responses the client accepts"""
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.direct_passthrough  # files from send_file, static assets come precompressed
+            or not _is_compressible(response.mimetype)):
+        return response
+
+    # Whatever this client gets, caches must key the body on Accept-Encoding
+    response.vary.add('Accept-Encoding')
+    encoding = _pick_encoding()
+    if not encoding:
+        return response
+
+    if response.is_streamed:
+        original = response.response
+        if hasattr(original, 'close'):
+            # Runs the generator's cleanup (e.g. closing a Mongo cursor) when the client goes away
+            response.call_on_close(original.close)
+        response.response = _compress_stream(response.iter_encoded(), encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < Config.COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(_compress(data, encoding))
+
+    response.content_encoding = encoding
+    # The compressed body is a different representation, a strong validator would be wrong
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
@@ -14,4 +14,111 @@ class Config:
     CDN_KEY = os.getenv('CDN_KEY')
     CDN_URL = os.getenv('CDN_API')
     CAPTCHA_URL = os.getenv('CAPTCHA_URL')
-    DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
\ No newline at end of file
+    DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+    # Create missing indexes from repos.INDEXES when the app starts (`flask indexes sync` does it on demand)
+    SYNC_INDEXES_ON_STARTUP = os.getenv('SYNC_INDEXES_ON_STARTUP', 'True').lower() == 'true'
+    # Seconds the startup sync and check may take each, large index builds belong to `flask indexes sync`
+    STARTUP_INDEX_TIMEOUT = float(os.getenv('STARTUP_INDEX_TIMEOUT', '5'))
+
+    # Keyset pagination of /api/posts
+    POSTS_PAGE_SIZE = int(os.getenv('POSTS_PAGE_SIZE', '500'))
+    POSTS_MAX_PAGE_SIZE = int(os.getenv('POSTS_MAX_PAGE_SIZE', '1000'))
+
+    # Cache of serialized /api/posts responses
+    POSTS_CACHE_SIZE = int(os.getenv('POSTS_CACHE_SIZE', '256'))
+    POSTS_CACHE_TTL = int(os.getenv('POSTS_CACHE_TTL', '300'))
+    # Seconds between reads of the shared posts change counter, which keys the caches and ETags
+    POSTS_VERSION_CHECK_INTERVAL = float(os.getenv('POSTS_VERSION_CHECK_INTERVAL', '1'))
+
+    # Streaming listings (NDJSON or stream=1)
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', '500'))  # Documents per Mongo round trip
+    STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', '16384'))  # Characters per write to the client
+
+    # Server-side clustering (/api/posts/clusters)
+    CLUSTER_GRID_SIZE = int(os.getenv('CLUSTER_GRID_SIZE', '4'))  # Cells per tile side
+    CLUSTER_MAX_TILES = int(os.getenv('CLUSTER_MAX_TILES', '64'))
+    CLUSTER_CACHE_SIZE = int(os.getenv('CLUSTER_CACHE_SIZE', '4096'))
+    CLUSTER_CACHE_TTL = int(os.getenv('CLUSTER_CACHE_TTL', '300'))
+
+    # Story point tiles (/api/tiles/<z>/<x>/<y>)
+    TILE_CACHE_SIZE = int(os.getenv('TILE_CACHE_SIZE', '2048'))
+    TILE_CACHE_TTL = int(os.getenv('TILE_CACHE_TTL', '60'))  # Seconds, bounds staleness in workers that did not see a write
+    TILE_MAX_AGE = int(os.getenv('TILE_MAX_AGE', '60'))  # Browser/CDN cache lifetime in seconds
+
+
+    # Background image uploads (app/image_jobs.py)
+    IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', '2'))  # Upload threads per process, 0 to run `flask images work` instead
+    # gunicorn.conf.py turns this off and starts the threads in each worker after the fork instead of in create_app
+    START_IMAGE_WORKERS = os.getenv('START_IMAGE_WORKERS', 'true').lower() == 'true'
+    IMAGE_JOB_MAX_ATTEMPTS = int(os.getenv('IMAGE_JOB_MAX_ATTEMPTS', '5'))
+    IMAGE_JOB_BACKOFF = float(os.getenv('IMAGE_JOB_BACKOFF', '5'))  # Seconds before the first retry, doubled after each failure
+    IMAGE_JOB_LEASE = float(os.getenv('IMAGE_JOB_LEASE', '300'))  # Seconds before a job claimed by a dead worker is retried
+    IMAGE_JOB_POLL_INTERVAL = float(os.getenv('IMAGE_JOB_POLL_INTERVAL', '2'))
+    # 'imgbb' uploads to CDN_API, 'local' keeps images under static/uploads for development
+    IMAGE_UPLOADER = os.getenv('IMAGE_UPLOADER', 'imgbb')
+
+    # Outbound HTTP to hCaptcha and ImgBB (app/http_client.py)
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))
+    HTTP_UPLOAD_READ_TIMEOUT = float(os.getenv('HTTP_UPLOAD_READ_TIMEOUT', '60'))  # Image uploads send up to 5MB
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '2'))  # Connection attempts retried, never a request that was sent
+    HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', '0.3'))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))  # Keep-alive connections per upstream host
+
+    # Upload-time image processing (app/image_processing.py)
+    IMAGE_MAX_DIMENSION = int(os.getenv('IMAGE_MAX_DIMENSION', '1600'))
+    IMAGE_THUMBNAIL_SIZE = int(os.getenv('IMAGE_THUMBNAIL_SIZE', '320'))
+    IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', '80'))
+    IMAGE_FORMAT = os.getenv('IMAGE_FORMAT', 'WEBP')  # WEBP or JPEG, JPEG is used if Pillow lacks WebP support
+
+    # Bulk story import (POST /api/posts/bulk, flask posts import)
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '1000'))  # Documents per insert_many
+    IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', '1000'))  # Per-record errors kept in the report
+
+    # React build served by app/assets.py, precompressed by build.sh
+    STATIC_DIR = os.getenv('STATIC_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+    STATIC_IMMUTABLE_MAX_AGE = int(os.getenv('STATIC_IMMUTABLE_MAX_AGE', str(365 * 24 * 3600)))  # Content-hashed assets/ bundles
+    STATIC_INDEX_MAX_AGE = int(os.getenv('STATIC_INDEX_MAX_AGE', '60'))  # index.html, points at the current bundles
+    STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', '3600'))  # Unhashed files such as canada.geojson
+
+    # Dynamic gzip/brotli compression of text responses (app/compression.py)
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))  # Bytes, smaller bodies are sent as is
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))  # gzip 1-9
+    COMPRESS_BR_QUALITY = int(os.getenv('COMPRESS_BR_QUALITY', '4'))  # brotli 0-11, higher costs far more CPU
+
+    # 'auto' uses orjson when it is installed, 'stdlib' forces the json module (app/json_provider.py)
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+
+    # Full-text search (/api/posts/search)
+    SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '20'))
+    SEARCH_MAX_QUERY_LENGTH = int(os.getenv('SEARCH_MAX_QUERY_LENGTH', '200'))
+
+    # Seconds between $group reconciles of the materialized facet counters (app/facets.py)
+    FACETS_RECONCILE_INTERVAL = int(os.getenv('FACETS_RECONCILE_INTERVAL', '3600'))
+
+    # Closed timeline buckets per filter (/api/posts/timeline), only the open bucket is recounted
+    TIMELINE_CACHE_SIZE = int(os.getenv('TIMELINE_CACHE_SIZE', '256'))
+    # Eviction on writes only reaches the worker that made them, like POSTS_CACHE_TTL this bounds the others
+    TIMELINE_CACHE_TTL = int(os.getenv('TIMELINE_CACHE_TTL', '300'))
+
+    # Delta sync (/api/posts/changes, app/sync.py)
+    SYNC_TOMBSTONE_TTL = int(os.getenv('SYNC_TOMBSTONE_TTL', str(30 * 24 * 3600)))  # Seconds deletions are remembered, older tokens get a full reload
+    SYNC_OVERLAP = int(os.getenv('SYNC_OVERLAP', '5'))  # Seconds re-read before the token, covers clock skew between workers
+    SYNC_MAX_CHANGES = int(os.getenv('SYNC_MAX_CHANGES', '1000'))  # Larger deltas ask the client to reload instead
+
+    # Live map updates over Server-Sent Events (/api/posts/stream, app/live.py)
+    LIVE_SOURCE = os.getenv('LIVE_SOURCE', 'auto')  # 'auto' uses change streams on a replica set and polls otherwise, or 'change_stream'/'poll'
+    LIVE_POLL_INTERVAL = int(os.getenv('LIVE_POLL_INTERVAL', '2'))  # Seconds between updated_at polls, and change stream waits
+    LIVE_HEARTBEAT = int(os.getenv('LIVE_HEARTBEAT', '15'))  # Seconds of silence before a keepalive comment
+    # Connected clients per process, more get a 503 and poll /api/posts/changes instead; each one holds a
+    # server thread or greenlet, so gunicorn.conf.py derives it from the threads per worker (0 turns streams off)
+    LIVE_MAX_CLIENTS = int(os.getenv('LIVE_MAX_CLIENTS', '500'))
+    LIVE_QUEUE_SIZE = int(os.getenv('LIVE_QUEUE_SIZE', '256'))  # Pending event batches per client before it is disconnected
+    LIVE_MAX_DURATION = int(os.getenv('LIVE_MAX_DURATION', '300'))  # Seconds before a stream ends and the client reconnects
+    LIVE_RETRY_MS = int(os.getenv('LIVE_RETRY_MS', '3000'))  # Reconnect delay suggested to EventSource
+
+    # Mongo connection pool per process (gunicorn.conf.py sizes it from the worker threads)
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '100'))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '0'))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '300000'))  # Close connections idle this long
+    READY_TIMEOUT = float(os.getenv('READY_TIMEOUT', '2'))  # Seconds /api/health/ready waits for Mongo
@@ -0,0 +1,146 @@
+import csv
+import datetime
+import io
+import zlib
+
+from flask import current_app, stream_with_context
+from pymongo import ASCENDING
+
+from app.config import Config
+from app.projection import build_projection
+from app.streaming import join_chunks
+from app.timeline import created_at_range
+from repos.repos import get_posts_collection
+
+# Mimetype and file extension of each of schemas.schema.EXPORT_FORMATS
+EXPORT_TYPES = {
+    'geojson': ('application/geo+json', '.geojson'),
+    'ndjson': ('application/x-ndjson', '.ndjson'),
+    'csv': ('text/csv', '.csv'),
+}
+
+CSV_COLUMNS = ['_id', 'title', 'description', 'image', 'thumbnail', 'tag', 'optionalTags',
+               'status', 'createdAt', 'longitude', 'latitude']
+# A cell starting with one of these is run as a formula by Excel and Sheets
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def build_export_query(status=None, tag=None, date_from=None, date_to=None):
+    """Build the Mongo filter for an export, every story if no filter is given"""
+    query = {}
+    if status:
+        query['status'] = status
+    if tag:
+        query['tag'] = tag
+    created_at = created_at_range(date_from, date_to)
+    if created_at:
+        query['created_at'] = created_at
+    return query
+
+
+def export_cursor(query):
+    """Return a batched cursor over the matching stories in the API response shape.
+
+    Sorting by _id walks the primary index, so no blocking in-memory sort is
+    needed however many stories match.
+    """
+    POSTS = get_posts_collection()
+    return (
+        POSTS.find(query, build_projection())
+        .sort('_id', ASCENDING)
+        .batch_size(Config.STREAM_BATCH_SIZE)
+    )
+
+
+def _geojson_pieces(posts, dumps):
+    yield '{"type":"FeatureCollection","features":['
+    for index, post in enumerate(posts):
+        location = post.pop('location', None)
+        feature = dumps({'type': 'Feature', 'geometry': location, 'properties': post})
+        yield feature if index == 0 else ',' + feature
+    yield ']}'
+
+
+def _ndjson_pieces(posts, dumps):
+    for post in posts:
+        yield dumps(post) + '\n'
+
+
+def csv_text(value):
+    """Quote user text so a spreadsheet shows it instead of evaluating it"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_pieces(posts, dumps):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def row(values):
+        writer.writerow(values)
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    yield row(CSV_COLUMNS)
+    for post in posts:
+        content = post.get('content') or {}
+        coordinates = (post.get('location') or {}).get('coordinates') or [None, None]
+        yield row([
+            post.get('_id'),
+            csv_text(post.get('title')),
+            csv_text(content.get('description')),
+            csv_text(content.get('image')),
+            csv_text(content.get('thumbnail')),
+            csv_text(post.get('tag')),
+            csv_text(';'.join(post.get('optionalTags') or [])),
+            post.get('status'),
+            post.get('createdAt'),
+            coordinates[0],
+            coordinates[1] if len(coordinates) > 1 else None,
+        ])
+
+
+_WRITERS = {
+    'geojson': _geojson_pieces,
+    'ndjson': _ndjson_pieces,
+    'csv': _csv_pieces,
+}
+
+
+def gzip_chunks(chunks):
+    """Compress a stream of text chunks into gzip member bytes, chunk by chunk"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(cursor, export_format, dumps, gzip=False):
+    """Yield the serialized export of a cursor in STREAM_CHUNK_SIZE pieces, gzip bytes if asked"""
+    chunks = join_chunks(_WRITERS[export_format](cursor, dumps))
+    return gzip_chunks(chunks) if gzip else chunks
+
+
+def export_filename(export_format, gzip=False):
+    """Return the download name of an export, e.g. stories-20240131.geojson.gz"""
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d')
+    return f"stories-{stamp}{EXPORT_TYPES[export_format][1]}{'.gz' if gzip else ''}"
+
+
+def export_response(cursor, export_format, gzip=False):
+    """Stream an export as a file download while walking the cursor"""
+    def generate():
+        try:
+            yield from export_chunks(cursor, export_format, current_app.json.dumps, gzip)
+        finally:
+            cursor.close()
+
+    mimetype = 'application/gzip' if gzip else EXPORT_TYPES[export_format][0]
+    response = current_app.response_class(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{export_filename(export_format, gzip)}"'
+    return response
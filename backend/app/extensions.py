@@ -1,6 +1,9 @@
 from flask_admin import Admin
 from flask_cors import CORS
 from flask_pymongo import PyMongo
+from pymongo import MongoClient
+
+from app.config import Config
 
 mongo = PyMongo()
 admin = Admin(
@@ -8,4 +11,30 @@ admin = Admin(
         template_mode='bootstrap4',
         base_template='admin/master.html',
     )
-cors = CORS()
\ No newline at end of file
+cors = CORS()
+
+
+def mongo_client_options():
+    """MongoClient keyword arguments from the pool settings"""
+    return {
+        'maxPoolSize': Config.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': Config.MONGO_MIN_POOL_SIZE,
+        'maxIdleTimeMS': Config.MONGO_MAX_IDLE_TIME_MS,
+        # Lazy, so a client built before a fork opens no sockets or monitor threads
+        'connect': False,
+    }
+
+
+def reconnect_mongo(app):
+    """Give a forked worker its own MongoClient and re-point the handles taken from the parent's.
+
+    MongoClient is not fork-safe: the copy inherited from the gunicorn master
+    must not be used, nor closed, in the child.
+    """
+    database_name = mongo.db.name if mongo.db is not None else None
+    mongo.cx = MongoClient(app.config['MONGO_URI'], **mongo_client_options())
+    mongo.db = mongo.cx[database_name] if database_name else None
+    # Flask-Admin's pymongo views keep the collection they were created with
+    for view in admin._views:
+        if getattr(view, 'coll', None) is not None:
+            view.coll = mongo.db[view.coll.name]
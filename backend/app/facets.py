@@ -0,0 +1,158 @@
+import datetime
+import threading
+import time
+from collections import Counter
+
+from flask import current_app
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.config import Config
+from app.post_events import on_post_change, on_posts_reset
+from repos.repos import get_facets_collection, get_meta_collection, get_posts_collection
+
+# Facet fields: response name -> stored field
+FACET_FIELDS = {'tag': 'tag', 'optionalTags': 'optional_tags'}
+RECONCILE_PROGRESS_ID = 'facets_reconciled'
+
+
+def _contributions(post):
+    """Counter of the (field, value) pairs an approved story adds to the global counts"""
+    counts = Counter()
+    if not post or post.get('status') != 'approved':
+        return counts
+    if post.get('tag'):
+        counts[('tag', post['tag'])] += 1
+    optional_tags = post.get('optional_tags')
+    if isinstance(optional_tags, list):
+        for value in set(optional_tags):
+            counts[('optional_tags', value)] += 1
+    return counts
+
+
+@on_post_change
+def update_facet_counts(before, after):
+    """$inc the counters by what the change added and removed"""
+    delta = Counter(_contributions(after))
+    delta.subtract(_contributions(before))
+    operations = [
+        UpdateOne({'_id': f'{field}:{value}'}, {'$inc': {'count': change}, '$set': {'field': field, 'value': value}}, upsert=True)
+        for (field, value), change in delta.items() if change
+    ]
+    if operations:
+        get_facets_collection().bulk_write(operations, ordered=False)
+
+
+@on_posts_reset
+def reconcile_after_reset():
+    reconcile_facets()
+
+
+def count_facets(query):
+    """Count approved stories matching ``query`` per tag and optional tag in one $facet aggregation"""
+    pipeline = [
+        {'$match': query},
+        {'$facet': {
+            'tag': [{'$group': {'_id': '$tag', 'count': {'$sum': 1}}}],
+            'optional_tags': [
+                # setUnion drops tags listed twice on one story
+                {'$project': {'value': {'$setUnion': [{'$ifNull': ['$optional_tags', []]}, []]}}},
+                {'$unwind': '$value'},
+                {'$group': {'_id': '$value', 'count': {'$sum': 1}}},
+            ],
+        }},
+    ]
+    result = next(get_posts_collection().aggregate(pipeline), {})
+    return {
+        name: {row['_id']: row['count'] for row in result.get(field, []) if row['_id'] is not None}
+        for name, field in FACET_FIELDS.items()
+    }
+
+
+def reconcile_facets():
+    """Recompute the global counters from the stories and overwrite drifted ones.
+
+    Increments landing while the aggregation runs can be overwritten; the next
+    reconcile puts them back, so the counters drift by at most one interval.
+    """
+    counts = count_facets({'status': 'approved'})
+    FACETS = get_facets_collection()
+    operations = []
+    expected = set()
+    for name, field in FACET_FIELDS.items():
+        for value, count in counts[name].items():
+            expected.add(f'{field}:{value}')
+            operations.append(UpdateOne(
+                {'_id': f'{field}:{value}'},
+                {'$set': {'field': field, 'value': value, 'count': count}},
+                upsert=True
+            ))
+    if operations:
+        FACETS.bulk_write(operations, ordered=False)
+    FACETS.delete_many({'_id': {'$nin': list(expected)}})
+
+    get_meta_collection().update_one(
+        {'_id': RECONCILE_PROGRESS_ID},
+        {'$set': {'at': datetime.datetime.now(datetime.timezone.utc)}},
+        upsert=True
+    )
+    return counts
+
+
+def _claim_reconcile():
+    """Return True for the one worker that gets to run an overdue reconcile"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cutoff = now - datetime.timedelta(seconds=Config.FACETS_RECONCILE_INTERVAL)
+    try:
+        result = get_meta_collection().update_one(
+            {'_id': RECONCILE_PROGRESS_ID, '$or': [{'at': {'$lt': cutoff}}, {'at': {'$exists': False}}]},
+            {'$set': {'at': now}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The document exists with a recent time: reconciled lately, or another worker is on it
+        return False
+    return bool(result.modified_count or result.upserted_id)
+
+
+# monotonic() time before which this worker does not look at the last reconcile again
+_next_check = 0.0
+
+
+def _reconcile_due():
+    """Read-only check of the last reconcile time, at most once per interval per worker"""
+    global _next_check
+    if time.monotonic() < _next_check:
+        return False
+    progress = get_meta_collection().find_one({'_id': RECONCILE_PROGRESS_ID}, {'at': 1}) or {}
+    last = progress.get('at')
+    if last is not None and last.tzinfo is None:
+        last = last.replace(tzinfo=datetime.timezone.utc)
+    age = None if last is None else (datetime.datetime.now(datetime.timezone.utc) - last).total_seconds()
+    if age is not None and age < Config.FACETS_RECONCILE_INTERVAL:
+        _next_check = time.monotonic() + Config.FACETS_RECONCILE_INTERVAL - age
+        return False
+    _next_check = time.monotonic() + Config.FACETS_RECONCILE_INTERVAL
+    return True
+
+
+def _reconcile_in_background(app):
+    def run():
+        with app.app_context():
+            try:
+                reconcile_facets()
+            except Exception as e:
+                print(f"Facet reconcile failed: {e}")
+
+    threading.Thread(target=run, name='facets-reconcile', daemon=True).start()
+
+
+def get_global_facets():
+    """Return the materialized counts; an overdue reconcile runs in the background, not on the request"""
+    if _reconcile_due() and _claim_reconcile():
+        _reconcile_in_background(current_app._get_current_object())
+    facets = {name: {} for name in FACET_FIELDS}
+    names = {field: name for name, field in FACET_FIELDS.items()}
+    for counter in get_facets_collection().find({'count': {'$gt': 0}}):
+        facets[names[counter['field']]][counter['value']] = counter['count']
+    return facets
@@ -0,0 +1,118 @@
+import math
+
+# Web Mercator cannot represent the poles, tiles stop at this latitude
+MAX_MERCATOR_LAT = 85.0511287798
+
+# Longest latitude edge (in degrees) before we add intermediate vertices.
+# MongoDB treats polygon edges as geodesics, so a long east-west edge would
+# bow towards the pole instead of following the parallel the user sees.
+MAX_EDGE_DEGREES = 5.0
+
+
+def lon_to_tile_x(lon, zoom):
+    """Return the Web Mercator tile column containing a longitude"""
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    return min(max(x, 0), n - 1)
+
+
+def lat_to_tile_y(lat, zoom):
+    """Return the Web Mercator tile row containing a latitude"""
+    n = 2 ** zoom
+    lat = min(max(lat, -MAX_MERCATOR_LAT), MAX_MERCATOR_LAT)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(y, 0), n - 1)
+
+
+def tile_x_to_lon(x, zoom):
+    """Return the western longitude of a tile column"""
+    return x / (2 ** zoom) * 360.0 - 180.0
+
+
+def tile_y_to_lat(y, zoom):
+    """Return the northern latitude of a tile row"""
+    n = math.pi - 2.0 * math.pi * y / (2 ** zoom)
+    return math.degrees(math.atan(math.sinh(n)))
+
+
+def tile_bounds(zoom, x, y):
+    """Return the (minLon, minLat, maxLon, maxLat) box covered by a tile"""
+    return (
+        tile_x_to_lon(x, zoom),
+        tile_y_to_lat(y + 1, zoom),
+        tile_x_to_lon(x + 1, zoom),
+        tile_y_to_lat(y, zoom),
+    )
+
+
+def snap_bbox(bbox, zoom):
+    """Grow a bounding box outwards to the tile grid of a zoom level.
+
+    Small pans at the same zoom then resolve to the same box, which keeps the
+    set of distinct viewport queries (and cache keys) small.
+    """
+    min_lon, min_lat, max_lon, max_lat = bbox
+    min_x, max_x = lon_to_tile_x(min_lon, zoom), lon_to_tile_x(max_lon, zoom)
+    min_y, max_y = lat_to_tile_y(max_lat, zoom), lat_to_tile_y(min_lat, zoom)
+    snapped_min_lat = tile_y_to_lat(max_y + 1, zoom)
+    snapped_max_lat = tile_y_to_lat(min_y, zoom)
+    # Keep boxes that reach past the Mercator limit open to the poles
+    if min_lat <= -MAX_MERCATOR_LAT:
+        snapped_min_lat = min_lat
+    if max_lat >= MAX_MERCATOR_LAT:
+        snapped_max_lat = max_lat
+    return (
+        tile_x_to_lon(min_x, zoom),
+        snapped_min_lat,
+        tile_x_to_lon(max_x + 1, zoom),
+        snapped_max_lat,
+    )
+
+
+def _densify(start, end):
+    steps = max(1, int(math.ceil(abs(end - start) / MAX_EDGE_DEGREES)))
+    return [start + (end - start) * i / steps for i in range(steps)]
+
+
+def bbox_to_polygon(bbox):
+    """Build a counter-clockwise GeoJSON Polygon for a bounding box"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    ring = []
+    ring += [[lon, min_lat] for lon in _densify(min_lon, max_lon)]
+    ring += [[max_lon, lat] for lat in _densify(min_lat, max_lat)]
+    ring += [[lon, max_lat] for lon in _densify(max_lon, min_lon)]
+    ring += [[min_lon, lat] for lat in _densify(max_lat, min_lat)]
+    ring.append(ring[0])
+    return {
+        'type': 'Polygon',
+        'coordinates': [ring],
+        # Strict winding lets MongoDB accept boxes larger than a hemisphere
+        'crs': {
+            'type': 'name',
+            'properties': {'name': 'urn:x-mongodb:crs:strictwinding:EPSG:4326'},
+        },
+    }
+
+
+def within_bbox(bbox):
+    """Return a $geoWithin filter for the GeoJSON location field"""
+    return {'$geoWithin': {'$geometry': bbox_to_polygon(bbox)}}
+
+
+def post_point(post):
+    """Return (lon, lat) of a story document, or None if it has no usable location"""
+    if not post:
+        return None
+    try:
+        lon, lat = post['location']['coordinates'][:2]
+        return float(lon), float(lat)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def tiles_containing(point, max_zoom):
+    """Yield (zoom, x, y) for the tile containing a point at every zoom up to max_zoom"""
+    lon, lat = point
+    for zoom in range(max_zoom + 1):
+        yield zoom, lon_to_tile_x(lon, zoom), lat_to_tile_y(lat, zoom)
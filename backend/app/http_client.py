@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.config import Config
+
+# One pooled, keep-alive session per worker process. A session created before a
+# fork would share its sockets with the child, so a new one is built per pid.
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _build_session():
+    # Both upstream calls are POSTs that are not idempotent: a 5xx or a read error
+    # may come after ImgBB stored the image or hCaptcha spent the token. Only
+    # connection failures, where nothing reached the server, are retried.
+    retry = Retry(
+        total=Config.HTTP_RETRIES,
+        connect=Config.HTTP_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=Config.HTTP_RETRY_BACKOFF,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=Config.HTTP_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                _session = _build_session()
+                _session_pid = os.getpid()
+    return _session
+
+
+def _record(upstream, seconds, failed):
+    with _metrics_lock:
+        stats = _metrics.setdefault(upstream, {'requests': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        stats['requests'] += 1
+        stats['errors'] += int(failed)
+        stats['total_ms'] += seconds * 1000
+        stats['max_ms'] = max(stats['max_ms'], seconds * 1000)
+
+
+def post(upstream, url, read_timeout=None, **kwargs):
+    """POST through the shared session with Config timeouts, recording latency under ``upstream``"""
+    kwargs.setdefault('timeout', (Config.HTTP_CONNECT_TIMEOUT, read_timeout or Config.HTTP_READ_TIMEOUT))
+    started = time.perf_counter()
+    failed = True
+    try:
+        response = get_session().post(url, **kwargs)
+        failed = response.status_code >= 500
+        return response
+    finally:
+        _record(upstream, time.perf_counter() - started, failed)
+
+
+def get_upstream_metrics():
+    """Return per-upstream request count, errors and latency for this worker process"""
+    with _metrics_lock:
+        return {
+            upstream: dict(stats, avg_ms=stats['total_ms'] / stats['requests'] if stats['requests'] else 0.0)
+            for upstream, stats in _metrics.items()
+        }
+
+
+def verify_captcha(token):
+    """Check an hCaptcha token against Config.CAPTCHA_URL and return the verification result"""
+    try:
+        response = post('hcaptcha', Config.CAPTCHA_URL, data={
+            'secret': Config.CAPTCHA_SECRET_KEY,
+            'response': token
+        })
+        return response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"CAPTCHA verification request failed: {e}")
+        return {'success': False, 'error-codes': ['verification-unavailable']}
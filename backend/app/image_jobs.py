@@ -0,0 +1,196 @@
+import datetime
+import io
+import os
+import threading
+
+from bson.binary import Binary
+from pymongo import ASCENDING, ReturnDocument
+
+from app.config import Config
+from app.image_processing import hash_image, process_image
+from app.images import find_uploaded_image, get_uploader, named_bytes, remember_uploaded_image
+from app.post_events import post_changed
+from repos.repos import get_image_jobs_collection, get_posts_collection
+
+# Image jobs live in the image_jobs collection so any worker process can pick them up:
+#   queued -> running -> (done, job deleted) | queued again with backoff | failed
+# The uploaded bytes are stored on the job itself (uploads are capped at 5MB, far below
+# the 16MB document limit), so a worker on another host or after a restart can run it.
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def enqueue_image_job(post_id, data, digest=None):
+    """Queue the uploaded image bytes ``data`` for upload and attachment to a post"""
+    JOBS = get_image_jobs_collection()
+    JOBS.insert_one({
+        'post_id': post_id,
+        'data': Binary(data),
+        'hash': digest,
+        'status': 'queued',
+        'attempts': 0,
+        'next_attempt_at': _now(),
+        'created_at': _now(),
+    })
+
+
+def claim_image_job():
+    """Atomically take the oldest due job, including ones whose worker died mid-upload"""
+    now = _now()
+    JOBS = get_image_jobs_collection()
+    return JOBS.find_one_and_update(
+        {'$or': [
+            {'status': 'queued', 'next_attempt_at': {'$lte': now}},
+            {'status': 'running', 'lease_until': {'$lt': now}},
+        ]},
+        {
+            '$set': {'status': 'running', 'lease_until': now + datetime.timedelta(seconds=Config.IMAGE_JOB_LEASE)},
+            '$inc': {'attempts': 1},
+        },
+        sort=[('next_attempt_at', ASCENDING)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def _update_post(post_id, changes):
+    # Synced clients pick the new image up through updated_at
+    changes = dict(changes, updated_at=_now())
+    POSTS = get_posts_collection()
+    before = POSTS.find_one_and_update({'_id': post_id}, {'$set': changes}, return_document=ReturnDocument.BEFORE)
+    if before is not None:
+        after = dict(before, content=dict(before.get('content') or {}))
+        for key, value in changes.items():
+            if key.startswith('content.'):
+                after['content'][key.split('.', 1)[1]] = value
+            else:
+                after[key] = value
+        post_changed(before, after)
+
+
+def _discard(job):
+    get_image_jobs_collection().delete_one({'_id': job['_id']})
+
+
+def _upload_processed(job, upload):
+    """Process the job's image and upload it with its thumbnail, return the two URLs"""
+    data = job.get('data')
+    if data is None:
+        raise ValueError('The job holds no image data')
+    data = bytes(data)
+    digest = job.get('hash') or hash_image(io.BytesIO(data))
+
+    # Another job may have uploaded the same content since this one was queued
+    existing = find_uploaded_image(digest)
+    if existing:
+        return existing['image'], existing.get('thumbnail')
+
+    processed = process_image(data)
+    image_url = upload(named_bytes(processed.image, f"{digest}{processed.extension}"))
+    if not image_url:
+        return None, None
+    # A missing thumbnail is not worth another upload round, clients fall back to the image
+    thumbnail_url = upload(named_bytes(processed.thumbnail, f"{digest}-thumb{processed.extension}"))
+    remember_uploaded_image(digest, image_url, thumbnail_url)
+    return image_url, thumbnail_url
+
+
+def run_image_job(job, upload=None):
+    """Upload a claimed job's image and attach it to the post, or schedule a retry"""
+    upload = upload or get_uploader()
+    url = thumbnail_url = None
+    error = 'Image uploads are not configured'
+    retryable = True
+    if upload is not None:
+        try:
+            url, thumbnail_url = _upload_processed(job, upload)
+            error = 'Upload returned no URL'
+        except ValueError as e:
+            # Not an image, retrying will not help
+            error = str(e)
+            retryable = False
+        except OSError as e:
+            error = str(e)
+
+    if url:
+        _update_post(job['post_id'], {
+            'content.image': url,
+            'content.thumbnail': thumbnail_url,
+            'image_status': 'ready',
+        })
+        _discard(job)
+        return True
+
+    JOBS = get_image_jobs_collection()
+    if not retryable or job['attempts'] >= Config.IMAGE_JOB_MAX_ATTEMPTS:
+        print(f"Giving up on image for post {job['post_id']} after {job['attempts']} attempts: {error}")
+        _update_post(job['post_id'], {'image_status': 'failed'})
+        _discard(job)
+        return False
+
+    delay = Config.IMAGE_JOB_BACKOFF * 2 ** (job['attempts'] - 1)
+    JOBS.update_one(
+        {'_id': job['_id']},
+        {'$set': {
+            'status': 'queued',
+            'next_attempt_at': _now() + datetime.timedelta(seconds=delay),
+            'last_error': error,
+        }}
+    )
+    return False
+
+
+def drain_image_jobs(upload=None):
+    """Run due jobs until none is left and return how many were processed"""
+    processed = 0
+    while True:
+        job = claim_image_job()
+        if job is None:
+            return processed
+        run_image_job(job, upload)
+        processed += 1
+
+
+class ImageWorkerPool:
+    """Background threads that poll the image job queue"""
+
+    def __init__(self, app, size):
+        self.app = app
+        self.size = size
+        self.pid = os.getpid()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.size):
+            thread = threading.Thread(target=self._run, name=f"image-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        with self.app.app_context():
+            while not self._stop.is_set():
+                try:
+                    if drain_image_jobs() == 0:
+                        self._stop.wait(Config.IMAGE_JOB_POLL_INTERVAL)
+                except Exception as e:
+                    print(f"Image worker error: {e}")
+                    self._stop.wait(Config.IMAGE_JOB_POLL_INTERVAL)
+
+
+_pool = None
+
+
+def start_image_workers(app):
+    """Start this process's image workers; threads do not survive a fork, so a forked child starts its own"""
+    global _pool
+    if Config.IMAGE_WORKERS <= 0:
+        return None
+    if _pool is None or _pool.pid != os.getpid():
+        _pool = ImageWorkerPool(app, Config.IMAGE_WORKERS)
+        _pool.start()
+    return _pool
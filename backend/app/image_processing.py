@@ -0,0 +1,63 @@
+import hashlib
+import io
+from collections import namedtuple
+
+from PIL import Image, ImageOps, features
+
+from app.config import Config
+
+ProcessedImage = namedtuple('ProcessedImage', ['image', 'thumbnail', 'extension'])
+
+
+def hash_image(stream, chunk_size=64 * 1024):
+    """Return the sha256 of a file-like object's content and rewind it"""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def _output_format():
+    if Config.IMAGE_FORMAT.upper() == 'WEBP' and features.check('webp'):
+        return 'WEBP', '.webp'
+    return 'JPEG', '.jpg'
+
+
+def _encode(image, image_format):
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    # No exif/icc arguments, so camera metadata such as GPS position is dropped
+    image.save(buffer, image_format, quality=Config.IMAGE_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def process_image(data):
+    """Downscale, strip metadata and re-encode an uploaded image, plus a thumbnail.
+
+    Raises ValueError if ``data`` is not an image Pillow can read. Animated
+    images keep their first frame only.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        # Refuse decompression bombs from the header, before Pillow only warns and decodes them
+        width, height = image.size
+        if Image.MAX_IMAGE_PIXELS and width * height > Image.MAX_IMAGE_PIXELS:
+            raise ValueError(f"Image too large: {width}x{height} pixels")
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Unreadable image: {e}") from e
+
+    # Apply the camera rotation before the exif data that holds it is dropped
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    image_format, extension = _output_format()
+    full = image.copy()
+    full.thumbnail((Config.IMAGE_MAX_DIMENSION, Config.IMAGE_MAX_DIMENSION), Image.LANCZOS)
+    thumbnail = image.copy()
+    thumbnail.thumbnail((Config.IMAGE_THUMBNAIL_SIZE, Config.IMAGE_THUMBNAIL_SIZE), Image.LANCZOS)
+    return ProcessedImage(_encode(full, image_format), _encode(thumbnail, image_format), extension)
@@ -0,0 +1,92 @@
+import datetime
+import io
+import os
+import shutil
+import uuid
+
+from app import http_client
+from app.config import Config
+from repos.repos import get_image_hashes_collection
+
+ALLOWED_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
+LOCAL_UPLOAD_DIR = os.path.join(Config.STATIC_DIR, 'uploads')
+
+
+def upload_image_to_imgbb(image_file):
+    """Upload image to ImgBB and return the URL"""
+    try:
+        files = {'image': image_file}
+        data = {'key': Config.CDN_KEY}
+        
+        # Extract album ID from URL if needed
+        album_id = os.getenv('IMGBB_ALBUM_ID')
+        if album_id and album_id.startswith('https://ibb.co/album/'):
+            album_id = album_id.split('/')[-1]
+        
+        if album_id:
+            data['album'] = album_id
+        
+        response = http_client.post('imgbb', Config.CDN_URL, read_timeout=Config.HTTP_UPLOAD_READ_TIMEOUT, files=files, data=data)
+        result = response.json()
+        
+        print(f"ImgBB response: {result}")
+        
+        if result.get('success'):
+            return result['data']['url']
+        else:
+            print(f"ImgBB upload failed: {result.get('error', 'Unknown error')}")
+            return None
+    except Exception as e:
+        print(f"Error uploading image: {e}")
+        return None
+
+
+def store_image_locally(image_file):
+    """Local stand-in for ImgBB: copy the image under static/uploads and return its URL"""
+    os.makedirs(LOCAL_UPLOAD_DIR, exist_ok=True)
+    name = os.path.basename(getattr(image_file, 'name', '')) or uuid.uuid4().hex
+    with open(os.path.join(LOCAL_UPLOAD_DIR, name), 'wb') as target:
+        shutil.copyfileobj(image_file, target)
+    return f"/uploads/{name}"
+
+
+def get_uploader():
+    """Return the configured upload function, or None if uploads are not configured"""
+    if Config.IMAGE_UPLOADER == 'local':
+        return store_image_locally
+    if not Config.CDN_KEY:
+        return None
+    return upload_image_to_imgbb
+
+
+def read_image(image_file):
+    """Return the bytes of an uploaded image, kept on its image job until it is processed"""
+    image_file.seek(0)
+    return image_file.read()
+
+
+def named_bytes(data, name):
+    """Wrap bytes in a file object whose name becomes the uploaded file name"""
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    return buffer
+
+
+def find_uploaded_image(digest):
+    """Return the stored {'image', 'thumbnail'} URLs of an already uploaded image content hash"""
+    if not digest:
+        return None
+    return get_image_hashes_collection().find_one({'_id': digest})
+
+
+def remember_uploaded_image(digest, image_url, thumbnail_url):
+    """Record the URLs an image content hash was uploaded to, so the same picture is not uploaded twice"""
+    get_image_hashes_collection().update_one(
+        {'_id': digest},
+        {'$set': {
+            'image': image_url,
+            'thumbnail': thumbnail_url,
+            'created_at': datetime.datetime.now(datetime.timezone.utc),
+        }},
+        upsert=True
+    )
@@ -0,0 +1,79 @@
+import datetime
+
+from bson.objectid import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib encoder is used without it
+    orjson = None
+
+
+def _default(value):
+    """Encode the Mongo types a raw document can contain, then whatever Flask handles"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime.datetime):
+        # Same shape orjson produces: ISO 8601, naive values are UTC
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.isoformat().replace('+00:00', 'Z')
+    return DefaultJSONProvider.default(value)
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """Stdlib json provider that also encodes ObjectId and ISO 8601 datetimes"""
+
+    default = staticmethod(_default)
+    # Key order follows the Mongo projection, sorting every dict costs time for nothing
+    sort_keys = False
+
+    def dumpb(self, obj, **kwargs):
+        """Serialize to UTF-8 bytes, ready to be cached or sent as a response body"""
+        return self.dumps(obj, **kwargs).encode('utf-8')
+
+
+class OrjsonProvider(MongoJSONProvider):
+    """orjson-backed provider, several times faster than json.dumps on post listings"""
+
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return self.dumpb(obj, **kwargs).decode('utf-8')
+
+    def dumpb(self, obj, **kwargs):
+        # orjson produces bytes, this skips the str round trip of dumps()
+        if set(kwargs) - {'indent', 'separators'}:
+            # Options orjson has no equivalent for (cls, sort_keys, ...), use the stdlib encoder
+            return MongoJSONProvider.dumps(self, obj, **kwargs).encode('utf-8')
+        options = self.OPTIONS
+        if kwargs.get('indent'):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumpb(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    'stdlib': MongoJSONProvider,
+    'orjson': OrjsonProvider,
+}
+
+
+def init_json(app):
+    """Install the JSON provider named by JSON_PROVIDER, orjson when available by default"""
+    name = app.config['JSON_PROVIDER']
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'stdlib'
+    if name == 'orjson' and orjson is None:
+        print("JSON_PROVIDER is orjson but orjson is not installed, using the stdlib encoder")
+        name = 'stdlib'
+    app.json = JSON_PROVIDERS[name](app)
@@ -0,0 +1,216 @@
+import collections
+import datetime
+import os
+import threading
+import time
+
+from pymongo.errors import OperationFailure
+
+from app.config import Config
+from app.extensions import mongo
+from app.pagination import decode_sync_token
+from app.sync import get_changes
+
+# Server-Sent Events for live maps (/api/posts/stream).
+#
+# Each process runs one LiveFeed thread that learns about changes and fans
+# them out to its connected clients; clients never hold a Mongo cursor. The
+# payload always comes from app.sync.get_changes, so an event id is a sync
+# token: a client reconnecting with Last-Event-ID (to this worker or another)
+# catches up through the same delta query /api/posts/changes uses.
+
+SSE_MIMETYPE = 'text/event-stream'
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def format_event(event, data, event_id=None):
+    lines = [f'event: {event}']
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {data}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def format_changes(changes, dumps):
+    """Turn a get_changes() result into SSE chunks, every event carrying its sync token as id"""
+    token = changes['sync_token']
+    if changes['reset']:
+        return [format_event('reset', '{}', token)]
+    chunks = [format_event('post', dumps(post), token) for post in changes['posts']]
+    chunks += [format_event('delete', dumps({'_id': post_id}), token) for post_id in changes['deleted']]
+    return chunks
+
+
+class Subscriber:
+    """One connected client: a bounded queue of serialized events"""
+
+    def __init__(self, size):
+        self.size = size
+        self.overflowed = False
+        self._events = collections.deque()
+        self._ready = threading.Condition()
+
+    def push(self, chunk):
+        with self._ready:
+            if len(self._events) >= self.size:
+                # Too slow to keep up: the stream ends and the client resumes from its Last-Event-ID
+                self.overflowed = True
+            else:
+                self._events.append(chunk)
+            self._ready.notify()
+
+    def pull(self, timeout):
+        """Wait up to ``timeout`` seconds and return the queued chunks"""
+        with self._ready:
+            if not self._events and not self.overflowed:
+                self._ready.wait(timeout)
+            chunks = list(self._events)
+            self._events.clear()
+            return chunks
+
+
+class LiveFeed:
+    """Background thread turning story changes into events for this process's subscribers"""
+
+    def __init__(self, app):
+        self.app = app
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        # Time of the last delta query; always a time, None would make get_changes answer a reset
+        self._since = _now()
+        # Payloads sent lately, the SYNC_OVERLAP window returns them more than once
+        self._sent = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='live-feed', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def subscribe(self):
+        """Register a client, None once LIVE_MAX_CLIENTS are connected to this process"""
+        with self._lock:
+            if len(self._subscribers) >= Config.LIVE_MAX_CLIENTS:
+                return None
+            subscriber = Subscriber(Config.LIVE_QUEUE_SIZE)
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _broadcast(self, chunks):
+        with self._lock:
+            # Overflowed clients are disconnecting, or never started reading
+            self._subscribers = {subscriber for subscriber in self._subscribers if not subscriber.overflowed}
+            subscribers = list(self._subscribers)
+        chunk = ''.join(chunks)
+        for subscriber in subscribers:
+            subscriber.push(chunk)
+
+    def _unsent(self, changes):
+        """Drop the posts and deletions already broadcast with the same content"""
+        now = time.monotonic()
+        self._sent = {key: sent for key, sent in self._sent.items() if sent[1] > now}
+        expires = now + Config.SYNC_OVERLAP + Config.LIVE_POLL_INTERVAL
+        dumps = self.app.json.dumps
+        fresh = {'posts': [], 'deleted': []}
+        for name, items in (('posts', changes['posts']), ('deleted', changes['deleted'])):
+            for item in items:
+                key = (name, str(item['_id']) if name == 'posts' else item)
+                payload = dumps(item)
+                if self._sent.get(key, (None,))[0] != payload:
+                    self._sent[key] = (payload, expires)
+                    fresh[name].append(item)
+        return dict(changes, **fresh)
+
+    def publish_changes(self):
+        """Query what changed since the last run and broadcast it"""
+        changes = get_changes(self._since)
+        chunks = format_changes(self._unsent(changes), self.app.json.dumps)
+        if chunks:
+            self._broadcast(chunks)
+        self._since = decode_sync_token(changes['sync_token'])
+
+    def _run(self):
+        with self.app.app_context():
+            use_change_streams = Config.LIVE_SOURCE in ('auto', 'change_stream')
+            while not self._stop.is_set():
+                try:
+                    if use_change_streams:
+                        self._watch()
+                    else:
+                        self._poll()
+                except OperationFailure as e:
+                    if Config.LIVE_SOURCE == 'auto' and e.code in (40573, 40324):
+                        # Change streams need a replica set, a standalone mongod is polled instead
+                        print("Change streams are unavailable, polling for live updates")
+                        use_change_streams = False
+                    else:
+                        print(f"Live feed error: {e}")
+                        self._stop.wait(Config.LIVE_POLL_INTERVAL)
+                except Exception as e:
+                    print(f"Live feed error: {e}")
+                    self._stop.wait(Config.LIVE_POLL_INTERVAL)
+
+    def _watch(self):
+        """Use change streams as a wake-up signal; the events themselves are not parsed"""
+        pipeline = [{'$match': {'ns.coll': {'$in': ['stories', 'post_tombstones']}}}]
+        with mongo.db.watch(pipeline, max_await_time_ms=Config.LIVE_POLL_INTERVAL * 1000) as stream:
+            # Catch up on what happened while the stream was closed
+            self.publish_changes()
+            while not self._stop.is_set() and stream.alive:
+                if stream.try_next() is None:
+                    continue
+                # Coalesce a burst of changes into one delta query
+                while stream.try_next() is not None:
+                    pass
+                self.publish_changes()
+
+    def _poll(self):
+        self._stop.wait(Config.LIVE_POLL_INTERVAL)
+        with self._lock:
+            idle = not self._subscribers
+        if idle:
+            # Nobody to tell, move the window along without querying
+            self._since = _now()
+            return
+        self.publish_changes()
+
+
+_feed = None
+_feed_lock = threading.Lock()
+
+
+def get_live_feed(app):
+    """Return this process's feed, started on first use; threads do not survive a fork, so each child starts its own"""
+    global _feed
+    with _feed_lock:
+        if _feed is None or _feed.pid != os.getpid():
+            _feed = LiveFeed(app)
+            _feed.start()
+        return _feed
+
+
+def stream_events(feed, subscriber, catch_up):
+    """SSE body: the catch-up events, then the feed's events with heartbeats, for at most LIVE_MAX_DURATION"""
+    try:
+        yield f'retry: {Config.LIVE_RETRY_MS}\n\n'
+        if catch_up:
+            yield ''.join(catch_up)
+        deadline = time.monotonic() + Config.LIVE_MAX_DURATION
+        while time.monotonic() < deadline:
+            chunks = subscriber.pull(Config.LIVE_HEARTBEAT)
+            if subscriber.overflowed:
+                break
+            # A comment line keeps proxies and load balancers from closing an idle connection
+            yield ''.join(chunks) if chunks else ': keepalive\n\n'
+    finally:
+        feed.unsubscribe(subscriber)
@@ -0,0 +1,106 @@
+import base64
+import binascii
+import datetime
+import json
+
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+
+# Newest first, _id breaks ties between posts created in the same millisecond
+POSTS_SORT = [('created_at', -1), ('_id', -1)]
+
+# Search results, most relevant first; score is the $meta textScore stored by the search pipeline
+SEARCH_SORT = {'score': -1, '_id': -1}
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at, post_id):
+    """Build the opaque cursor pointing just after the post (created_at, post_id) in POSTS_SORT order.
+
+    ``created_at`` may be a datetime or the ISO string of one, anything else
+    stands for a post without a creation date.
+    """
+    if isinstance(created_at, datetime.datetime):
+        created_at = created_at.isoformat()
+    elif not isinstance(created_at, str):
+        created_at = None
+    return _pack([created_at, str(post_id)])
+
+
+def decode_cursor(token):
+    """Return the (created_at, _id) pair stored in a cursor"""
+    try:
+        created_at, post_id = _unpack(token)
+        if created_at is not None:
+            created_at = datetime.datetime.fromisoformat(created_at)
+        return created_at, ObjectId(post_id)
+    except (binascii.Error, InvalidId, UnicodeError, TypeError, ValueError) as err:
+        raise InvalidCursorError('Invalid cursor') from err
+
+
+def encode_search_cursor(score, post_id):
+    """Build the opaque cursor pointing just after a search result in SEARCH_SORT order"""
+    return _pack([score, str(post_id)])
+
+
+def decode_search_cursor(token):
+    """Return the (score, _id) pair stored in a search cursor"""
+    try:
+        score, post_id = _unpack(token)
+        return float(score), ObjectId(post_id)
+    except (binascii.Error, InvalidId, UnicodeError, TypeError, ValueError) as err:
+        raise InvalidCursorError('Invalid cursor') from err
+
+
+def encode_sync_token(moment):
+    """Build the opaque token a client sends back to /api/posts/changes"""
+    return _pack([moment.isoformat()])
+
+
+def decode_sync_token(token):
+    """Return the aware UTC datetime stored in a sync token"""
+    try:
+        (moment,) = _unpack(token)
+        moment = datetime.datetime.fromisoformat(moment)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=datetime.timezone.utc)
+        return moment
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as err:
+        raise InvalidCursorError('Invalid sync token') from err
+
+
+def _pack(values):
+    raw = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _unpack(token):
+    padded = token + '=' * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+
+
+def after_cursor(query, cursor):
+    """Restrict ``query`` to the posts that come after ``cursor`` in POSTS_SORT order"""
+    created_at, post_id = cursor
+    if created_at is None:
+        # Posts without created_at sort last, only the _id tie-break is left
+        keyset = {'created_at': None, '_id': {'$lt': post_id}}
+    else:
+        keyset = {'$or': [
+            {'created_at': {'$lt': created_at}},
+            {'created_at': created_at, '_id': {'$lt': post_id}},
+            {'created_at': None},
+        ]}
+    return {'$and': [query, keyset]}
+
+
+def after_search_cursor(cursor):
+    """Return the $match condition for the results that come after ``cursor`` in SEARCH_SORT order"""
+    score, post_id = cursor
+    return {'$or': [
+        {'score': {'$lt': score}},
+        {'score': score, '_id': {'$lt': post_id}},
+    ]}
@@ -0,0 +1,39 @@
+# Write hooks for stories.
+#
+# Every code path that creates, changes or deletes a story (the public API in
+# posts_routes and the admin PostView) reports it here, and the derived data
+# kept outside the stories collection (caches, counters, ...) subscribes.
+
+_change_listeners = []
+_reset_listeners = []
+
+
+def on_post_change(listener):
+    """Register ``listener(before, after)``; either document is None on create/delete"""
+    _change_listeners.append(listener)
+    return listener
+
+
+def on_posts_reset(listener):
+    """Register ``listener()`` for changes too broad to describe post by post"""
+    _reset_listeners.append(listener)
+    return listener
+
+
+def post_changed(before, after):
+    """Tell listeners a story went from ``before`` to ``after``"""
+    for listener in _change_listeners:
+        try:
+            listener(before, after)
+        except Exception as e:
+            # A failing listener must never fail the write that triggered it
+            print(f"Post change listener {listener.__name__} failed: {e}")
+
+
+def posts_reset():
+    """Tell listeners any story may have changed"""
+    for listener in _reset_listeners:
+        try:
+            listener()
+        except Exception as e:
+            print(f"Post reset listener {listener.__name__} failed: {e}")
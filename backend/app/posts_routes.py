@@ -1,43 +1,75 @@
 import datetime
+import io
 import json
 import os
 
-import requests
 from bson.objectid import ObjectId
-from flask import Blueprint, jsonify, request, send_from_directory
-from marshmallow import ValidationError
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from marshmallow import EXCLUDE, ValidationError
+import pymongo
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from werkzeug.http import is_resource_modified
 
-from admin.auth import login_required
+from admin.auth import admin_required, login_required
+from app.assets import send_asset
+from app.clusters import TooManyTilesError, get_clusters
+from app.export import build_export_query, export_cursor, export_response
+from app.facets import count_facets, get_global_facets
 from app.config import Config
+from app.extensions import mongo
+from app.geo import snap_bbox, within_bbox
+from app.http_client import get_upstream_metrics, verify_captcha
+from app.image_jobs import enqueue_image_job
+from app.image_processing import hash_image
+from app.live import SSE_MIMETYPE, format_changes, get_live_feed, stream_events
+from app.images import ALLOWED_IMAGE_EXTENSIONS, find_uploaded_image, get_uploader, read_image
+from app.pagination import POSTS_SORT, InvalidCursorError, after_cursor, decode_sync_token, encode_cursor
+from app.post_events import post_changed, posts_reset
+from app.projection import build_projection
+from app.query_cache import cache_key, get_cached, set_cached
+from app.search import build_search_pipeline, search_page
+from app.sync import get_changes
+from app.streaming import NDJSON_MIMETYPE, stream_json_array, stream_ndjson
+from app.tiles import get_tile, is_valid_tile
+from app.timeline import created_at_range, get_timeline
+from app.versioning import listing_validators
+from repos.imports import import_posts, read_import_records
 from repos.repos import get_posts_collection
-from schemas.schema import PostSchema, TagSchema
+from schemas.schema import (
+    ChangesQuerySchema,
+    ClusterQuerySchema,
+    ExportQuerySchema,
+    FacetQuerySchema,
+    POST_STATUSES,
+    PostQuerySchema,
+    PostSchema,
+    SearchQuerySchema,
+    StreamQuerySchema,
+    TagSchema,
+    TimelineQuerySchema,
+)
 
 # Check if running locally
 if os.path.exists('.env'):
     from dotenv import load_dotenv
     load_dotenv()
 
-# Your hCaptcha secret key (keep this secure and never expose it on the client side)
-captcha_secret_key = Config.CAPTCHA_SECRET_KEY
-
 # Now retrieve the MongoDB URI
 # mongo_uri = Config.MONGO_URI
 secret_key = Config.SECRET_KEY
-cdn_key = Config.CDN_KEY
-cdn_url = Config.CDN_URL
-captcha_url = Config.CAPTCHA_URL
 
 posts_routes_blueprint = Blueprint('posts_routes', __name__)
 
 # Route to serve the React app
 @posts_routes_blueprint.route('/')
 def index():
-    return send_from_directory(os.path.join(posts_routes_blueprint.root_path, 'static'), 'index.html')
+    return send_asset('index.html')
 
 # Route to serve static files (JS, CSS, images, etc.)
 @posts_routes_blueprint.route('/<path:path>')
 def static_files(path):
-    return send_from_directory(os.path.join(posts_routes_blueprint.root_path, 'static'), path)
+    return send_asset(path)
 
 # Use the login_required decorator where needed
 @posts_routes_blueprint.route('/protected')
@@ -47,36 +79,18 @@ def protected_route():
 # Initialize the schema instance
 post_schema = PostSchema()
 tag_schema = TagSchema()
+post_query_schema = PostQuerySchema()
+cluster_query_schema = ClusterQuerySchema()
+export_query_schema = ExportQuerySchema(unknown=EXCLUDE)
+search_query_schema = SearchQuerySchema()
+facet_query_schema = FacetQuerySchema(unknown=EXCLUDE)
+timeline_query_schema = TimelineQuerySchema()
+changes_query_schema = ChangesQuerySchema(unknown=EXCLUDE)
+stream_query_schema = StreamQuerySchema(unknown=EXCLUDE)
+# Bodies /api/posts/bulk reads; no form encodings, a cross-site form could send those with an admin's cookie
+IMPORT_MIMETYPES = (NDJSON_MIMETYPE, 'application/json', 'application/geo+json')
 # Swagger definition for Post
 
-def upload_image_to_imgbb(image_file):
-    """Upload image to ImgBB and return the URL"""
-    try:
-        files = {'image': image_file}
-        data = {'key': cdn_key}
-        
-        # Extract album ID from URL if needed
-        album_id = os.getenv('IMGBB_ALBUM_ID')
-        if album_id and album_id.startswith('https://ibb.co/album/'):
-            album_id = album_id.split('/')[-1]
-        
-        if album_id:
-            data['album'] = album_id
-        
-        response = requests.post(cdn_url, files=files, data=data)
-        result = response.json()
-        
-        print(f"ImgBB response: {result}")
-        
-        if result.get('success'):
-            return result['data']['url']
-        else:
-            print(f"ImgBB upload failed: {result.get('error', 'Unknown error')}")
-            return None
-    except Exception as e:
-        print(f"Error uploading image: {e}")
-        return None
-
 # CREATE (Insert a new document)
 # Route to create a new post document
 @posts_routes_blueprint.route('/api/posts/create', methods=['POST'])
@@ -116,27 +130,19 @@ def create():
                 return jsonify({'success': False, 'message': 'CAPTCHA token missing'}), 400
 
             # Verify the hCaptcha token
-            verification_response = requests.post(
-                captcha_url,
-                data={
-                    'secret': captcha_secret_key,
-                    'response': hcaptcha_response
-                }
-            )
-
-            verification_result = verification_response.json()
+            verification_result = verify_captcha(hcaptcha_response)
             if not verification_result.get('success'):
                 print(f"CAPTCHA verification failed: {verification_result}")
                 return jsonify({'success': False, 'message': 'CAPTCHA verification failed'}), 400
 
         # Handle image upload if present
+        image_data = image_hash = None
         if 'image' in request.files:
             image_file = request.files['image']
             if image_file.filename:
                 # Validate file type
-                allowed_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
                 file_ext = os.path.splitext(image_file.filename.lower())[1]
-                if file_ext not in allowed_extensions:
+                if file_ext not in ALLOWED_IMAGE_EXTENSIONS:
                     return jsonify({'error': 'Invalid file type. Only images are allowed.'}), 400
                 
                 # Validate file size (5MB limit)
@@ -146,23 +152,32 @@ def create():
                 if file_size > 5 * 1024 * 1024:
                     return jsonify({'error': 'File too large. Maximum size is 5MB.'}), 400
                 
-                if not cdn_key:
+                if get_uploader() is None:
                     print("CDN_KEY not configured, skipping image upload")
                 else:
-                    image_url = upload_image_to_imgbb(image_file)
-                    if image_url:
-                        data['content']['image'] = image_url
-                        print("Image uploaded successfully")
+                    # The same picture uploaded before is reused instead of sent again
+                    image_hash = hash_image(image_file.stream)
+                    existing = find_uploaded_image(image_hash)
+                    if existing:
+                        data['content']['image'] = existing['image']
+                        data['content']['thumbnail'] = existing.get('thumbnail')
+                        data['image_status'] = 'ready'
                     else:
-                        print("Failed to upload image to ImgBB, continuing without image")
+                        # Processed and uploaded in the background, the post is saved without waiting for the CDN
+                        image_data = read_image(image_file)
+                        data['image_status'] = 'pending'
 
         data['created_at'] = datetime.datetime.now(datetime.timezone.utc)
+        data['updated_at'] = data['created_at']
         data['status'] = 'approved' #TODO Temporary for alpha testing
         data['optional_tags'] = data.pop('optionalTags', [])
             
         # Insert the data into the collection
         POSTS = get_posts_collection()
         result = POSTS.insert_one(data)
+        post_changed(None, data)
+        if image_data:
+            enqueue_image_job(result.inserted_id, image_data, image_hash)
         
         return jsonify({'message': 'Post created', 'post_id': str(result.inserted_id)}), 201
     
@@ -173,12 +188,102 @@ def create():
         print(f"Unexpected error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def load_post_query_args(schema=post_query_schema):
+    """Validate the tag and viewport filters of a listing request"""
+    raw_args = {
+        'tag': request.args.get('tag'),
+        'optionalTags': request.args.getlist('optionalTags'),  # This returns a list directly
+    }
+    for name, field in schema.fields.items():
+        key = field.data_key or name
+        if key not in raw_args and request.args.get(key):
+            raw_args[key] = request.args.get(key)
+    return schema.load(raw_args)
+
+def page_cursor(post):
+    """Build the cursor continuing after the last post of a page"""
+    if 'createdAt' in post:
+        return encode_cursor(post['createdAt'], post['_id'])
+    # createdAt was left out of the fieldset, look up the stored value
+    POSTS = get_posts_collection()
+    stored = POSTS.find_one({'_id': ObjectId(post['_id'])}, {'created_at': 1}) or {}
+    return encode_cursor(stored.get('created_at'), post['_id'])
+
+def build_posts_query(args):
+    """Build the Mongo filter for approved posts from validated query args"""
+    tag = args.get('tag')
+    optional_tags = args.get('optionalTags', [])
+
+    query = {'status': 'approved'}  # Only return approved posts by default
+
+    # Apply tag filters sequentially
+    if tag and optional_tags:
+        # Both tag and optional tags are provided
+        query['$and'] = [
+            {'tag': tag},
+            {'optional_tags': {'$all': optional_tags}}
+        ]
+    elif tag:
+        # Only single tag is provided
+        query['tag'] = tag
+    elif optional_tags:
+        # Only optional tags are provided
+        query['optional_tags'] = {'$all': optional_tags}
+
+    # Restrict to the map viewport, served by the 2dsphere index on location
+    bbox = effective_bbox(args)
+    if bbox:
+        query['location'] = within_bbox(bbox)
+
+    # Time range, served by the (status, [tag,] created_at) indexes
+    created_at = created_at_range(args.get('date_from'), args.get('date_to'))
+    if created_at:
+        query['created_at'] = created_at
+
+    return query
+
+def effective_bbox(args):
+    """Return the requested bbox, snapped to the tile grid when a zoom is given"""
+    bbox = args.get('bbox')
+    if bbox and args.get('zoom') is not None:
+        bbox = snap_bbox(bbox, args['zoom'])
+    return bbox
+
+def listing_cache_key(args):
+    """Normalize the arguments that shape a non-streaming listing response"""
+    return (
+        'posts',
+        args.get('tag'),
+        tuple(sorted(set(args.get('optionalTags') or []))),
+        effective_bbox(args),
+        args.get('date_from'),
+        args.get('date_to'),
+        tuple(args.get('fieldset') or ()),
+        args['format'],
+        None if args['format'] == 'array' else args['limit'],
+        args.get('cursor'),
+    )
+
+def json_bytes_response(body):
+    return current_app.response_class(body, mimetype='application/json')
+
+def with_validators(response, etag, last_modified):
+    """Attach the ETag and Last-Modified of a listing to its response, 200 or 304 alike"""
+    # The ETag names the listing, not one encoding of it: weak whether or not
+    # compress_response gzips this body, and keyed on Accept-Encoding by caches
+    response.vary.add('Accept-Encoding')
+    if etag:
+        response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    return response
+
 # Example route to retrieve all posts
 @login_required
 @posts_routes_blueprint.route('/api/posts', methods=['GET'])
 def get_posts():
     """
-    Get all posts with optional tag filters
+    Get posts with optional tag and viewport filters
     ---
     parameters:
       - name: tag
@@ -194,65 +299,658 @@ def get_posts():
         collectionFormat: multi  # This allows multiple tags
         required: false
         description: Optional list of tags to filter posts
+      - name: bbox
+        in: query
+        type: string
+        required: false
+        description: Only return posts inside minLon,minLat,maxLon,maxLat
+      - name: zoom
+        in: query
+        type: integer
+        required: false
+        description: Map zoom level, snaps bbox outwards to that zoom's tile grid
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size, newest posts first
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: next_cursor of the previous page
+      - name: format
+        in: query
+        type: string
+        enum: [page, array]
+        required: false
+        description: page (default) returns {posts, next_cursor}, array returns every matching post as a list
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated response fields (title, content, location, tag, optionalTags, createdAt, status), or summary for map markers. _id is always included
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream every matching post as a chunked JSON array (send Accept application/x-ndjson for one post per line)
+    produces:
+      - application/json
+      - application/x-ndjson
     responses:
       200:
-        description: A list of posts
+        description: A page of posts, or a list of posts with format=array or stream=1
+      304:
+        description: Nothing changed since the ETag or Last-Modified the client holds
       400:
         description: input validation error
     """
     try:
-        # Get single tag if provided
-        tag = request.args.get('tag')
-        
-        # Get optional tags list if provided
-        raw_optional_tags = request.args.getlist('optionalTags')  # This returns a list directly
-        
-        # Validate and load both tag and optional tags
-        args = tag_schema.load({'tag': tag, 'optionalTags': raw_optional_tags})  # Pass both as a dictionary
-        tag = args.get('tag')
-        optional_tags = args.get('optionalTags', [])
+        args = load_post_query_args()
+        query = build_posts_query(args)
 
-        query = {'status': 'approved'}  # Only return approved posts by default
-        
-        # Apply tag filters sequentially
-        if tag and optional_tags:
-            # Both tag and optional tags are provided
-            query['$and'] = [
-                {'tag': tag},
-                {'optional_tags': {'$all': optional_tags}}
-            ]
-        elif tag:
-            # Only single tag is provided
-            query['tag'] = tag
-        elif optional_tags:
-            # Only optional tags are provided
-            query['optional_tags'] = {'$all': optional_tags}
-        
         POSTS = get_posts_collection()
-        posts = list(POSTS.find(query))
-        # Convert ObjectId to string to make it JSON serializable
-        for post in posts:
-            post['_id'] = str(post['_id'])
-            # Handle date field conversion - check both formats
-            if 'created_at' in post:
-                created_at = post.pop('created_at')
-                # Convert datetime object to ISO string if needed
-                if isinstance(created_at, datetime.datetime):
-                    post['createdAt'] = created_at.isoformat()
-                else:
-                    post['createdAt'] = created_at
-            elif 'createdAt' not in post:
-                # If no date field exists, use current time as fallback
-                post['createdAt'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
-            # Convert optional_tags to optionalTags for frontend compatibility
-            if 'optional_tags' in post:
-                post['optionalTags'] = post.pop('optional_tags')
-            elif 'optionalTags' not in post:
-                post['optionalTags'] = []
-        return jsonify(posts), 200
+        if args.get('cursor'):
+            query = after_cursor(query, args['cursor'])
+        # Posts are shaped by the projection on the server, sparse fieldsets
+        # are pushed down too so unused fields are never decoded
+        projection = build_projection(args.get('fieldset'))
+
+        if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+            mode = 'ndjson'
+        elif args['stream']:
+            mode = 'stream'
+        else:
+            mode = 'json'
+
+        # Answer conditional requests from the stored change counter, before any query runs
+        etag, last_modified = listing_validators(mode, *listing_cache_key(args))
+        if etag and not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            return with_validators(current_app.response_class(status=304), etag, last_modified)
+
+        # Streaming modes walk the whole result without holding it in memory
+        if mode == 'ndjson':
+            response = stream_ndjson(POSTS.find(query, projection).sort(POSTS_SORT))
+            return with_validators(response, etag, last_modified)
+        if mode == 'stream':
+            response = stream_json_array(POSTS.find(query, projection).sort(POSTS_SORT))
+            return with_validators(response, etag, last_modified)
+
+        # Identical listings are served from the serialized response cache
+        key = cache_key(*listing_cache_key(args))
+        body = get_cached(key)
+        if body is not None:
+            return with_validators(json_bytes_response(body), etag, last_modified)
+
+        if args['format'] == 'array':
+            # Compatibility mode: every matching post as a plain list
+            payload = list(POSTS.find(query, projection))
+        else:
+            # Fetch one extra post to learn whether another page follows
+            limit = args['limit']
+            posts = list(POSTS.find(query, projection).sort(POSTS_SORT).limit(limit + 1))
+            next_cursor = page_cursor(posts[limit - 1]) if len(posts) > limit else None
+            payload = {'posts': posts[:limit], 'next_cursor': next_cursor}
+
+        body = current_app.json.dumpb(payload, separators=(',', ':'))
+        set_cached(key, body)
+        return with_validators(json_bytes_response(body), etag, last_modified)
+
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+
+@posts_routes_blueprint.route('/api/posts/search', methods=['GET'])
+def search_posts():
+    """
+    Search approved posts by title and description, most relevant first
+    ---
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Words to search for; "quoted phrases" must match exactly and -word excludes a word
+      - name: tag
+        in: query
+        type: string
+        required: false
+        description: Single tag to filter posts
+      - name: optionalTags
+        in: query
+        type: array
+        items:
+          type: string
+        collectionFormat: multi
+        required: false
+        description: Optional list of tags to filter posts
+      - name: bbox
+        in: query
+        type: string
+        required: false
+        description: Only return posts inside minLon,minLat,maxLon,maxLat
+      - name: zoom
+        in: query
+        type: integer
+        required: false
+        description: Map zoom level, snaps bbox outwards to that zoom's tile grid
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: next_cursor of the previous page
+    responses:
+      200:
+        description: "{posts, next_cursor}, posts carry the summary fields and their relevance score"
+      304:
+        description: Nothing changed since the ETag or Last-Modified the client holds
+      400:
+        description: input validation error
+    """
+    try:
+        args = load_post_query_args(search_query_schema)
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+    text = args['q'].strip()
+    if not text:
+        return jsonify({'errors': {'q': ['Search text is required.']}}), 400
+
+    key_parts = (
+        'search',
+        text,
+        args.get('tag'),
+        tuple(sorted(set(args.get('optionalTags') or []))),
+        effective_bbox(args),
+        args['limit'],
+        args.get('cursor'),
+    )
+    etag, last_modified = listing_validators(*key_parts)
+    if etag and not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return with_validators(current_app.response_class(status=304), etag, last_modified)
+
+    key = cache_key(*key_parts)
+    body = get_cached(key)
+    if body is None:
+        pipeline = build_search_pipeline(build_posts_query(args), text, args['limit'], args.get('cursor'))
+        results = list(get_posts_collection().aggregate(pipeline))
+        body = current_app.json.dumpb(search_page(results, args['limit']), separators=(',', ':'))
+        set_cached(key, body)
+    return with_validators(json_bytes_response(body), etag, last_modified)
+
+@posts_routes_blueprint.route('/api/posts/<id>', methods=['GET'])
+def get_post(id):
+    """
+    Get a single approved post by ID with its full content
+    ---
+    parameters:
+      - name: id
+        in: path
+        required: true
+        type: string
+        description: The ID of the post
+    responses:
+      200:
+        description: The post
+      400:
+        description: Invalid post ID
+      404:
+        description: Post not found
+    """
+    if not ObjectId.is_valid(id):
+        return jsonify({'error': 'Invalid post ID'}), 400
+
+    POSTS = get_posts_collection()
+    post = POSTS.find_one({'_id': ObjectId(id), 'status': 'approved'}, build_projection())
+    if post is None:
+        return jsonify({'message': 'Post not found'}), 404
+
+    return jsonify(post), 200
+
+@posts_routes_blueprint.route('/api/posts/facets', methods=['GET'])
+def get_post_facets():
+    """
+    Count approved posts per tag and per optional tag
+    ---
+    parameters:
+      - name: bbox
+        in: query
+        type: string
+        required: false
+        description: Only count posts inside minLon,minLat,maxLon,maxLat
+      - name: zoom
+        in: query
+        type: integer
+        required: false
+        description: Map zoom level, snaps bbox outwards to that zoom's tile grid
+      - name: from
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Only count posts created at or after this time
+      - name: to
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Only count posts created before this time
+    responses:
+      200:
+        description: "{tag: {value: count}, optionalTags: {value: count}}"
+      400:
+        description: input validation error
+    """
+    try:
+        args = facet_query_schema.load(request.args.to_dict())
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+
+    bbox = effective_bbox(args)
+    created_at = created_at_range(args['date_from'], args['date_to'])
+    if not (bbox or created_at):
+        # Unfiltered counts come from the counters kept up to date on every write
+        return jsonify(get_global_facets()), 200
+
+    query = {'status': 'approved'}
+    if bbox:
+        query['location'] = within_bbox(bbox)
+    if created_at:
+        query['created_at'] = created_at
+
+    key = cache_key('facets', bbox, args['date_from'], args['date_to'])
+    body = get_cached(key)
+    if body is None:
+        body = current_app.json.dumpb(count_facets(query), separators=(',', ':'))
+        set_cached(key, body)
+    return json_bytes_response(body)
+
+@posts_routes_blueprint.route('/api/posts/timeline', methods=['GET'])
+def get_post_timeline():
+    """
+    Count approved posts per day, week or month, split by tag
+    ---
+    parameters:
+      - name: bucket
+        in: query
+        type: string
+        enum: [day, week, month]
+        required: false
+        description: Bucket size (UTC, weeks start on Monday), day by default
+      - name: tag
+        in: query
+        type: string
+        required: false
+        description: Single tag to filter posts
+      - name: optionalTags
+        in: query
+        type: array
+        items:
+          type: string
+        collectionFormat: multi
+        required: false
+        description: Optional list of tags to filter posts
+      - name: bbox
+        in: query
+        type: string
+        required: false
+        description: Only count posts inside minLon,minLat,maxLon,maxLat
+      - name: zoom
+        in: query
+        type: integer
+        required: false
+        description: Map zoom level, snaps bbox outwards to that zoom's tile grid
+      - name: from
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Only count posts created at or after this time
+      - name: to
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Only count posts created before this time
+    responses:
+      200:
+        description: "{bucket, buckets: [{start, counts: {tag: count}, total}]} in date order, empty buckets omitted"
+      400:
+        description: input validation error
+    """
+    try:
+        args = load_post_query_args(timeline_query_schema)
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+
+    key = (
+        args.get('tag'),
+        tuple(sorted(set(args.get('optionalTags') or []))),
+        effective_bbox(args),
+        args.get('date_from'),
+        args.get('date_to'),
+    )
+    buckets = get_timeline(build_posts_query(args), args['bucket'], key)
+    return jsonify({'bucket': args['bucket'], 'buckets': buckets}), 200
+
+@posts_routes_blueprint.route('/api/posts/changes', methods=['GET'])
+def get_post_changes():
+    """
+    Get the approved posts added or edited and the ids of posts removed since a sync token
+    ---
+    parameters:
+      - name: since
+        in: query
+        type: string
+        required: false
+        description: sync_token from a previous response, omit it to get a first token
+      - name: fields
+        in: query
+        type: string
+        required: false
+        description: Comma-separated fields to return per post, 'summary' for the map marker fields
+    responses:
+      200:
+        description: "{posts, deleted: [id], sync_token, reset}, reset asks the client to reload the full listing"
+      400:
+        description: input validation error
+    """
+    try:
+        args = changes_query_schema.load(request.args.to_dict())
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+
+    changes = get_changes(args['since'], args['fieldset'])
+    response = jsonify(changes)
+    response.headers['Cache-Control'] = 'no-store'
+    return response, 200
+
+@posts_routes_blueprint.route('/api/posts/stream', methods=['GET'])
+def stream_post_changes():
+    """
+    Stream approved posts and moderation changes as Server-Sent Events
+    ---
+    produces:
+      - text/event-stream
+    parameters:
+      - name: since
+        in: query
+        type: string
+        required: false
+        description: sync_token of the listing the client loaded, the events since then are sent first
+      - name: Last-Event-ID
+        in: header
+        type: string
+        required: false
+        description: Id of the last event received, sent by the browser on reconnect; takes precedence over since
+    responses:
+      200:
+        description: "'post' events carry a post, 'delete' events {_id}, 'reset' asks the client to reload the listing; ids are /api/posts/changes sync tokens"
+      400:
+        description: input validation error
+      503:
+        description: This worker already serves LIVE_MAX_CLIENTS streams (or streams are off), poll /api/posts/changes instead
+    """
+    try:
+        args = stream_query_schema.load(request.args.to_dict())
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+    since = args['since']
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id:
+        try:
+            since = decode_sync_token(last_event_id)
+        except InvalidCursorError:
+            pass
+
+    # With streams turned off (LIVE_MAX_CLIENTS=0) the feed thread is never started
+    feed = get_live_feed(current_app._get_current_object()) if Config.LIVE_MAX_CLIENTS > 0 else None
+    subscriber = feed.subscribe() if feed else None
+    if subscriber is None:
+        response = jsonify({'error': 'Too many live clients, try again later'})
+        response.headers['Retry-After'] = str(Config.LIVE_RETRY_MS // 1000)
+        return response, 503
+
+    # Subscribe before catching up so nothing falls between the two; duplicates are upserted by _id
+    catch_up = []
+    if since is not None:
+        try:
+            catch_up = format_changes(get_changes(since), current_app.json.dumps)
+        except Exception:
+            feed.unsubscribe(subscriber)
+            raise
+
+    response = current_app.response_class(
+        stream_with_context(stream_events(feed, subscriber, catch_up)),
+        mimetype=SSE_MIMETYPE
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    # Keep nginx-style proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@posts_routes_blueprint.route('/api/posts/clusters', methods=['GET'])
+def get_post_clusters():
+    """
+    Get approved posts grouped into map clusters
+    ---
+    parameters:
+      - name: zoom
+        in: query
+        type: integer
+        required: true
+        description: Map zoom level (0-22), each map tile is split into a grid of clusters
+      - name: bbox
+        in: query
+        type: string
+        required: false
+        description: Only cluster posts inside minLon,minLat,maxLon,maxLat
+      - name: tag
+        in: query
+        type: string
+        required: false
+        description: Single tag to filter posts
+      - name: optionalTags
+        in: query
+        type: array
+        items:
+          type: string
+        collectionFormat: multi
+        required: false
+        description: Optional list of tags to filter posts
+    responses:
+      200:
+        description: Clusters with a centroid, a post count and a count per tag
+      400:
+        description: input validation error
+    """
+    try:
+        args = load_post_query_args(cluster_query_schema)
+        # The viewport is applied per tile by get_clusters
+        query = build_posts_query({key: args.get(key) for key in ('tag', 'optionalTags', 'date_from', 'date_to')})
+        clusters = get_clusters(query, args)
+        return jsonify({'zoom': args['zoom'], 'clusters': clusters}), 200
 
     except ValidationError as err:
         return jsonify({'errors': err.messages}), 400
+    except TooManyTilesError as err:
+        return jsonify({'errors': {'bbox': [str(err)]}}), 400
+
+@posts_routes_blueprint.route('/api/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+@posts_routes_blueprint.route('/api/tiles/<int:z>/<int:x>/<int:y>.geojson', methods=['GET'])
+def get_post_tile(z, x, y):
+    """
+    Get the approved posts inside a Web Mercator map tile as GeoJSON
+    ---
+    parameters:
+      - name: z
+        in: path
+        type: integer
+        required: true
+      - name: x
+        in: path
+        type: integer
+        required: true
+      - name: y
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: A FeatureCollection of points with id, title, tag and optionalTags
+      304:
+        description: Tile unchanged since the ETag the client holds
+      404:
+        description: Tile outside the zoom level's grid
+    """
+    if not is_valid_tile(z, x, y):
+        return jsonify({'error': 'Tile not found'}), 404
+
+    body, etag = get_tile(z, x, y)
+    response = Response(body, mimetype='application/geo+json')
+    # Weak and keyed on Accept-Encoding, like the listings: the same on the 304 as on a gzipped 200
+    response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = Config.TILE_MAX_AGE
+    return response.make_conditional(request)
+
+@posts_routes_blueprint.route('/api/posts/bulk', methods=['POST'])
+@admin_required
+def bulk_import_posts():
+    """
+    Import many stories at once (admin only, no captcha)
+    ---
+    consumes:
+      - application/x-ndjson
+      - application/geo+json
+      - application/json
+    parameters:
+      - name: body
+        in: body
+        description: NDJSON with one story per line, a GeoJSON FeatureCollection or a JSON array of stories
+      - name: status
+        in: query
+        type: string
+        enum: ['pending', 'approved', 'rejected']
+        default: approved
+        description: Status for records that do not set one
+    responses:
+      200:
+        description: Counts of received, inserted and failed records, with the errors of each failed record
+      400:
+        description: Unknown status
+      415:
+        description: The body is not NDJSON, JSON or GeoJSON
+    """
+    if request.mimetype not in IMPORT_MIMETYPES:
+        return jsonify({'error': f"Content-Type must be one of {', '.join(IMPORT_MIMETYPES)}"}), 415
+    status = request.args.get('status', 'approved')
+    if status not in POST_STATUSES:
+        return jsonify({'error': f"status must be one of {', '.join(POST_STATUSES)}"}), 400
+
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8')
+    summary = import_posts(
+        read_import_records(stream),
+        batch_size=Config.IMPORT_BATCH_SIZE,
+        default_status=status,
+        max_errors=Config.IMPORT_MAX_ERRORS
+    )
+    if summary['inserted']:
+        # One reset instead of a post_changed per story
+        posts_reset()
+    return jsonify(summary), 200
+
+@posts_routes_blueprint.route('/api/posts/export', methods=['GET'])
+@admin_required
+def export_posts():
+    """
+    Download stories as GeoJSON, NDJSON or CSV (admin only)
+    ---
+    parameters:
+      - name: format
+        in: query
+        type: string
+        enum: ['geojson', 'ndjson', 'csv']
+        default: geojson
+      - name: status
+        in: query
+        type: string
+        enum: ['pending', 'approved', 'rejected']
+        description: Only stories with this status, every status if omitted
+      - name: tag
+        in: query
+        type: string
+        enum: ['Positive', 'Neutral', 'Negative']
+      - name: from
+        in: query
+        type: string
+        format: date-time
+        description: Only stories created at or after this time
+      - name: to
+        in: query
+        type: string
+        format: date-time
+        description: Only stories created before this time
+      - name: gzip
+        in: query
+        type: boolean
+        default: false
+        description: Download a .gz file
+    responses:
+      200:
+        description: The matching stories, streamed as an attachment
+      400:
+        description: Invalid filter or format
+    """
+    try:
+        args = export_query_schema.load(request.args.to_dict())
+    except ValidationError as err:
+        return jsonify({'errors': err.messages}), 400
+
+    query = build_export_query(args['status'], args['tag'], args['date_from'], args['date_to'])
+    return export_response(export_cursor(query), args['format'], args['gzip'])
+
+@posts_routes_blueprint.route('/api/metrics/upstreams', methods=['GET'])
+@admin_required
+def upstream_metrics():
+    """
+    Latency of outbound hCaptcha and ImgBB calls made by this worker process
+    ---
+    responses:
+      200:
+        description: Request count, errors and average/max latency in ms per upstream
+    """
+    return jsonify(get_upstream_metrics()), 200
+
+@posts_routes_blueprint.route('/api/health/ready', methods=['GET'])
+def readiness():
+    """
+    Readiness of this worker process: it can reach MongoDB
+    ---
+    responses:
+      200:
+        description: Ready to take traffic
+      503:
+        description: MongoDB is unreachable from this worker
+    """
+    try:
+        # Bounds server selection too, a load balancer probe should not hang for 30 seconds
+        with pymongo.timeout(Config.READY_TIMEOUT):
+            mongo.db.command('ping')
+    except PyMongoError as e:
+        print(f"Readiness check failed: {e}")
+        # The class name only, the message lists internal hosts
+        response = jsonify({'status': 'unavailable', 'error': type(e).__name__})
+        response.headers['Cache-Control'] = 'no-store'
+        return response, 503
+    response = jsonify({'status': 'ready', 'pid': os.getpid()})
+    response.headers['Cache-Control'] = 'no-store'
+    return response, 200
 
 # UPDATE (Modify a document by ID)
 @posts_routes_blueprint.route('/api/posts/update/<id>', methods=['PUT'])
@@ -292,13 +990,10 @@ def update_post(id):
             return jsonify({'success': False, 'message': 'CAPTCHA token missing'}), 400
 
         # Verify the hCaptcha token with the hCaptcha verification endpoint
-        verification_response = requests.post(
-            'https://hcaptcha.com/siteverify',
-            data={
-                'secret': captcha_secret_key,
-                'response': hcaptcha_response
-            }
-        )
+        verification_result = verify_captcha(hcaptcha_response)
+        if not verification_result.get('success'):
+            print(f"CAPTCHA verification failed: {verification_result}")
+            return jsonify({'success': False, 'message': 'CAPTCHA verification failed'}), 400
 
         data['updated_at'] = datetime.datetime.now(datetime.timezone.utc)  # Add updated_at timestamp
         
@@ -308,13 +1003,15 @@ def update_post(id):
 
         # Find the post and update it
         POSTS = get_posts_collection()
-        result = POSTS.update_one(
+        before = POSTS.find_one_and_update(
             {'_id': ObjectId(id)},
-            {'$set': data}
+            {'$set': data},
+            return_document=ReturnDocument.BEFORE
         )
 
-        if result.matched_count == 0:
+        if before is None:
             return jsonify({'message': 'Post not found'}), 404
+        post_changed(before, {**before, **data})
 
         return jsonify({'message': 'Post updated'}), 200
     
@@ -349,10 +1046,11 @@ def delete_post(id):
 
         # Find the post and delete it
         POSTS = get_posts_collection()
-        result = POSTS.delete_one({'_id': ObjectId(id)})
+        deleted = POSTS.find_one_and_delete({'_id': ObjectId(id)})
 
-        if result.deleted_count == 0:
+        if deleted is None:
             return jsonify({'message': 'Post not found'}), 404
+        post_changed(deleted, None)
 
         return jsonify({'message': 'Post deleted'}), 200
 
@@ -0,0 +1,32 @@
+# Server-side projection turning a stored post into the response shape, so the
+# read path needs no per-document Python rewriting. Documents normalized by
+# `flask posts normalize` only need the first branch of each expression; the
+# fallbacks keep not-yet-migrated documents readable.
+CREATED_AT_FORMAT = '%Y-%m-%dT%H:%M:%S.%LZ'
+
+POST_FIELDS = {
+    '_id': {'$toString': '$_id'},
+    'title': 1,
+    'content': 1,
+    'location': 1,
+    'tag': 1,
+    'optionalTags': {'$ifNull': ['$optional_tags', {'$ifNull': ['$optionalTags', []]}]},
+    'createdAt': {'$cond': [
+        {'$eq': [{'$type': '$created_at'}, 'date']},
+        {'$dateToString': {'date': '$created_at', 'format': CREATED_AT_FORMAT}},
+        {'$ifNull': ['$created_at', '$createdAt']},
+    ]},
+    'status': 1,
+}
+
+# What a map marker needs, the full content is loaded from /api/posts/<id>
+SUMMARY_FIELDS = ['_id', 'title', 'location', 'tag', 'optionalTags']
+
+
+def build_projection(fields=None):
+    """Return the Mongo projection for a list of response fields, every field if none are given.
+
+    _id is always included, it is what clients key posts by.
+    """
+    names = ['_id'] + [name for name in (fields or POST_FIELDS) if name != '_id']
+    return {name: POST_FIELDS[name] for name in names}
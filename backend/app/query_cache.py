@@ -0,0 +1,37 @@
+from app.cache import LRUCache
+from app.config import Config
+from app.post_events import on_post_change, on_posts_reset
+from app.versioning import posts_version
+
+# Serialized response bodies keyed by (shared posts change counter, normalized query).
+# The ETags come from the same counter, so a cached body is never sent under a
+# validator newer than the data it was built from, whichever worker wrote last.
+posts_cache = LRUCache(maxsize=Config.POSTS_CACHE_SIZE, ttl=Config.POSTS_CACHE_TTL)
+
+
+def cache_key(*parts):
+    """Return the cache key for the current posts version, or None if caching is unavailable"""
+    version = posts_version.current()
+    if version is None:
+        return None
+    return (version[0],) + parts
+
+
+def get_cached(key):
+    return None if key is None else posts_cache.get(key)
+
+
+def set_cached(key, body):
+    if key is not None:
+        posts_cache.set(key, body)
+
+
+@on_post_change
+def clear_on_change(before, after):
+    # Entries of older versions can no longer be hit, free them right away
+    posts_cache.clear()
+
+
+@on_posts_reset
+def clear_on_reset():
+    posts_cache.clear()
@@ -0,0 +1,34 @@
+from app.pagination import SEARCH_SORT, after_search_cursor, encode_search_cursor
+from app.projection import SUMMARY_FIELDS, build_projection
+
+
+def build_search_pipeline(query, text, limit, cursor=None):
+    """Aggregation ranking the posts matching ``query`` and a $text search by relevance.
+
+    ``query`` must keep its status equality: the text index is prefixed by
+    status, so every text search has to pin it. One extra result is fetched
+    to learn whether another page follows.
+    """
+    stages = [
+        {'$match': {**query, '$text': {'$search': text}}},
+        {'$set': {'score': {'$meta': 'textScore'}}},
+    ]
+    if cursor:
+        stages.append({'$match': after_search_cursor(cursor)})
+    projection = build_projection(SUMMARY_FIELDS)
+    projection['score'] = 1
+    stages += [
+        {'$sort': SEARCH_SORT},
+        {'$limit': limit + 1},
+        {'$project': projection},
+    ]
+    return stages
+
+
+def search_page(results, limit):
+    """Split one extra result off an aggregation result into {posts, next_cursor}"""
+    next_cursor = None
+    if len(results) > limit:
+        last = results[limit - 1]
+        next_cursor = encode_search_cursor(last['score'], last['_id'])
+    return {'posts': results[:limit], 'next_cursor': next_cursor}
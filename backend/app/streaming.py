@@ -0,0 +1,52 @@
+from flask import current_app, stream_with_context
+
+from app.config import Config
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def join_chunks(pieces):
+    """Group small string pieces into writes of about STREAM_CHUNK_SIZE characters"""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= Config.STREAM_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _serialized(cursor):
+    dumps = current_app.json.dumps
+    for post in cursor.batch_size(Config.STREAM_BATCH_SIZE):
+        yield dumps(post)
+
+
+def stream_ndjson(cursor):
+    """Stream one JSON document per line while walking a PyMongo cursor of ready-to-send posts"""
+    def generate():
+        try:
+            yield from join_chunks(line + '\n' for line in _serialized(cursor))
+        finally:
+            cursor.close()
+    return current_app.response_class(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def stream_json_array(cursor):
+    """Stream a JSON array element by element while walking a PyMongo cursor of ready-to-send posts"""
+    def pieces():
+        yield '['
+        for index, item in enumerate(_serialized(cursor)):
+            yield item if index == 0 else ',' + item
+        yield ']'
+
+    def generate():
+        try:
+            yield from join_chunks(pieces())
+        finally:
+            cursor.close()
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
@@ -0,0 +1,87 @@
+import datetime
+
+from pymongo import ASCENDING
+
+from app.config import Config
+from app.pagination import encode_sync_token
+from app.post_events import on_post_change, on_posts_reset
+from app.projection import build_projection
+from repos.repos import get_meta_collection, get_posts_collection, get_tombstones_collection
+
+SYNC_RESET_ID = 'posts_sync_reset'
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _aware(moment):
+    # PyMongo returns naive UTC datetimes
+    if moment is not None and moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment
+
+
+def _is_visible(post):
+    return bool(post) and post.get('status') == 'approved'
+
+
+@on_post_change
+def record_tombstone(before, after):
+    """Remember approved posts that were deleted or moderated away, so synced clients drop them"""
+    post = after or before
+    if not post or '_id' not in post:
+        return
+    TOMBSTONES = get_tombstones_collection()
+    if _is_visible(before) and not _is_visible(after):
+        TOMBSTONES.update_one({'_id': post['_id']}, {'$set': {'deleted_at': _now()}}, upsert=True)
+    elif _is_visible(after):
+        # Approved again, it comes back through updated_at
+        TOMBSTONES.delete_one({'_id': post['_id']})
+
+
+@on_posts_reset
+def invalidate_sync_tokens():
+    """Changes too broad to list post by post: every client reloads in full"""
+    get_meta_collection().update_one({'_id': SYNC_RESET_ID}, {'$set': {'at': _now()}}, upsert=True)
+
+
+def _needs_reset(since):
+    if since < _now() - datetime.timedelta(seconds=Config.SYNC_TOMBSTONE_TTL):
+        # Tombstones that old have expired, deletions could be missed
+        return True
+    reset = get_meta_collection().find_one({'_id': SYNC_RESET_ID}) or {}
+    reset_at = _aware(reset.get('at'))
+    return reset_at is not None and since <= reset_at
+
+
+def get_changes(since, fields=None):
+    """Return approved posts changed and ids of posts removed since a sync token's time.
+
+    The window reaches SYNC_OVERLAP seconds before ``since`` so writes stamped
+    by a worker with a slightly late clock are not missed; clients receive a
+    few posts twice, which upserting by _id absorbs. ``reset`` tells the
+    client to drop its copy and reload the full listing instead.
+    """
+    now = _now()
+    response = {'posts': [], 'deleted': [], 'sync_token': encode_sync_token(now), 'reset': False}
+    if since is None or _needs_reset(since):
+        response['reset'] = True
+        return response
+
+    window = since - datetime.timedelta(seconds=Config.SYNC_OVERLAP)
+    POSTS = get_posts_collection()
+    posts = list(
+        POSTS.find({'status': 'approved', 'updated_at': {'$gt': window}}, build_projection(fields))
+        .sort('updated_at', ASCENDING)
+        .limit(Config.SYNC_MAX_CHANGES + 1)
+    )
+    if len(posts) > Config.SYNC_MAX_CHANGES:
+        # Reloading the listing is cheaper than a delta this large
+        response['reset'] = True
+        return response
+
+    TOMBSTONES = get_tombstones_collection()
+    response['posts'] = posts
+    response['deleted'] = [str(tombstone['_id']) for tombstone in TOMBSTONES.find({'deleted_at': {'$gt': window}}, {'_id': 1})]
+    return response
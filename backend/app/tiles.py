@@ -0,0 +1,77 @@
+import hashlib
+
+from flask import current_app
+
+from app.cache import LRUCache
+from app.config import Config
+from app.geo import lat_to_tile_y, lon_to_tile_x, post_point, tile_bounds, tiles_containing, within_bbox
+from app.post_events import on_post_change, on_posts_reset
+from repos.repos import get_posts_collection
+
+MAX_ZOOM = 22
+
+# Serialized tiles keyed by (zoom, x, y), each value is (body bytes, etag).
+# Writes evict tiles only in the worker that made them; the TTL bounds how long
+# the other workers keep serving a tile from before a change.
+tile_cache = LRUCache(maxsize=Config.TILE_CACHE_SIZE, ttl=Config.TILE_CACHE_TTL)
+
+# Only the properties a map marker needs
+TILE_PROJECTION = {'title': 1, 'tag': 1, 'optional_tags': 1, 'location': 1}
+
+
+def is_valid_tile(zoom, x, y):
+    return 0 <= zoom <= MAX_ZOOM and 0 <= x < 2 ** zoom and 0 <= y < 2 ** zoom
+
+
+def _feature(post, point):
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': list(point)},
+        'properties': {
+            'id': str(post['_id']),
+            'title': post.get('title'),
+            'tag': post.get('tag'),
+            'optionalTags': post.get('optional_tags', []),
+        },
+    }
+
+
+def build_tile(zoom, x, y):
+    """Query the approved posts inside a tile and serialize them as a FeatureCollection"""
+    query = {'status': 'approved', 'location': within_bbox(tile_bounds(zoom, x, y))}
+    POSTS = get_posts_collection()
+    features = []
+    for post in POSTS.find(query, TILE_PROJECTION):
+        point = post_point(post)
+        # Points on a tile edge match both neighbours, keep them in the one eviction uses
+        if point is None or (lon_to_tile_x(point[0], zoom), lat_to_tile_y(point[1], zoom)) != (x, y):
+            continue
+        features.append(_feature(post, point))
+
+    body = current_app.json.dumpb({'type': 'FeatureCollection', 'features': features}, separators=(',', ':'))
+    etag = hashlib.sha1(body).hexdigest()
+    return body, etag
+
+
+def get_tile(zoom, x, y):
+    """Return (body bytes, etag) of a tile, building it on a cache miss"""
+    key = (zoom, x, y)
+    tile = tile_cache.get(key)
+    if tile is None:
+        tile = build_tile(zoom, x, y)
+        tile_cache.set(key, tile)
+    return tile
+
+
+@on_post_change
+def evict_post_tiles(before, after):
+    """Drop only the cached tiles that contain the old or new position of a changed post"""
+    for point in (post_point(before), post_point(after)):
+        if point:
+            for key in tiles_containing(point, MAX_ZOOM):
+                tile_cache.pop(key)
+
+
+@on_posts_reset
+def clear_tiles():
+    tile_cache.clear()
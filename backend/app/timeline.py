@@ -0,0 +1,101 @@
+import datetime
+
+from app.cache import LRUCache
+from app.config import Config
+from app.post_events import on_post_change, on_posts_reset
+from repos.repos import get_posts_collection
+
+# Counts of the closed buckets, keyed by (unit, open bucket start, filters).
+# Only the bucket still open is aggregated again on each request. Writes evict
+# in the worker that made them; other workers catch up within the TTL.
+timeline_cache = LRUCache(maxsize=Config.TIMELINE_CACHE_SIZE, ttl=Config.TIMELINE_CACHE_TTL)
+
+
+def created_at_range(date_from=None, date_to=None):
+    """Return the half-open [from, to) created_at condition, or None without bounds"""
+    if not (date_from or date_to):
+        return None
+    condition = {}
+    if date_from:
+        condition['$gte'] = date_from
+    if date_to:
+        condition['$lt'] = date_to
+    return condition
+
+
+def bucket_start(moment, unit):
+    """Truncate a UTC datetime to the start of its bucket, as $dateTrunc does (weeks start on Monday)"""
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == 'week':
+        start -= datetime.timedelta(days=start.weekday())
+    elif unit == 'month':
+        start = start.replace(day=1)
+    return start
+
+
+def _aggregate(query, unit):
+    pipeline = [
+        {'$match': query},
+        {'$group': {
+            '_id': {
+                'start': {'$dateTrunc': {'date': '$created_at', 'unit': unit, 'startOfWeek': 'monday'}},
+                'tag': '$tag',
+            },
+            'count': {'$sum': 1},
+        }},
+    ]
+    buckets = {}
+    for row in get_posts_collection().aggregate(pipeline):
+        start = row['_id'].get('start')
+        if start is None:
+            continue
+        counts = buckets.setdefault(start.replace(tzinfo=None), {})
+        tag = row['_id'].get('tag') or 'untagged'
+        counts[tag] = counts.get(tag, 0) + row['count']
+    return buckets
+
+
+def _restrict(query, condition):
+    return {'$and': [query, {'created_at': condition}]}
+
+
+def get_timeline(query, unit, filter_key):
+    """Return [{start, counts, total}] per bucket in date order for the posts matching ``query``"""
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    open_start = bucket_start(now, unit)
+
+    key = (unit, open_start) + filter_key
+    closed = timeline_cache.get(key)
+    if closed is None:
+        closed = _aggregate(_restrict(query, {'$lt': open_start}), unit)
+        timeline_cache.set(key, closed)
+    buckets = dict(closed)
+    buckets.update(_aggregate(_restrict(query, {'$gte': open_start}), unit))
+
+    return [
+        {'start': start, 'counts': counts, 'total': sum(counts.values())}
+        for start, counts in sorted(buckets.items())
+    ]
+
+
+def _created_at(post):
+    created_at = (post or {}).get('created_at')
+    if not isinstance(created_at, datetime.datetime):
+        return None
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return created_at
+
+
+@on_post_change
+def evict_closed_buckets(before, after):
+    """Drop cached closed buckets a change falls into; new posts only touch the open bucket"""
+    dates = [date for date in (_created_at(before), _created_at(after)) if date]
+    if dates:
+        oldest = min(dates)
+        timeline_cache.evict(lambda key: oldest < key[1])
+
+
+@on_posts_reset
+def clear_timeline():
+    timeline_cache.clear()
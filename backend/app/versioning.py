@@ -0,0 +1,84 @@
+import datetime
+import hashlib
+import threading
+import time
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from app.config import Config
+from app.post_events import on_post_change, on_posts_reset
+from repos.repos import get_meta_collection
+
+VERSION_ID = 'posts_version'
+
+
+class PostsVersion:
+    """Change counter of the stories collection, stored in the meta collection.
+
+    Every write made through the app increments it, so (value, updated_at) is
+    a cheap stand-in for "has anything changed" that all workers agree on.
+    Reads are refreshed at most every POSTS_VERSION_CHECK_INTERVAL seconds;
+    a worker sees its own writes immediately.
+    """
+
+    def __init__(self, check_interval):
+        self.check_interval = check_interval
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self):
+        """Return (value, updated_at), or None when the counter cannot be read"""
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= self.check_interval:
+            try:
+                doc = get_meta_collection().find_one({'_id': VERSION_ID})
+            except PyMongoError as e:
+                print(f"Could not read {VERSION_ID}: {e}")
+                return None
+            with self._lock:
+                self._version = (doc['value'], doc.get('updated_at')) if doc else (0, None)
+                self._checked_at = now
+        return self._version
+
+    def bump(self):
+        doc = get_meta_collection().find_one_and_update(
+            {'_id': VERSION_ID},
+            {
+                '$inc': {'value': 1},
+                '$set': {'updated_at': datetime.datetime.now(datetime.timezone.utc)},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        with self._lock:
+            self._version = (doc['value'], doc['updated_at'])
+            self._checked_at = time.monotonic()
+
+
+posts_version = PostsVersion(Config.POSTS_VERSION_CHECK_INTERVAL)
+
+
+@on_post_change
+def bump_version_on_change(before, after):
+    posts_version.bump()
+
+
+@on_posts_reset
+def bump_version_on_reset():
+    posts_version.bump()
+
+
+def listing_validators(*key_parts):
+    """Return (etag, last_modified) for a listing response, or (None, None) if unknown.
+
+    The ETag covers the stored change counter and everything that shapes the
+    response, so it changes whenever either does.
+    """
+    version = posts_version.current()
+    if version is None:
+        return None, None
+    value, updated_at = version
+    etag = hashlib.sha1(repr((value,) + key_parts).encode('utf-8')).hexdigest()
+    return etag, updated_at
@@ -0,0 +1,75 @@
+"""Compare the stdlib and orjson JSON providers on synthetic post listings.
+
+Run from the backend directory:
+
+    python benchmarks/bench_json.py [--sizes 10000 100000] [--repeat 5]
+
+Two payload shapes are timed: raw Mongo documents (ObjectId and datetime
+values going through the provider's default hook) and projected documents
+as /api/posts returns them (plain strings, see app/projection.py).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.json_provider import JSON_PROVIDERS, orjson  # noqa: E402
+from benchmarks.synthetic import synthetic_post  # noqa: E402
+
+
+def projected(post):
+    """The response shape build_projection() produces server side"""
+    return {
+        '_id': str(post['_id']),
+        'title': post['title'],
+        'content': post['content'],
+        'location': post['location'],
+        'tag': post['tag'],
+        'optionalTags': post['optional_tags'],
+        'createdAt': post['created_at'].strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        'status': post['status'],
+    }
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    names = ['stdlib'] + (['orjson'] if orjson is not None else [])
+    if orjson is None:
+        print("orjson is not installed, timing the stdlib provider only")
+    providers = {name: JSON_PROVIDERS[name](app) for name in names}
+
+    rng = random.Random(42)
+    print(f"{'posts':>8} {'payload':>10} {'provider':>8} {'seconds':>9} {'MB':>7} {'speedup':>8}")
+    for size in args.sizes:
+        raw = [synthetic_post(rng) for _ in range(size)]
+        payloads = {'raw': raw, 'projected': [projected(post) for post in raw]}
+        for payload_name, payload in payloads.items():
+            baseline = None
+            for name, provider in providers.items():
+                body = provider.dumpb(payload, separators=(',', ':'))
+                seconds = best_time(lambda: provider.dumpb(payload, separators=(',', ':')), args.repeat)
+                baseline = baseline or seconds
+                print(f"{size:>8} {payload_name:>10} {name:>8} {seconds:>9.3f} {len(body) / 1e6:>7.1f} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
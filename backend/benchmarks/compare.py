@@ -0,0 +1,69 @@
+"""Compare two load.py reports, e.g. before and after a change.
+
+    python benchmarks/compare.py results/base.json results/head.json [--threshold 10]
+
+Prints each scenario's latency percentiles, throughput and peak worker RSS
+with the relative change, and exits with status 1 when a metric got worse by
+more than --threshold percent, so it can gate a CI job.
+"""
+import argparse
+import json
+import sys
+
+# (label, path in the scenario result, True when higher is better)
+METRICS = [
+    ('p50 ms', ('latency_ms', 'p50'), False),
+    ('p95 ms', ('latency_ms', 'p95'), False),
+    ('p99 ms', ('latency_ms', 'p99'), False),
+    ('req/s', ('throughput_rps',), True),
+    ('worker MB', ('rss', 'worker_peak_mb'), False),
+]
+
+
+def _get(result, path):
+    for key in path:
+        if not isinstance(result, dict):
+            return None
+        result = result.get(key)
+    return result
+
+
+def compare(base, head, threshold):
+    """Print the comparison table and return the regressions as (scenario, metric, change %)"""
+    regressions = []
+    print(f"base {base['meta'].get('commit')} ({base['meta'].get('stories')} stories), "
+          f"head {head['meta'].get('commit')} ({head['meta'].get('stories')} stories)")
+    for name in base['scenarios']:
+        if name not in head['scenarios']:
+            continue
+        print(name)
+        for label, path, higher_is_better in METRICS:
+            before = _get(base['scenarios'][name], path)
+            after = _get(head['scenarios'][name], path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            worse = -change if higher_is_better else change
+            flag = '  <-- worse' if worse > threshold else ''
+            if flag:
+                regressions.append((name, label, round(change, 1)))
+            print(f"  {label:>10} {before:>10} -> {after:>10} {change:+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--threshold', type=float, default=10, help='Percent a metric may get worse by')
+    args = parser.parse_args()
+
+    with open(args.base) as base_file, open(args.head) as head_file:
+        regressions = compare(json.load(base_file), json.load(head_file), args.threshold)
+    if regressions:
+        print(f"{len(regressions)} metrics worse by more than {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Local stand-ins for hCaptcha and ImgBB, so load tests never call the real services.
+
+    with FakeUpstreams(latency=0.05) as upstreams:
+        env = upstreams.environment()  # CAPTCHA_URL, CDN_API, ... for the app under test
+
+Both answer with a fixed delay, the latency the real service would add.
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, as the app's pooled session expects
+
+    def do_POST(self):
+        # Drain the form (an image upload can be several MB) before answering
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        time.sleep(self.server.latency)
+        if self.path == '/siteverify':
+            body = {'success': True, 'hostname': 'bench.test'}
+        elif self.path == '/1/upload':
+            image_id = uuid.uuid4().hex
+            body = {'success': True, 'data': {'url': f'http://imgbb.bench.test/{image_id}.webp'}}
+        else:
+            self.send_error(404)
+            return
+        with self.server.lock:
+            self.server.counts[self.path] = self.server.counts.get(self.path, 0) + 1
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeUpstreams:
+    """hCaptcha /siteverify and ImgBB /1/upload on one local port"""
+
+    def __init__(self, latency=0.0, host='127.0.0.1', port=0):
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.counts = {}
+        self.server.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.server.serve_forever, name='fake-upstreams', daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def counts(self):
+        """Requests answered per path"""
+        with self.server.lock:
+            return dict(self.server.counts)
+
+    def environment(self):
+        return {
+            'CAPTCHA_URL': f'{self.url}/siteverify',
+            'CAPTCHA_SECRET_KEY': 'bench-secret',
+            'CDN_API': f'{self.url}/1/upload',
+            'CDN_KEY': 'bench-key',
+            'IMAGE_UPLOADER': 'imgbb',
+        }
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the fake hCaptcha and ImgBB servers until interrupted')
+    parser.add_argument('--port', type=int, default=8999)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every answer')
+    args = parser.parse_args()
+    with FakeUpstreams(args.latency, port=args.port) as upstreams:
+        for name, value in upstreams.environment().items():
+            print(f'export {name}={value}')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,405 @@
+"""Load-test /api/posts and /api/posts/create against seeded data and fake upstreams.
+
+Run from the backend directory, against a local mongod:
+
+    python benchmarks/seed.py --count 100000 --drop    # or 10000, 1000000
+    python benchmarks/load.py --concurrency 16 --duration 30 --output benchmarks/results/$(git rev-parse --short HEAD).json
+
+or against a throwaway in-memory mongod (needs `pip install pymongo_inmemory`):
+
+    python benchmarks/load.py --memory --seed-count 10000
+
+The app runs under gunicorn.conf.py (or the threaded Werkzeug server with
+--server werkzeug) with hCaptcha and ImgBB replaced by benchmarks/fake_upstreams.py.
+Each scenario keeps --concurrency requests in flight for --duration seconds
+after a short warm-up. The JSON report holds p50/p95/p99 latency, throughput
+and the server processes' RSS per scenario; compare two reports with
+benchmarks/compare.py.
+
+The list_* filter scenarios ask for format=array, every matching story at
+once, as the map's fetchPosts does; list_page walks the default paged mode
+with the same filters. Listing responses are cached per process
+(app/query_cache.py), so the fixed-filter scenarios mostly measure cache
+hits; the viewport scenario asks for a random map area each time.
+"""
+import argparse
+import datetime
+import io
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.fake_upstreams import FakeUpstreams  # noqa: E402
+from benchmarks.seed import DEFAULT_URI, seed  # noqa: E402
+from benchmarks.synthetic import OPTIONAL_TAGS, WORDS, canada_extent  # noqa: E402
+from schemas.schema import TagSchema  # noqa: E402
+
+SCENARIOS = ['list', 'list_tag', 'list_optional_tags', 'list_tag_optional_tags', 'list_page', 'list_viewport', 'create', 'create_image']
+
+
+def tag_filters():
+    """The tag / optionalTags combinations TagSchema accepts: no tag or one of its choices, zero to two optional tags"""
+    tags = [None] + list(TagSchema().fields['tag'].validate.choices)
+    optional = [[]] + [[tag] for tag in OPTIONAL_TAGS[:3]] + [list(pair) for pair in itertools.combinations(OPTIONAL_TAGS[:3], 2)]
+    return [(tag, optional_tags) for tag in tags for optional_tags in optional]
+
+
+def _listing_params(tag, optional_tags, listing_format='array'):
+    # frontend/src/services/postService.ts fetchPosts loads the map with format=array
+    params = {'format': listing_format}
+    if tag:
+        params['tag'] = tag
+    if optional_tags:
+        params['optionalTags'] = optional_tags
+    return params
+
+
+def _sample_image():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (1200, 900), (40, 120, 180)).save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue()
+
+
+class Scenario:
+    """Builds the next request of a scenario; ``rng`` is per client thread"""
+
+    def __init__(self, name, base_url, host_header):
+        self.name = name
+        self.base_url = base_url
+        self.host_header = host_header
+        wants_tag = name in ('list_tag', 'list_tag_optional_tags')
+        wants_optional_tags = name in ('list_optional_tags', 'list_tag_optional_tags')
+        self.filters = tag_filters() if name == 'list_page' else [
+            (tag, optional_tags) for tag, optional_tags in tag_filters()
+            if bool(tag) == wants_tag and bool(optional_tags) == wants_optional_tags
+        ]
+        self.tags = [tag for tag, _ in tag_filters() if tag]
+        self.extent = canada_extent()
+        self.image = _sample_image() if name == 'create_image' else None
+
+    def request(self, session, rng):
+        if self.name.startswith('create'):
+            return self._create(session, rng)
+        if self.name == 'list_viewport':
+            bbox, zoom = self._viewport(rng)
+            return session.get(f'{self.base_url}/api/posts', params={'bbox': bbox, 'zoom': zoom})
+        if self.name == 'list_page':
+            # First page of the paged API mode, for clients other than the map
+            return session.get(f'{self.base_url}/api/posts', params=_listing_params(*rng.choice(self.filters), 'page'))
+        return session.get(f'{self.base_url}/api/posts', params=_listing_params(*rng.choice(self.filters)))
+
+    def _viewport(self, rng):
+        # A zoom 5-8 map window somewhere over Canada
+        zoom = rng.randint(5, 8)
+        width = 360 / 2 ** zoom * 4
+        height = width / 2
+        min_lon, min_lat, max_lon, max_lat = self.extent
+        lon = rng.uniform(min_lon, max_lon - width)
+        lat = rng.uniform(min_lat, max_lat - height)
+        return f'{lon:.4f},{lat:.4f},{lon + width:.4f},{lat + height:.4f}', zoom
+
+    def _create(self, session, rng):
+        min_lon, min_lat, max_lon, max_lat = self.extent
+        post = {
+            'title': ' '.join(rng.choices(WORDS, k=5)),
+            'content': {'description': ' '.join(rng.choices(WORDS, k=60))},
+            'location': {'type': 'Point', 'coordinates': [rng.uniform(min_lon, max_lon), rng.uniform(min_lat, max_lat)]},
+            'tag': rng.choice(self.tags),
+            'optionalTags': rng.sample(OPTIONAL_TAGS, rng.randrange(4)),
+            'captchaToken': 'bench-token',
+        }
+        files = {'image': ('bench.jpg', self.image, 'image/jpeg')} if self.image else None
+        # A non-localhost Host makes the app verify the captcha (against the fake server)
+        return session.post(
+            f'{self.base_url}/api/posts/create',
+            data={'postData': json.dumps(post)},
+            files=files,
+            headers={'Host': self.host_header},
+        )
+
+
+def percentile(ordered, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def _process_rss(pid):
+    """Resident set size in bytes from /proc (Linux), None elsewhere"""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def _children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children:
+            return [int(child) for child in children.read().split()]
+    except OSError:
+        return []
+
+
+class RssSampler:
+    """Samples the RSS of the server and its worker processes while a scenario runs"""
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.peaks = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        rss = {}
+        for pid in [self.pid] + _children(self.pid):
+            value = _process_rss(pid)
+            if value is not None:
+                rss[pid] = value
+        return rss
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = self._sample()
+            for pid, value in rss.items():
+                self.peaks[pid] = max(self.peaks.get(pid, 0), value)
+            self.peaks['total'] = max(self.peaks.get('total', 0), sum(rss.values()))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def report(self):
+        if not self.peaks:
+            return None
+        workers = [value for pid, value in self.peaks.items() if pid not in ('total', self.pid)]
+        return {
+            'total_peak_mb': round(self.peaks['total'] / 2 ** 20, 1),
+            'main_process_peak_mb': round(self.peaks.get(self.pid, 0) / 2 ** 20, 1),
+            'worker_peak_mb': round(max(workers) / 2 ** 20, 1) if workers else None,
+            'workers': len(workers),
+        }
+
+
+def run_scenario(scenario, concurrency, duration, warmup, server_pid):
+    """Keep ``concurrency`` requests in flight for ``duration`` seconds and summarize them"""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    measuring = threading.Event()
+    deadline = [time.monotonic() + warmup + duration]
+
+    def client(index):
+        rng = random.Random(index)
+        session = requests.Session()
+        own_latencies = []
+        own_statuses = {}
+        while time.monotonic() < deadline[0]:
+            start = time.perf_counter()
+            try:
+                status = scenario.request(session, rng).status_code
+            except requests.RequestException:
+                status = 'error'
+            elapsed = time.perf_counter() - start
+            if measuring.is_set():
+                own_latencies.append(elapsed)
+                own_statuses[status] = own_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(own_latencies)
+            for status, count in own_statuses.items():
+                statuses[str(status)] = statuses.get(str(status), 0) + count
+
+    threads = [threading.Thread(target=client, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    time.sleep(warmup)
+    with RssSampler(server_pid) as sampler:
+        measuring.set()
+        started = time.monotonic()
+        deadline[0] = started + duration
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.startswith('2'))
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'statuses': statuses,
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': _ms(percentile(latencies, 50)),
+            'p95': _ms(percentile(latencies, 95)),
+            'p99': _ms(percentile(latencies, 99)),
+            'mean': _ms(sum(latencies) / len(latencies) if latencies else None),
+            'max': _ms(latencies[-1] if latencies else None),
+        },
+        'rss': sampler.report(),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def start_server(args, mongo_uri, upstream_env, port, log_file):
+    env = dict(
+        os.environ,
+        **upstream_env,
+        MONGODB_URI=mongo_uri,
+        SECRET_KEY=os.getenv('SECRET_KEY', 'bench-secret-key'),
+        PORT=str(port),
+        SYNC_INDEXES_ON_STARTUP='false',  # seed.py built them
+        GUNICORN_ACCESSLOG=os.devnull,
+    )
+    if args.workers:
+        env['WEB_CONCURRENCY'] = str(args.workers)
+    if args.worker_class:
+        env['GUNICORN_WORKER_CLASS'] = args.worker_class
+    if args.threads:
+        env['GUNICORN_THREADS'] = str(args.threads)
+    if args.server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}', 'wsgi:app']
+    else:
+        command = [sys.executable, '-c', f"from wsgi import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+
+def wait_until_ready(base_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'The server exited with code {process.returncode}')
+        try:
+            if requests.get(f'{base_url}/api/health/ready', timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f'The server was not ready after {timeout}s')
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args, mongo_uri):
+    if args.seed_count:
+        print(f'Seeding {args.seed_count} stories')
+        seed(mongo_uri, args.seed_count, drop=True)
+    from pymongo import MongoClient
+
+    with MongoClient(mongo_uri) as client:
+        story_count = client.get_default_database().stories.estimated_document_count()
+
+    log_file = tempfile.NamedTemporaryFile(prefix='bench-server-', suffix='.log', delete=False)
+    base_url = f'http://127.0.0.1:{args.port}'
+    with FakeUpstreams(args.upstream_latency) as upstreams:
+        server = start_server(args, mongo_uri, upstreams.environment(), args.port, log_file)
+        try:
+            wait_until_ready(base_url, server)
+            results = {}
+            for name in args.scenarios:
+                print(f'{name}: {args.concurrency} clients for {args.duration}s')
+                scenario = Scenario(name, base_url, f'bench.test:{args.port}')
+                results[name] = run_scenario(scenario, args.concurrency, args.duration, args.warmup, server.pid)
+                latency = results[name]['latency_ms']
+                print(f"  {results[name]['throughput_rps']} req/s, p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+                      f"p99 {latency['p99']} ms, {results[name]['errors']} errors")
+        except Exception:
+            print(f'Server log: {log_file.name}')
+            raise
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        upstream_counts = upstreams.counts
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'stories': story_count,
+            'server': args.server,
+            'workers': args.workers,
+            'worker_class': args.worker_class,
+            'threads': args.threads,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'upstream_latency': args.upstream_latency,
+        },
+        'scenarios': results,
+        'upstream_requests': upstream_counts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--uri', default=os.getenv('BENCH_MONGODB_URI', DEFAULT_URI), help='Must name the database')
+    parser.add_argument('--memory', action='store_true', help='Run a throwaway mongod through pymongo_inmemory')
+    parser.add_argument('--seed-count', type=int, default=0, help='Replace the stories with this many first')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds per scenario')
+    parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds per scenario')
+    parser.add_argument('--server', choices=['gunicorn', 'werkzeug'], default='gunicorn')
+    parser.add_argument('--workers', type=int, help='WEB_CONCURRENCY, gunicorn.conf.py picks one by default')
+    parser.add_argument('--worker-class', choices=['sync', 'gthread', 'gevent'])
+    parser.add_argument('--threads', type=int)
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--upstream-latency', type=float, default=0.05, help='Seconds the fake hCaptcha/ImgBB take to answer')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    if args.memory:
+        try:
+            from pymongo_inmemory import Mongod
+        except ImportError:
+            parser.error('--memory needs pymongo_inmemory (pip install pymongo_inmemory)')
+        with Mongod() as mongod:
+            report = run(args, f"{mongod.connection_string.rstrip('/')}/climate_stories_bench")
+    else:
+        report = run(args, args.uri)
+
+    body = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as output:
+            output.write(body + '\n')
+        print(f'Report written to {args.output}')
+    else:
+        print(body)
+
+
+if __name__ == '__main__':
+    main()
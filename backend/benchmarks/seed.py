@@ -0,0 +1,73 @@
+"""Fill a MongoDB database with synthetic approved stories spread over Canada.
+
+Run from the backend directory:
+
+    python benchmarks/seed.py --count 100000 [--uri mongodb://127.0.0.1:27017/climate_stories_bench] [--drop]
+
+The same --seed always produces the same stories. The declared indexes
+(repos/repos.py) are built once the documents are in, which is faster than
+maintaining them insert by insert.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402,F401  (app/__init__ imports repos.repos, which cannot be imported first)
+from benchmarks.synthetic import canada_extent, synthetic_post  # noqa: E402
+from repos.repos import INDEXES  # noqa: E402
+
+DEFAULT_URI = 'mongodb://127.0.0.1:27017/climate_stories_bench'
+# Collections holding data derived from the stories, stale once the stories are replaced
+DERIVED_COLLECTIONS = ['post_facets', 'post_tombstones', 'meta', 'image_jobs', 'image_hashes']
+
+
+def seed(uri, count, batch_size=10_000, seed_value=42, drop=False):
+    """Insert ``count`` stories and build the indexes, return the seconds taken per phase"""
+    client = MongoClient(uri)
+    db = client.get_default_database()
+    if drop:
+        for name in ['stories'] + DERIVED_COLLECTIONS:
+            db.drop_collection(name)
+
+    rng = random.Random(seed_value)
+    extent = canada_extent()
+    timings = {}
+    start = time.perf_counter()
+    inserted = 0
+    while inserted < count:
+        batch = [synthetic_post(rng, extent) for _ in range(min(batch_size, count - inserted))]
+        db.stories.insert_many(batch, ordered=False)
+        inserted += len(batch)
+        print(f"\r{inserted}/{count} stories", end='', flush=True)
+    print()
+    timings['insert_seconds'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for collection_name, models in INDEXES.items():
+        db[collection_name].create_indexes(models)
+    timings['index_seconds'] = time.perf_counter() - start
+    client.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--uri', default=os.getenv('BENCH_MONGODB_URI', DEFAULT_URI), help='Must name the database')
+    parser.add_argument('--count', type=int, default=10_000)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--drop', action='store_true', help='Drop the stories and derived collections first')
+    args = parser.parse_args()
+
+    timings = seed(args.uri, args.count, args.batch_size, args.seed, args.drop)
+    print(f"Inserted {args.count} stories in {timings['insert_seconds']:.1f}s, indexes built in {timings['index_seconds']:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Synthetic stories shared by the benchmarks, reproducible from a seed."""
+import datetime
+import json
+import os
+
+from bson.objectid import ObjectId
+
+TAGS = ['Positive', 'Neutral', 'Negative']
+# Optional tags are free text (at most 3 per story); a few are far more common than the rest
+OPTIONAL_TAGS = ['Wildfire', 'Flooding', 'Heat', 'Drought', 'Storm', 'Erosion', 'Permafrost', 'Smoke', 'Ice', 'Coast']
+OPTIONAL_TAG_WEIGHTS = [30, 20, 15, 10, 8, 6, 4, 3, 2, 2]
+WORDS = 'the river rose higher than any spring we remember and the road to town was closed for weeks'.split()
+
+CANADA_GEOJSON = os.path.join(os.path.dirname(__file__), '..', '..', 'frontend', 'public', 'canada.geojson')
+# Bounding box of canada.geojson, used when the file is not there
+CANADA_EXTENT = (-141.005564, 41.669086, -52.616607, 83.116523)
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _coordinates(value):
+    if value and isinstance(value[0], (int, float)):
+        yield value
+    else:
+        for item in value:
+            yield from _coordinates(item)
+
+
+def canada_extent(path=CANADA_GEOJSON):
+    """(min_lon, min_lat, max_lon, max_lat) of the map's Canada outline"""
+    try:
+        with open(path) as geojson_file:
+            collection = json.load(geojson_file)
+    except OSError:
+        return CANADA_EXTENT
+    points = [point for feature in collection['features'] for point in _coordinates(feature['geometry']['coordinates'])]
+    lons = [point[0] for point in points]
+    lats = [point[1] for point in points]
+    return (min(lons), min(lats), max(lons), max(lats))
+
+
+def synthetic_post(rng, extent=CANADA_EXTENT):
+    """A stored story as /api/posts/create writes it, spread uniformly over ``extent``"""
+    min_lon, min_lat, max_lon, max_lat = extent
+    created_at = START + datetime.timedelta(minutes=rng.randrange(10 ** 6))
+    optional_tags = set(rng.choices(OPTIONAL_TAGS, OPTIONAL_TAG_WEIGHTS, k=rng.randrange(4)))
+    return {
+        '_id': ObjectId(rng.randbytes(12)),
+        'title': ' '.join(rng.choices(WORDS, k=5)),
+        'content': {'description': ' '.join(rng.choices(WORDS, k=60)), 'image': None},
+        'location': {'type': 'Point', 'coordinates': [rng.uniform(min_lon, max_lon), rng.uniform(min_lat, max_lat)]},
+        'tag': rng.choice(TAGS),
+        'optional_tags': sorted(optional_tags),
+        'status': 'approved',
+        'created_at': created_at,
+        'updated_at': created_at,
+    }
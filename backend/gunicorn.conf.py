@@ -0,0 +1,108 @@
+"""Production gunicorn settings, loaded automatically when gunicorn starts in this directory.
+
+Everything can be overridden from the environment:
+
+    WEB_CONCURRENCY          worker processes (default: from the CPUs available)
+    GUNICORN_WORKER_CLASS    gthread (default), sync or gevent
+    GUNICORN_THREADS         threads per gthread worker (default 8)
+    GUNICORN_CONNECTIONS     concurrent requests per gevent worker (default 200)
+    GUNICORN_MAX_WORKERS     cap on the automatic worker count (default 8)
+    GUNICORN_PRELOAD         load the app once in the master and fork it (default true, always false for gevent)
+    LIVE_MAX_CLIENTS         live streams per worker (default: from the threads or connections)
+
+Requests mostly wait on Mongo, hCaptcha and ImgBB, and /api/posts/stream
+keeps a connection open for minutes, so threads (or greenlets) per worker
+go further than more sync workers. Sync workers serve one request at a
+time, so they get no live clients.
+"""
+import os
+
+wsgi_app = 'wsgi:app'
+
+
+def _cpu_count():
+    try:
+        # CPUs this container may actually use, not the host's
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _gevent_available():
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+cpus = _cpu_count()
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent' and not _gevent_available():
+    print("gevent is not installed, using gthread workers")
+    worker_class = 'gthread'
+
+threads = int(os.getenv('GUNICORN_THREADS', '8')) if worker_class == 'gthread' else 1
+worker_connections = int(os.getenv('GUNICORN_CONNECTIONS', '200'))
+
+if worker_class == 'sync':
+    # The classic 2 x CPUs + 1: one request per process, CPU idle while it waits
+    default_workers = 2 * cpus + 1
+else:
+    # Concurrency comes from threads or greenlets; one process per CPU plus a spare
+    default_workers = cpus + 1
+workers = int(os.getenv('WEB_CONCURRENCY', str(min(default_workers, int(os.getenv('GUNICORN_MAX_WORKERS', '8'))))))
+
+# Share the imported app and its caches' code pages between workers;
+# the Mongo client is replaced in each worker (post_worker_init below)
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+if worker_class == 'gevent' and preload_app:
+    # The gevent worker monkey-patches sockets, ssl and locks when it starts; pymongo,
+    # requests and ssl imported before that in the master would keep the blocking
+    # versions, stall the hub and can deadlock pymongo's pool. Load the app in each worker.
+    print("gevent workers load the app themselves, GUNICORN_PRELOAD is ignored")
+    preload_app = False
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '10000')}")
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+# Recycle workers now and then so slow leaks never add up
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '1000'))
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+
+# Set before the app (and app.config) is imported.
+# One pooled connection per request a worker can serve at once, plus the image
+# upload threads, the live feed and a little headroom
+concurrency = worker_connections if worker_class == 'gevent' else threads
+os.environ.setdefault('MONGO_MAX_POOL_SIZE', str(min(concurrency, 100) + int(os.getenv('IMAGE_WORKERS', '2')) + 2))
+# Every /api/posts/stream client holds a thread (or greenlet) for up to LIVE_MAX_DURATION:
+# leave at least half of them to ordinary requests, and none to streams on sync workers,
+# whose clients then poll /api/posts/changes instead
+if worker_class == 'sync':
+    live_clients = 0
+else:
+    live_clients = concurrency // 2
+os.environ.setdefault('LIVE_MAX_CLIENTS', str(live_clients))
+# Image workers are started per worker process after the fork, never in the master
+os.environ.setdefault('START_IMAGE_WORKERS', 'false')
+
+
+def when_ready(server):
+    server.log.info(f"{workers} {worker_class} workers, {threads} threads each, preload {preload_app}")
+    if preload_app:
+        # The master only forks from now on: drop its connections before any child copies them
+        from app.extensions import mongo
+        mongo.cx.close()
+
+
+def post_worker_init(worker):
+    from app.extensions import reconnect_mongo
+    from app.image_jobs import start_image_workers
+
+    app = worker.wsgi
+    if worker.cfg.preload_app:
+        reconnect_mongo(app)
+    start_image_workers(app)
@@ -0,0 +1,133 @@
+import datetime
+import json
+from itertools import islice
+
+from marshmallow import EXCLUDE, ValidationError
+from pymongo.errors import BulkWriteError
+
+from repos.repos import get_posts_collection
+from schemas.schema import PostSchema
+
+# Admins import without a captcha, and partner datasets carry extra properties we ignore
+import_schema = PostSchema(exclude=('captchaToken',), unknown=EXCLUDE)
+
+
+def _feature_to_post(feature):
+    post = dict(feature.get('properties') or {})
+    post['location'] = feature.get('geometry')
+    return post
+
+
+def _expand(document):
+    """Yield the story records in a parsed JSON document"""
+    if isinstance(document, list):
+        for item in document:
+            yield from _expand(item)
+    elif isinstance(document, dict) and document.get('type') == 'FeatureCollection':
+        for feature in document.get('features') or []:
+            yield _feature_to_post(feature)
+    elif isinstance(document, dict) and document.get('type') == 'Feature':
+        yield _feature_to_post(document)
+    else:
+        yield document
+
+
+def read_import_records(stream):
+    """Yield story records from NDJSON, a GeoJSON FeatureCollection or a JSON array.
+
+    NDJSON is read line by line; anything else is parsed as one JSON document.
+    A line that does not parse is yielded as a ValidationError for that record.
+    """
+    first = stream.readline()
+    while first and not first.strip():
+        first = stream.readline()
+    if not first:
+        return
+
+    try:
+        document = json.loads(first)
+    except ValueError:
+        # Not one record per line: a pretty-printed FeatureCollection or array
+        try:
+            document = json.loads(first + stream.read())
+        except ValueError as e:
+            yield ValidationError(f'Invalid JSON: {e}')
+            return
+        yield from _expand(document)
+        return
+
+    yield from _expand(document)
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield from _expand(json.loads(line))
+        except ValueError as e:
+            yield ValidationError(f'Invalid JSON: {e}')
+
+
+def build_import_document(record, default_status, now):
+    """Validate a record with PostSchema and return the document create() would have inserted"""
+    if not isinstance(record, dict):
+        raise ValidationError('Record must be a JSON object')
+    data = import_schema.load(record)
+    created_at = data.pop('createdAt', None) or now
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+    data['created_at'] = created_at
+    data['updated_at'] = now
+    data['optional_tags'] = data.pop('optionalTags', [])
+    if 'status' not in record:
+        data['status'] = default_status
+    return data
+
+
+def import_posts(records, batch_size=1000, default_status='approved', max_errors=1000, on_batch=None):
+    """Validate and insert story records with unordered insert_many chunks.
+
+    Invalid records (PostSchema checks the location is a GeoJSON Point) and
+    documents MongoDB still rejects are skipped and reported by their 0-based position in the input; the
+    rest of the chunk is still inserted. Returns a summary dict.
+    """
+    POSTS = get_posts_collection()
+    received = inserted = failed = 0
+    errors = []
+
+    def fail(position, message):
+        nonlocal failed
+        failed += 1
+        if len(errors) < max_errors:
+            errors.append({'record': position, 'errors': message})
+
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            break
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        documents = []
+        positions = []
+        for offset, record in enumerate(chunk):
+            position = received + offset
+            try:
+                if isinstance(record, ValidationError):
+                    raise record
+                documents.append(build_import_document(record, default_status, now))
+                positions.append(position)
+            except ValidationError as e:
+                fail(position, e.messages)
+        received += len(chunk)
+
+        if documents:
+            try:
+                inserted += len(POSTS.insert_many(documents, ordered=False).inserted_ids)
+            except BulkWriteError as e:
+                inserted += e.details.get('nInserted', 0)
+                for write_error in e.details.get('writeErrors', []):
+                    fail(positions[write_error['index']], write_error.get('errmsg'))
+
+        if on_batch:
+            on_batch(received, inserted, failed)
+
+    return {'received': received, 'inserted': inserted, 'failed': failed, 'errors': errors}
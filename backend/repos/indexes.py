@@ -0,0 +1,138 @@
+from pymongo.errors import ConnectionFailure, PyMongoError
+
+from app.extensions import mongo
+from repos.repos import INDEXES
+
+
+def _key_spec(model):
+    """Declared keys as index_information() reports them: text fields become _fts/_ftsx"""
+    keys = []
+    for field, kind in model.document['key'].items():
+        if kind == 'text':
+            if ('_fts', 'text') not in keys:
+                keys += [('_fts', 'text'), ('_ftsx', 1)]
+        else:
+            keys.append((field, kind))
+    return keys
+
+
+def _same_keys(model, info):
+    if [tuple(part) for part in info['key']] != _key_spec(model):
+        return False
+    text_fields = {field for field, kind in model.document['key'].items() if kind == 'text'}
+    return not text_fields or set(info.get('weights') or {}) == text_fields
+
+
+def _same_options(model, info):
+    """Whether the options the model declares (unique, expireAfterSeconds, weights, ...) match"""
+    options = {key: value for key, value in model.document.items() if key not in ('key', 'name')}
+    return all(
+        (dict(info.get(key) or {}) == dict(value)) if key == 'weights' else info.get(key) == value
+        for key, value in options.items()
+    )
+
+
+def sync_indexes():
+    """Create every declared index that does not exist yet.
+
+    Returns {'created': [...], 'existing': [...], 'conflicting': [...]} of
+    collection.name entries. An index is conflicting when its name or keys are
+    already taken with another definition; it is left for an operator to
+    drop, as MongoDB would refuse to create it.
+    """
+    result = {'created': [], 'existing': [], 'conflicting': []}
+    for collection_name, models in INDEXES.items():
+        collection = mongo.db[collection_name]
+        try:
+            existing = collection.index_information()
+        except ConnectionFailure as e:
+            # No point trying the other collections against an unreachable server
+            print(f"Could not sync indexes, MongoDB is unreachable: {e}")
+            return result
+        except PyMongoError as e:
+            print(f"Could not read indexes of {collection_name}: {e}")
+            continue
+
+        for model in models:
+            name = model.document['name']
+            qualified = f"{collection_name}.{name}"
+            same_name = existing.get(name)
+            same_keys = [other for other, info in existing.items() if other != name and _same_keys(model, info)]
+            if same_name and _same_keys(model, same_name) and _same_options(model, same_name):
+                result['existing'].append(qualified)
+                continue
+            if same_name or same_keys:
+                result['conflicting'].append(qualified)
+                other = name if same_name else same_keys[0]
+                print(f"Index {qualified} conflicts with the existing index {collection_name}.{other}, drop it to rebuild")
+                continue
+            try:
+                collection.create_indexes([model])
+                result['created'].append(qualified)
+            except ConnectionFailure as e:
+                print(f"Could not sync indexes, MongoDB is unreachable: {e}")
+                return result
+            except PyMongoError as e:
+                print(f"Could not create index {qualified}: {e}")
+    return result
+
+
+def check_indexes():
+    """Compare the declared indexes with the database.
+
+    Returns {collection: {'missing': [...], 'undeclared': [...], 'unused': [...]}}
+    where unused lists indexes with no recorded access in $indexStats since the
+    server started.
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = mongo.db[collection_name]
+        result = {'missing': [], 'undeclared': [], 'unused': []}
+        report[collection_name] = result
+        try:
+            existing = collection.index_information()
+        except ConnectionFailure as e:
+            print(f"Could not check indexes, MongoDB is unreachable: {e}")
+            return {}
+        except PyMongoError as e:
+            print(f"Could not read indexes of {collection_name}: {e}")
+            continue
+
+        for model in models:
+            if not any(_same_keys(model, info) for info in existing.values()):
+                result['missing'].append(model.document['name'])
+        for name, info in existing.items():
+            if name != '_id_' and not any(_same_keys(model, info) for model in models):
+                result['undeclared'].append(name)
+
+        try:
+            for stats in collection.aggregate([{'$indexStats': {}}]):
+                if stats['name'] != '_id_' and stats['accesses']['ops'] == 0:
+                    result['unused'].append(stats['name'])
+        except PyMongoError as e:
+            # Some hosted tiers do not allow $indexStats
+            print(f"Could not read $indexStats of {collection_name}: {e}")
+    return report
+
+
+def log_sync_report(result):
+    """Print what sync_indexes did and return whether no declared index conflicts"""
+    for name in result['created']:
+        print(f"Created index {name}")
+    print(f"{len(result['created'])} indexes created, {len(result['existing'])} already existed, "
+          f"{len(result['conflicting'])} conflicting")
+    return not result['conflicting']
+
+
+def log_index_report(report):
+    """Print the problems found by check_indexes and return whether all declared indexes exist"""
+    healthy = True
+    for collection_name, result in report.items():
+        for name in result['missing']:
+            healthy = False
+            print(f"Missing index {collection_name}.{name}, queries on it will scan the collection")
+        for name in result['undeclared']:
+            print(f"Index {collection_name}.{name} exists but is not declared in repos.INDEXES")
+        for name in result['unused']:
+            print(f"Index {collection_name}.{name} has not been used since the server started")
+    return healthy
@@ -0,0 +1,100 @@
+import datetime
+
+from pymongo import ASCENDING, UpdateOne
+
+from repos.repos import get_meta_collection, get_posts_collection
+
+NORMALIZE_PROGRESS_ID = 'normalize_posts'
+
+# Stories still in a legacy shape: camelCase fields, string or missing dates, no optional_tags
+LEGACY_POSTS_QUERY = {'$or': [
+    {'createdAt': {'$exists': True}},
+    {'optionalTags': {'$exists': True}},
+    {'created_at': {'$not': {'$type': 'date'}}},
+    {'optional_tags': {'$exists': False}},
+]}
+
+
+def _parse_date(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return None
+
+
+def normalize_post(post):
+    """Return the update that brings a story to the canonical shape, or None if it already is"""
+    to_set = {}
+    to_unset = {}
+
+    created_at = post.get('created_at')
+    if not isinstance(created_at, datetime.datetime):
+        # Fall back to the insert time encoded in the ObjectId rather than "now"
+        to_set['created_at'] = (
+            _parse_date(created_at)
+            or _parse_date(post.get('createdAt'))
+            or post['_id'].generation_time
+        )
+    if 'createdAt' in post:
+        to_unset['createdAt'] = ''
+
+    if not isinstance(post.get('optional_tags'), list):
+        legacy_tags = post.get('optionalTags')
+        to_set['optional_tags'] = legacy_tags if isinstance(legacy_tags, list) else []
+    if 'optionalTags' in post:
+        to_unset['optionalTags'] = ''
+
+    update = {}
+    if to_set:
+        update['$set'] = to_set
+    if to_unset:
+        update['$unset'] = to_unset
+    return update or None
+
+
+def normalize_posts(batch_size=500, start_after=None, resume=False, on_batch=None):
+    """Normalize legacy stories in place, in _id order and in bulk_write chunks.
+
+    Progress is saved in the meta collection after every chunk, so an
+    interrupted run continues where it stopped with ``resume=True``.
+    Returns (scanned, modified).
+    """
+    POSTS = get_posts_collection()
+    META = get_meta_collection()
+
+    if resume and start_after is None:
+        progress = META.find_one({'_id': NORMALIZE_PROGRESS_ID}) or {}
+        start_after = progress.get('last_id')
+
+    scanned = modified = 0
+    while True:
+        query = LEGACY_POSTS_QUERY
+        if start_after is not None:
+            query = {'$and': [{'_id': {'$gt': start_after}}, LEGACY_POSTS_QUERY]}
+        batch = list(POSTS.find(query).sort('_id', ASCENDING).limit(batch_size))
+        if not batch:
+            break
+
+        operations = []
+        for post in batch:
+            update = normalize_post(post)
+            if update:
+                operations.append(UpdateOne({'_id': post['_id']}, update))
+        if operations:
+            modified += POSTS.bulk_write(operations, ordered=False).modified_count
+
+        scanned += len(batch)
+        start_after = batch[-1]['_id']
+        META.update_one(
+            {'_id': NORMALIZE_PROGRESS_ID},
+            {'$set': {'last_id': start_after, 'updated_at': datetime.datetime.now(datetime.timezone.utc)}},
+            upsert=True
+        )
+        if on_batch:
+            on_batch(scanned, modified, start_after)
+
+    return scanned, modified
@@ -1,3 +1,6 @@
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, IndexModel
+
+from app.config import Config
 from app.extensions import mongo
 
 
@@ -9,3 +12,51 @@ def get_users_collection():
 
 def get_tags_collection():
     return mongo.db.approved_tags
+
+def get_meta_collection():
+    return mongo.db.meta
+
+def get_image_jobs_collection():
+    return mongo.db.image_jobs
+
+def get_image_hashes_collection():
+    return mongo.db.image_hashes
+
+def get_facets_collection():
+    return mongo.db.post_facets
+
+def get_tombstones_collection():
+    return mongo.db.post_tombstones
+
+# Indexes each collection needs, kept in sync by repos.indexes (`flask indexes sync`)
+INDEXES = {
+    'stories': [
+        # Tag filters of the public listing, newest first
+        IndexModel([('status', ASCENDING), ('tag', ASCENDING), ('created_at', DESCENDING)],
+                   name='status_tag_created_at'),
+        # Keyset pagination sort (created_at, _id)
+        IndexModel([('status', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+                   name='status_created_at_id'),
+        # Multikey index for optionalTags $all filters
+        IndexModel([('optional_tags', ASCENDING)], name='optional_tags'),
+        # bbox viewport, cluster and tile queries
+        IndexModel([('location', GEOSPHERE)], name='location_2dsphere'),
+        # /api/posts/search; the status prefix limits each search to approved posts' index entries
+        IndexModel([('status', ASCENDING), ('title', TEXT), ('content.description', TEXT)],
+                   name='status_title_description_text', weights={'title': 3, 'content.description': 1}),
+        # /api/posts/changes delta sync
+        IndexModel([('status', ASCENDING), ('updated_at', ASCENDING)], name='status_updated_at'),
+    ],
+    'post_tombstones': [
+        # Delta sync deletions, expired once no valid sync token can reach them
+        IndexModel([('deleted_at', ASCENDING)], name='deleted_at_ttl', expireAfterSeconds=Config.SYNC_TOMBSTONE_TTL),
+    ],
+    'image_jobs': [
+        # Workers claim the oldest due job
+        IndexModel([('status', ASCENDING), ('next_attempt_at', ASCENDING)], name='status_next_attempt_at'),
+    ],
+    'users': [
+        # Auth.verify_user login lookups
+        IndexModel([('username', ASCENDING)], name='username_unique', unique=True),
+    ],
+}
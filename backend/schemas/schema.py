@@ -1,18 +1,204 @@
-from marshmallow import Schema, fields, validate
+from marshmallow import Schema, ValidationError, fields, validate
+
+# The app package imports this module (app -> schemas), so nothing from app is
+# imported at module level here: the fields below look it up when they load a value.
+
+POST_STATUSES = ('pending', 'approved', 'rejected')
+BUCKETS = ('day', 'week', 'month')
+EXPORT_FORMATS = ('geojson', 'ndjson', 'csv')
+
+
+def _config():
+    from app.config import Config
+    return Config
+
+
+class BBox(fields.Field):
+    """Parse a ``minLon,minLat,maxLon,maxLat`` string into a tuple of floats"""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        try:
+            parts = [float(part) for part in str(value).split(',')]
+        except ValueError as err:
+            raise ValidationError('bbox must be four comma-separated numbers') from err
+        if len(parts) != 4:
+            raise ValidationError('bbox must be four comma-separated numbers')
+
+        min_lon, min_lat, max_lon, max_lat = parts
+        if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+            raise ValidationError('bbox longitudes must be between -180 and 180')
+        if not (-90 <= min_lat <= 90 and -90 <= max_lat <= 90):
+            raise ValidationError('bbox latitudes must be between -90 and 90')
+        if min_lon >= max_lon or min_lat >= max_lat:
+            raise ValidationError('bbox must be ordered minLon,minLat,maxLon,maxLat')
+        return (min_lon, min_lat, max_lon, max_lat)
+
+
+class GeoPoint(fields.Dict):
+    """A GeoJSON Point with [longitude, latitude] in range, as the 2dsphere index on location accepts"""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        value = super()._deserialize(value, attr, data, **kwargs)
+        if value.get('type') != 'Point':
+            raise ValidationError('location must be a GeoJSON Point')
+        coordinates = value.get('coordinates')
+        if (not isinstance(coordinates, (list, tuple)) or len(coordinates) != 2
+                or not all(isinstance(number, (int, float)) and not isinstance(number, bool) for number in coordinates)):
+            raise ValidationError('location coordinates must be two numbers, [longitude, latitude]')
+        lon, lat = coordinates
+        if not -180 <= lon <= 180:
+            raise ValidationError('location longitude must be between -180 and 180')
+        if not -90 <= lat <= 90:
+            raise ValidationError('location latitude must be between -90 and 90')
+        return {'type': 'Point', 'coordinates': [float(lon), float(lat)]}
+
+
+class PageSize(fields.Int):
+    """Page size between 1 and Config.POSTS_MAX_PAGE_SIZE, the ``default`` Config setting when omitted"""
+
+    def __init__(self, default, **kwargs):
+        super().__init__(required=False, load_default=lambda: getattr(_config(), default), **kwargs)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        value = super()._deserialize(value, attr, data, **kwargs)
+        return validate.Range(min=1, max=_config().POSTS_MAX_PAGE_SIZE)(value)
+
+
+class SearchText(fields.Str):
+    """Search query of at most Config.SEARCH_MAX_QUERY_LENGTH characters"""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        value = super()._deserialize(value, attr, data, **kwargs)
+        return validate.Length(min=1, max=_config().SEARCH_MAX_QUERY_LENGTH)(value)
+
+
+class Cursor(fields.Field):
+    """Decode an opaque pagination cursor into its (created_at, _id) pair"""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        from app.pagination import InvalidCursorError, decode_cursor
+        try:
+            return decode_cursor(str(value))
+        except InvalidCursorError as err:
+            raise ValidationError(str(err)) from err
+
+
+class SearchCursor(fields.Field):
+    """Decode an opaque search cursor into its (score, _id) pair"""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        from app.pagination import InvalidCursorError, decode_search_cursor
+        try:
+            return decode_search_cursor(str(value))
+        except InvalidCursorError as err:
+            raise ValidationError(str(err)) from err
+
+
+class SyncToken(fields.Field):
+    """Decode an opaque sync token into the aware datetime it was issued at"""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        from app.pagination import InvalidCursorError, decode_sync_token
+        try:
+            return decode_sync_token(str(value))
+        except InvalidCursorError as err:
+            raise ValidationError(str(err)) from err
+
+
+class FieldList(fields.Field):
+    """Parse a comma-separated sparse fieldset, 'summary' expands to the map marker fields.
+
+    _id is always returned whether or not it is listed.
+    """
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        from app.projection import POST_FIELDS, SUMMARY_FIELDS
+        names = []
+        for name in str(value).split(','):
+            name = name.strip()
+            expanded = SUMMARY_FIELDS if name == 'summary' else [name]
+            for field_name in expanded:
+                if field_name not in POST_FIELDS:
+                    raise ValidationError(f'Unknown field: {field_name}')
+                if field_name not in names:
+                    names.append(field_name)
+        return names
 
 
 # Define the schema for input validation using Marshmallow
 class PostSchema(Schema):
     title = fields.Str(required=True)
     content = fields.Dict(required=True)
-    location = fields.Dict(required=True)
+    location = GeoPoint(required=True)
     tag = fields.Str(required=True, validate=validate.OneOf(['Positive', 'Neutral', 'Negative']))
     optionalTags = fields.List(fields.Str(), required=False, load_default=[]) # Make optional for backward compatibility
     captchaToken = fields.Str(required=True) # Add captcha token to schema
     createdAt = fields.DateTime()
-    status = fields.Str(required=False, load_default='pending')
+    status = fields.Str(required=False, load_default='pending', validate=validate.OneOf(POST_STATUSES))
 
 # Define a schema for tag validation
 class TagSchema(Schema):
     tag = fields.Str(required=False, allow_none=True, validate=validate.OneOf(['Positive', 'Neutral', 'Negative']))
-    optionalTags = fields.List(fields.Str(), required=False, load_default=[])
\ No newline at end of file
+    optionalTags = fields.List(fields.Str(), required=False, load_default=[])
+
+# Define a schema for the listing query string (tag filters plus the map viewport)
+class PostQuerySchema(TagSchema):
+    bbox = BBox(required=False, allow_none=True, load_default=None)
+    zoom = fields.Int(required=False, allow_none=True, load_default=None, validate=validate.Range(min=0, max=22))
+    limit = PageSize('POSTS_PAGE_SIZE')
+    cursor = Cursor(required=False, allow_none=True, load_default=None)
+    # 'array' returns the plain list of every matching post, as older clients expect
+    format = fields.Str(required=False, load_default='page', validate=validate.OneOf(['page', 'array']))
+    fieldset = FieldList(data_key='fields', required=False, allow_none=True, load_default=None)
+    # Stream every matching post as a chunked JSON array instead of building the response in memory
+    stream = fields.Bool(required=False, load_default=False)
+    # Half-open created_at range, [from, to)
+    date_from = fields.DateTime(data_key='from', required=False, allow_none=True, load_default=None)
+    date_to = fields.DateTime(data_key='to', required=False, allow_none=True, load_default=None)
+
+# Define a schema for the clustering query string, where the zoom level is mandatory
+class ClusterQuerySchema(PostQuerySchema):
+    zoom = fields.Int(required=True, validate=validate.Range(min=0, max=22))
+
+# Define a schema for the full-text search query string
+class SearchQuerySchema(TagSchema):
+    q = SearchText(required=True)
+    bbox = BBox(required=False, allow_none=True, load_default=None)
+    zoom = fields.Int(required=False, allow_none=True, load_default=None, validate=validate.Range(min=0, max=22))
+    limit = PageSize('SEARCH_PAGE_SIZE')
+    cursor = SearchCursor(required=False, allow_none=True, load_default=None)
+
+# Define a schema for the facet counts query string, without filters the precomputed global counts are returned
+class FacetQuerySchema(Schema):
+    bbox = BBox(required=False, allow_none=True, load_default=None)
+    zoom = fields.Int(required=False, allow_none=True, load_default=None, validate=validate.Range(min=0, max=22))
+    # Half-open created_at range, [from, to)
+    date_from = fields.DateTime(data_key='from', required=False, allow_none=True, load_default=None)
+    date_to = fields.DateTime(data_key='to', required=False, allow_none=True, load_default=None)
+
+# Define a schema for the timeline histogram query string
+class TimelineQuerySchema(TagSchema):
+    bucket = fields.Str(required=False, load_default='day', validate=validate.OneOf(BUCKETS))
+    bbox = BBox(required=False, allow_none=True, load_default=None)
+    zoom = fields.Int(required=False, allow_none=True, load_default=None, validate=validate.Range(min=0, max=22))
+    date_from = fields.DateTime(data_key='from', required=False, allow_none=True, load_default=None)
+    date_to = fields.DateTime(data_key='to', required=False, allow_none=True, load_default=None)
+
+# Define a schema for the delta sync query string, without a token the client is told to reload
+class ChangesQuerySchema(Schema):
+    since = SyncToken(required=False, allow_none=True, load_default=None)
+    fieldset = FieldList(data_key='fields', required=False, allow_none=True, load_default=None)
+
+# Define a schema for the live stream query string, since is where a client that just loaded the listing starts
+class StreamQuerySchema(Schema):
+    since = SyncToken(required=False, allow_none=True, load_default=None)
+
+# Define a schema for the admin export query string
+class ExportQuerySchema(Schema):
+    format = fields.Str(required=False, load_default='geojson', validate=validate.OneOf(EXPORT_FORMATS))
+    status = fields.Str(required=False, allow_none=True, load_default=None, validate=validate.OneOf(POST_STATUSES))
+    tag = fields.Str(required=False, allow_none=True, load_default=None, validate=validate.OneOf(['Positive', 'Neutral', 'Negative']))
+    # Half-open created_at range, [from, to)
+    date_from = fields.DateTime(data_key='from', required=False, allow_none=True, load_default=None)
+    date_to = fields.DateTime(data_key='to', required=False, allow_none=True, load_default=None)
+    gzip = fields.Bool(required=False, load_default=False)
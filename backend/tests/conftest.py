@@ -0,0 +1,136 @@
+import datetime
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config reads the environment on import: no real server, no background threads
+os.environ['MONGODB_URI'] = 'mongodb://127.0.0.1:1/climate_stories_test?serverSelectionTimeoutMS=50'
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+os.environ['SYNC_INDEXES_ON_STARTUP'] = 'false'
+# The startup index check would otherwise wait that long for the unreachable server
+os.environ['STARTUP_INDEX_TIMEOUT'] = '0.05'
+os.environ['IMAGE_WORKERS'] = '0'
+
+mongomock = pytest.importorskip('mongomock')
+
+from tests.mongomock_support import install  # noqa: E402
+
+install()
+
+START = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+STORIES = [
+    # (title, description, lon, lat, tag, days after START)
+    ('Flooded street', 'The river rose over the road', -75.7, 45.4, 'Negative', 0),
+    ('Smoke all summer', 'Wildfire smoke hid the mountains', -123.1, 49.3, 'Negative', 1),
+    ('New sea wall', 'The harbour got a higher wall', -63.6, 44.6, 'Positive', 2),
+]
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'mongod: runs against the real MongoDB at TEST_MONGODB_URI')
+
+
+@pytest.fixture(scope='session')
+def app():
+    # Flask-Admin's views are module-level and can only be registered once, hence one app per session
+    from app.__init__ import create_app
+    from app.posts_routes import posts_routes_blueprint
+
+    app = create_app()
+    app.register_blueprint(posts_routes_blueprint)
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def db(app):
+    """A fresh in-memory database per test"""
+    from app.extensions import mongo
+    mongo.db = mongomock.MongoClient().climate_stories_test
+    return mongo.db
+
+
+@pytest.fixture
+def mongod_db(app):
+    """A real, emptied database with the declared indexes; skips the test without TEST_MONGODB_URI"""
+    import pymongo
+
+    from app.extensions import mongo
+    from repos.indexes import sync_indexes
+
+    uri = os.getenv('TEST_MONGODB_URI')
+    if not uri:
+        pytest.skip('TEST_MONGODB_URI is not set')
+    client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=2000)
+    db = client.get_default_database()
+    for name in db.list_collection_names():
+        db.drop_collection(name)
+    mongo.db = db
+    with app.app_context():
+        sync_indexes()
+    yield db
+    client.drop_database(db.name)
+    client.close()
+
+
+@pytest.fixture(params=['mongomock'] + (['mongod'] if os.getenv('TEST_MONGODB_URI') else []))
+def posts_db(request):
+    """The database of a request-level test: mongomock, and a real server too when TEST_MONGODB_URI is set"""
+    if request.param == 'mongod':
+        request.applymarker(pytest.mark.mongod)
+        return request.getfixturevalue('mongod_db')
+    return request.getfixturevalue('db')
+
+
+@pytest.fixture
+def stories(posts_db):
+    """STORIES as /api/posts/create stores them, all approved"""
+    from app.post_events import posts_reset
+
+    posts_db.stories.insert_many([
+        {
+            'title': title,
+            'content': {'description': description, 'image': None},
+            'location': {'type': 'Point', 'coordinates': [lon, lat]},
+            'tag': tag,
+            'optional_tags': [],
+            'status': 'approved',
+            'created_at': START + datetime.timedelta(days=days),
+            'updated_at': START + datetime.timedelta(days=days),
+        }
+        for title, description, lon, lat, tag, days in STORIES
+    ])
+    # Caches filled by earlier tests must not answer for this database
+    posts_reset()
+    return posts_db
+
+
+@pytest.fixture
+def create_story(app):
+    """Post a story through /api/posts/create, which skips the captcha on localhost, and return its id"""
+    def create(title='Ice storm', lon=-73.6, lat=45.5, tag='Negative', **fields):
+        story = {
+            'title': title,
+            'content': {'description': 'Branches down on every street'},
+            'location': {'type': 'Point', 'coordinates': [lon, lat]},
+            'tag': tag,
+            'captchaToken': '',
+            **fields,
+        }
+        response = app.test_client().post('/api/posts/create', data={'postData': json.dumps(story)})
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['post_id']
+    return create
+
+
+@pytest.fixture
+def admin_client(app):
+    """A test client logged in as an admin"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user'] = {'username': 'admin', 'role': 'admin'}
+    return client
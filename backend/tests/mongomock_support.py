@@ -0,0 +1,234 @@
+# The post queries rely on a few MongoDB operators mongomock does not implement.
+# install() teaches mongomock just enough of them for the request-level tests to
+# run without a server; with TEST_MONGODB_URI set they run against mongod too.
+#
+#   $geoWithin with a $geometry Polygon, planar (the bbox rings are densified)
+#   $text, matching any of the search words, and {$meta: 'textScore'}
+#   $asinh, $tan, $degreesToRadians, $dateTrunc and $type expressions
+#   $dateToString with %L (milliseconds)
+#   aggregation expressions in find() projections
+#   $indexStats as the only pipeline stage, reporting every index as never used
+#   text indexes reported with _fts/_ftsx keys and their weights, as the server does
+#   the sort argument newer pymongo passes to bulk updates (ignored)
+import datetime
+import math
+import re
+
+from mongomock import aggregate, collection, filtering
+
+# Words of the $text search last applied, {$meta: 'textScore'} scores documents against them
+_text_search = {'words': set()}
+
+
+def _point_in_ring(point, ring):
+    lon, lat = point
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:]):
+        if (y1 > lat) != (y2 > lat) and lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+def _geo_within(doc_val, search_val):
+    geometry = search_val.get('$geometry') or {}
+    if geometry.get('type') != 'Polygon':
+        raise NotImplementedError('Only $geoWithin $geometry Polygons are supported')
+    try:
+        lon, lat = doc_val['coordinates'][:2]
+    except (KeyError, TypeError, ValueError):
+        return False
+    return _point_in_ring((lon, lat), geometry['coordinates'][0])
+
+
+def _words(text):
+    return re.findall(r'\w+', text.lower())
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+def _text_score(document):
+    words = [word for text in _strings(document) for word in _words(text)]
+    return float(sum(word in _text_search['words'] for word in words))
+
+
+def _text_matches(search, document):
+    terms = search['$search'].split()
+    excluded = {word for term in terms if term.startswith('-') for word in _words(term)}
+    _text_search['words'] = {word for term in terms if not term.startswith('-') for word in _words(term)}
+    words = {word for text in _strings(document) for word in _words(text)}
+    return bool(words & _text_search['words']) and not words & excluded
+
+
+_apply_filter = filtering._Filterer.apply
+
+
+def _apply_with_text(self, search_filter, document):
+    if isinstance(search_filter, dict) and '$text' in search_filter:
+        search_filter = dict(search_filter)
+        if not _text_matches(search_filter.pop('$text'), document):
+            return False
+    return _apply_filter(self, search_filter, document)
+
+
+def _type_name(value):
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'double'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, datetime.datetime):
+        return 'date'
+    if isinstance(value, (list, tuple)):
+        return 'array'
+    if isinstance(value, dict):
+        return 'object'
+    if value is None:
+        return 'null'
+    return type(value).__name__
+
+
+def _date_trunc(parser, spec):
+    date = parser.parse(spec['date'])
+    if not isinstance(date, datetime.datetime):
+        return None
+    start = date.replace(hour=0, minute=0, second=0, microsecond=0)
+    if spec['unit'] == 'week':
+        days = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+        first = days.index(spec.get('startOfWeek', 'sunday').lower())
+        start -= datetime.timedelta(days=(start.weekday() - first) % 7)
+    elif spec['unit'] == 'month':
+        start = start.replace(day=1)
+    elif spec['unit'] != 'day':
+        raise NotImplementedError(f"$dateTrunc unit {spec['unit']} is not supported")
+    return start
+
+
+def _date_to_string(parser, spec):
+    date = parser.parse(spec['date'])
+    milliseconds = f'{date.microsecond // 1000:03d}'
+    return date.strftime(spec['format'].replace('%L', milliseconds))
+
+
+def _math(function):
+    def evaluate(parser, value):
+        value = parser.parse(value)
+        return None if value is None else function(value)
+    return evaluate
+
+
+def _type(parser, value):
+    try:
+        return _type_name(parser.parse(value))
+    except KeyError:
+        return 'missing'
+
+
+def _meta(parser, value):
+    if value != 'textScore':
+        raise NotImplementedError(f'$meta {value} is not supported')
+    return _text_score(parser._doc_dict)
+
+
+_EXPRESSIONS = {
+    '$asinh': _math(math.asinh),
+    '$tan': _math(math.tan),
+    '$degreesToRadians': _math(math.radians),
+    '$dateTrunc': _date_trunc,
+    '$type': _type,
+    '$meta': _meta,
+}
+
+_parse = aggregate._Parser.parse
+
+
+def _parse_with_extras(self, expression):
+    if isinstance(expression, dict) and len(expression) == 1:
+        (operator, value), = expression.items()
+        if operator in _EXPRESSIONS:
+            return _EXPRESSIONS[operator](self, value)
+        if operator == '$dateToString' and '%L' in value.get('format', ''):
+            return _date_to_string(self, value)
+    return _parse(self, expression)
+
+
+def _is_computed(value):
+    if isinstance(value, dict):
+        return not set(value) <= {'$slice', '$elemMatch'}
+    return not isinstance(value, (bool, int))
+
+
+_copy_only_fields = collection.Collection._copy_only_fields
+
+
+def _copy_with_computed_fields(self, doc, fields, container):
+    if not isinstance(fields, dict) or not any(_is_computed(value) for value in fields.values()):
+        return _copy_only_fields(self, doc, fields, container)
+    computed = {name: value for name, value in fields.items() if _is_computed(value)}
+    plain = {name: value for name, value in fields.items() if name not in computed}
+    if '_id' in computed:
+        plain['_id'] = 0
+    result = _copy_only_fields(self, doc, plain or {'_id': 0}, container)
+    for name, value in computed.items():
+        try:
+            result[name] = aggregate._Parser(doc, ignore_missing_keys=True).parse(value)
+        except KeyError:
+            pass
+    return result
+
+
+_aggregate = collection.Collection.aggregate
+
+
+def _aggregate_with_index_stats(self, pipeline, *args, **kwargs):
+    if pipeline == [{'$indexStats': {}}]:
+        return iter([{'name': name, 'key': dict(info['key']), 'accesses': {'ops': 0}}
+                     for name, info in self.index_information().items()])
+    return _aggregate(self, pipeline, *args, **kwargs)
+
+
+_create_indexes = collection.Collection.create_indexes
+
+
+def _create_indexes_like_server(self, indexes, session=None):
+    names = _create_indexes(self, indexes, session=session)
+    for model, name in zip(indexes, names):
+        keys, weights = [], {}
+        for field, kind in model.document['key'].items():
+            if kind != 'text':
+                keys.append((field, kind))
+                continue
+            if not weights:
+                keys += [('_fts', 'text'), ('_ftsx', 1)]
+            weights[field] = (model.document.get('weights') or {}).get(field, 1)
+        if weights:
+            self._store.indexes[name].update(key=keys, weights=weights)
+    return names
+
+
+_add_update = collection.BulkOperationBuilder.add_update
+
+
+def _add_update_without_sort(self, *args, sort=None, **kwargs):
+    return _add_update(self, *args, **kwargs)
+
+
+def install():
+    filtering._filterer_inst._operator_map['$geoWithin'] = _geo_within
+    filtering._Filterer.apply = _apply_with_text
+    aggregate._Parser.parse = _parse_with_extras
+    collection.Collection.aggregate = _aggregate_with_index_stats
+    collection.Collection.create_indexes = _create_indexes_like_server
+    collection.Collection._copy_only_fields = _copy_with_computed_fields
+    collection.BulkOperationBuilder.add_update = _add_update_without_sort
@@ -0,0 +1,68 @@
+import gzip
+
+import pytest
+
+from app.assets import precompress
+from app.config import Config
+
+BUNDLE = 'assets/index-AbC123_x.js'
+SCRIPT = 'console.log("climate stories");\n' * 100
+
+
+@pytest.fixture
+def build(tmp_path, monkeypatch):
+    """A React build with one large content-hashed bundle, precompressed like build.sh does"""
+    monkeypatch.setattr(Config, 'STATIC_DIR', str(tmp_path))
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / BUNDLE).write_text(SCRIPT)
+    (tmp_path / 'index.html').write_text('<!doctype html><div id="root"></div>')
+    (tmp_path / 'favicon.svg').write_text('<svg/>')
+    precompress(str(tmp_path))
+    return tmp_path
+
+
+def test_only_large_text_files_are_precompressed(build):
+    assert (build / (BUNDLE + '.gz')).exists()
+    assert not (build / 'index.html.gz').exists()
+    assert gzip.decompress((build / (BUNDLE + '.gz')).read_bytes()).decode() == SCRIPT
+
+
+def test_gzip_sibling_is_sent_when_accepted(app, build):
+    response = app.test_client().get(f'/{BUNDLE}', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()).decode() == SCRIPT
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_plain_file_is_sent_without_accept_encoding(app, build):
+    response = app.test_client().get(f'/{BUNDLE}', headers={'Accept-Encoding': 'identity'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data(as_text=True) == SCRIPT
+
+
+def test_cache_lifetimes(app, build):
+    client = app.test_client()
+
+    bundle = client.get(f'/{BUNDLE}').cache_control
+    index = client.get('/').cache_control
+    other = client.get('/favicon.svg').cache_control
+
+    assert (bundle.max_age, bundle.immutable) == (Config.STATIC_IMMUTABLE_MAX_AGE, True)
+    assert (index.max_age, index.immutable) == (Config.STATIC_INDEX_MAX_AGE, False)
+    assert other.max_age == Config.STATIC_MAX_AGE
+
+
+def test_unchanged_asset_is_not_resent(app, build):
+    client = app.test_client()
+    first = client.get('/favicon.svg')
+
+    assert client.get('/favicon.svg', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+
+def test_missing_files_and_paths_outside_the_build_are_not_found(app, build):
+    client = app.test_client()
+
+    assert client.get('/assets/missing.js').status_code == 404
+    assert client.get('/../config.py').status_code == 404
@@ -0,0 +1,55 @@
+import json
+import random
+import urllib.request
+
+from benchmarks.compare import compare
+from benchmarks.fake_upstreams import FakeUpstreams
+from benchmarks.load import Scenario, _listing_params, tag_filters
+from benchmarks.synthetic import CANADA_EXTENT, synthetic_post
+
+
+def _report(p95, rps):
+    return {'meta': {'commit': 'abc', 'stories': 10}, 'scenarios': {
+        'list_all': {'latency_ms': {'p50': 10, 'p95': p95, 'p99': 40}, 'throughput_rps': rps},
+    }}
+
+
+def test_compare_reports_regressions_beyond_the_threshold(capsys):
+    regressions = compare(_report(p95=20, rps=100), _report(p95=30, rps=80), threshold=10)
+
+    assert regressions == [('list_all', 'p95 ms', 50.0), ('list_all', 'req/s', -20.0)]
+    assert 'worse' in capsys.readouterr().out
+
+
+def test_compare_ignores_improvements(capsys):
+    assert compare(_report(p95=30, rps=80), _report(p95=20, rps=100), threshold=10) == []
+
+
+def test_synthetic_stories_follow_the_seed():
+    def stories(seed):
+        rng = random.Random(seed)
+        return [synthetic_post(rng) for _ in range(5)]
+
+    assert stories(42) == stories(42)
+    assert stories(42) != stories(7)
+    min_lon, min_lat, max_lon, max_lat = CANADA_EXTENT
+    for story in stories(42):
+        lon, lat = story['location']['coordinates']
+        assert min_lon <= lon <= max_lon and min_lat <= lat <= max_lat
+        assert len(story['optional_tags']) <= 3
+
+
+def test_fake_upstreams_answer_captcha_and_upload():
+    with FakeUpstreams() as upstreams:
+        env = upstreams.environment()
+        for url in (env['CAPTCHA_URL'], env['CDN_API']):
+            with urllib.request.urlopen(url, data=b'key=value') as response:
+                assert json.load(response)['success'] is True
+
+        assert upstreams.counts == {'/siteverify': 1, '/1/upload': 1}
+
+
+def test_listing_scenarios_load_the_map_listing():
+    assert _listing_params('Negative', ['Heat']) == {'format': 'array', 'tag': 'Negative', 'optionalTags': ['Heat']}
+    assert _listing_params(None, None, 'page') == {'format': 'page'}
+    assert Scenario('list_page', 'http://bench.test', None).filters == tag_filters()
@@ -0,0 +1,142 @@
+import json
+
+import pytest
+
+
+def _story(**overrides):
+    story = {
+        'title': 'The river rose',
+        'content': {'description': 'Higher than any spring we remember'},
+        'location': {'type': 'Point', 'coordinates': [-75.7, 45.4]},
+        'tag': 'Negative',
+        'optionalTags': ['Flooding'],
+    }
+    story.update(overrides)
+    return story
+
+
+def _ndjson(*stories):
+    return '\n'.join(json.dumps(story) for story in stories)
+
+
+def test_bulk_import_inserts_ndjson(admin_client, db):
+    response = admin_client.post('/api/posts/bulk', data=_ndjson(_story(), _story(title='Smoke all summer')),
+                                 content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    assert response.get_json()['inserted'] == 2
+    assert db.stories.count_documents({'status': 'approved'}) == 2
+
+
+def test_bulk_import_applies_status_parameter(admin_client, db):
+    response = admin_client.post('/api/posts/bulk?status=pending', data=_ndjson(_story()),
+                                 content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    assert db.stories.find_one()['status'] == 'pending'
+
+
+def test_bulk_import_rejects_unknown_status_parameter(admin_client, db):
+    response = admin_client.post('/api/posts/bulk?status=published', data=_ndjson(_story()),
+                                 content_type='application/x-ndjson')
+
+    assert response.status_code == 400
+    assert db.stories.count_documents({}) == 0
+
+
+def test_bulk_import_reports_invalid_records(admin_client, db):
+    response = admin_client.post('/api/posts/bulk', data=_ndjson(_story(), _story(tag='Sunny')),
+                                 content_type='application/x-ndjson')
+
+    summary = response.get_json()
+    assert response.status_code == 200
+    assert (summary['inserted'], summary['failed']) == (1, 1)
+    assert summary['errors'][0]['record'] == 1
+
+
+def test_bulk_import_rejects_unknown_record_status(admin_client, db):
+    response = admin_client.post('/api/posts/bulk', data=_ndjson(_story(status='rejected'), _story(status='published')),
+                                 content_type='application/x-ndjson')
+
+    summary = response.get_json()
+    assert (summary['inserted'], summary['failed']) == (1, 1)
+    assert 'status' in summary['errors'][0]['errors']
+    assert db.stories.find_one()['status'] == 'rejected'
+
+
+def test_bulk_import_requires_admin(app, db):
+    response = app.test_client().post('/api/posts/bulk', data=_ndjson(_story()),
+                                      content_type='application/x-ndjson')
+
+    assert response.status_code == 302
+    assert db.stories.count_documents({}) == 0
+
+
+
+@pytest.mark.parametrize('content_type', ['multipart/form-data; boundary=x', 'application/x-www-form-urlencoded',
+                                          'text/plain'])
+def test_bulk_import_rejects_other_content_types(admin_client, db, content_type):
+    # A cross-site form can post these with the admin's cookie, JSON and NDJSON need a preflight
+    response = admin_client.post('/api/posts/bulk', data=_ndjson(_story()), content_type=content_type)
+
+    assert response.status_code == 415
+    assert db.stories.count_documents({}) == 0
+
+
+def test_bulk_import_reads_a_json_array(admin_client, db):
+    response = admin_client.post('/api/posts/bulk', data=json.dumps([_story(), _story(title='Smoke all summer')]),
+                                 content_type='application/json')
+
+    assert response.get_json()['inserted'] == 2
+
+def test_bulk_import_reads_a_geojson_feature_collection(admin_client, db):
+    story = _story()
+    feature = {'type': 'Feature', 'geometry': story.pop('location'), 'properties': dict(story, source='partner')}
+
+    response = admin_client.post('/api/posts/bulk', data=json.dumps({'type': 'FeatureCollection', 'features': [feature]}),
+                                 content_type='application/geo+json')
+
+    assert response.get_json()['inserted'] == 1
+    post = db.stories.find_one()
+    assert post['location'] == {'type': 'Point', 'coordinates': [-75.7, 45.4]}
+    assert post['optional_tags'] == ['Flooding']
+    assert 'source' not in post and 'optionalTags' not in post
+
+
+def test_imported_stories_show_up_in_cached_listings(app, admin_client, stories):
+    client = app.test_client()
+    client.get('/api/posts')
+
+    admin_client.post('/api/posts/bulk', data=_ndjson(_story()), content_type='application/x-ndjson')
+
+    assert len(client.get('/api/posts').get_json()['posts']) == 4
+
+
+def test_import_command_reports_failed_records(app, db, tmp_path):
+    source = tmp_path / 'stories.ndjson'
+    source.write_text(_ndjson(_story(), _story(tag='Sunny')) + '\nnot json\n')
+
+    result = app.test_cli_runner().invoke(args=['posts', 'import', str(source), '--status', 'pending'])
+
+    assert result.exit_code == 1
+    assert 'Done: 1 of 3 stories imported' in result.output
+    assert db.stories.find_one()['status'] == 'pending'
+
+
+def test_bulk_import_reports_malformed_locations(admin_client, db):
+    bad = _story(location={'type': 'Point', 'coordinates': [200, 45.4]})
+    response = admin_client.post('/api/posts/bulk', data=_ndjson(_story(), bad), content_type='application/x-ndjson')
+
+    summary = response.get_json()
+    assert summary['inserted'] == 1
+    assert summary['errors'][0]['record'] == 1
+    assert 'location' in summary['errors'][0]['errors']
+
+
+def test_create_rejects_malformed_location_with_400(app, db):
+    story = dict(_story(location={'type': 'Point', 'coordinates': 'somewhere'}), captchaToken='')
+
+    response = app.test_client().post('/api/posts/create', data={'postData': json.dumps(story)})
+
+    assert response.status_code == 400
+    assert 'location' in response.get_json()['errors']
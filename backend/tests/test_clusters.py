@@ -0,0 +1,46 @@
+def _clusters(client, query):
+    response = client.get(f'/api/posts/clusters?{query}')
+    assert response.status_code == 200
+    return response.get_json()['clusters']
+
+
+def test_clusters_count_every_post_per_tag(app, stories):
+    clusters = _clusters(app.test_client(), 'zoom=1')
+
+    assert sum(cluster['count'] for cluster in clusters) == 3
+    assert sum(cluster['tags']['Negative'] for cluster in clusters) == 2
+    assert sum(cluster['tags']['Positive'] for cluster in clusters) == 1
+
+
+def test_nearby_posts_share_a_cluster_at_low_zoom(app, stories):
+    clusters = _clusters(app.test_client(), 'zoom=0')
+
+    # Ottawa and Halifax fall in one grid cell, Vancouver in another
+    assert sorted(cluster['count'] for cluster in clusters) == [1, 2]
+    merged = next(cluster for cluster in clusters if cluster['count'] == 2)
+    assert merged['coordinates'] == [(-75.7 - 63.6) / 2, (45.4 + 44.6) / 2]
+
+
+def test_clusters_honour_bbox_tag_and_dates(app, stories):
+    client = app.test_client()
+
+    assert sum(cluster['count'] for cluster in _clusters(client, 'zoom=3&bbox=-130,40,-100,55')) == 1
+    assert sum(cluster['count'] for cluster in _clusters(client, 'zoom=1&tag=Positive')) == 1
+
+    assert sum(cluster['count'] for cluster in _clusters(client, 'zoom=1&to=2024-05-02T00:00:00Z')) == 1
+
+
+def test_cached_clusters_follow_a_new_post(app, stories, create_story):
+    client = app.test_client()
+    _clusters(client, 'zoom=1')
+
+    create_story(lon=-73.6, lat=45.5)
+
+    assert sum(cluster['count'] for cluster in _clusters(client, 'zoom=1')) == 4
+
+
+def test_too_many_tiles_are_refused(app, stories):
+    response = app.test_client().get('/api/posts/clusters?zoom=12')
+
+    assert response.status_code == 400
+    assert 'bbox' in response.get_json()['errors']
@@ -0,0 +1,73 @@
+import gzip
+import json
+import zlib
+
+import pytest
+
+from app import compression
+from app.config import Config
+
+
+@pytest.fixture
+def small_threshold(monkeypatch):
+    monkeypatch.setattr(Config, 'COMPRESS_MIN_SIZE', 0)
+
+
+def test_listing_is_gzipped_with_a_weak_etag(app, stories, small_threshold):
+    response = app.test_client().get('/api/posts', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(json.loads(gzip.decompress(response.get_data()))['posts']) == 3
+    assert response.headers['ETag'].startswith('W/')
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_brotli_is_preferred_when_installed(app, stories, small_threshold, monkeypatch):
+    brotli = pytest.importorskip('brotli')
+    monkeypatch.setattr(compression, 'brotli', brotli)
+
+    response = app.test_client().get('/api/posts', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert len(json.loads(brotli.decompress(response.get_data()))['posts']) == 3
+
+
+def test_gzip_is_used_without_brotli(app, stories, small_threshold, monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+
+    response = app.test_client().get('/api/posts', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+
+def test_small_bodies_are_sent_as_is(app, stories):
+    response = app.test_client().get('/api/posts?limit=1&fields=title', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_streamed_listing_is_compressed_chunk_by_chunk(app, stories, small_threshold, monkeypatch):
+    monkeypatch.setattr(Config, 'STREAM_CHUNK_SIZE', 1)
+    response = app.test_client().get('/api/posts', headers={'Accept': 'application/x-ndjson', 'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    lines = zlib.decompress(response.get_data(), 31).decode().splitlines()
+    assert [json.loads(line)['title'] for line in lines] == ['New sea wall', 'Smoke all summer', 'Flooded street']
+
+
+def test_client_without_accept_encoding_gets_identity(app, stories, small_threshold):
+    response = app.test_client().get('/api/posts', headers={'Accept-Encoding': 'identity'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.get_json()['posts']) == 3
+
+
+def test_event_streams_are_never_compressed(app, small_threshold):
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = app.response_class(iter([b'event: post\ndata: {}\n\n']), mimetype='text/event-stream')
+
+        response = compression.compress_response(response)
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == b'event: post\ndata: {}\n\n'
@@ -0,0 +1,64 @@
+from app.config import Config
+
+
+def test_unchanged_listing_is_not_resent(app, stories):
+    client = app.test_client()
+    first = client.get('/api/posts')
+
+    again = client.get('/api/posts', headers={'If-None-Match': first.headers['ETag']})
+
+    assert again.status_code == 304
+    assert again.get_data() == b''
+    assert again.headers['ETag'] == first.headers['ETag']
+
+
+def test_if_modified_since_is_honoured(app, stories):
+    client = app.test_client()
+    first = client.get('/api/posts?format=array')
+
+    again = client.get('/api/posts?format=array', headers={'If-Modified-Since': first.headers['Last-Modified']})
+
+    assert again.status_code == 304
+
+
+def test_etag_changes_with_a_write_and_with_the_query(app, stories, create_story):
+    client = app.test_client()
+    etag = client.get('/api/posts').headers['ETag']
+
+    assert client.get('/api/posts?tag=Negative').headers['ETag'] != etag
+    assert client.get('/api/posts', headers={'Accept': 'application/x-ndjson'}).headers['ETag'] != etag
+
+    create_story()
+
+    changed = client.get('/api/posts', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert len(changed.get_json()['posts']) == 4
+
+
+def test_gzip_etag_round_trip(app, stories, monkeypatch):
+    monkeypatch.setattr(Config, 'COMPRESS_MIN_SIZE', 0)
+    client = app.test_client()
+    headers = {'Accept-Encoding': 'gzip'}
+
+    first = client.get('/api/posts?format=array', headers=headers)
+    assert first.status_code == 200
+    assert first.headers['Content-Encoding'] == 'gzip'
+    assert first.headers['ETag'].startswith('W/')
+    assert 'Accept-Encoding' in first.headers['Vary']
+
+    again = client.get('/api/posts?format=array', headers=dict(headers, **{'If-None-Match': first.headers['ETag']}))
+    assert again.status_code == 304
+    assert again.headers['ETag'] == first.headers['ETag']
+    assert 'Accept-Encoding' in again.headers['Vary']
+
+
+def test_identity_and_gzip_share_the_etag(app, stories, monkeypatch):
+    monkeypatch.setattr(Config, 'COMPRESS_MIN_SIZE', 0)
+    client = app.test_client()
+
+    plain = client.get('/api/posts?format=array', headers={'Accept-Encoding': 'identity'})
+    gzipped = client.get('/api/posts?format=array', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['ETag'] == gzipped.headers['ETag']
+    assert 'Accept-Encoding' in plain.headers['Vary']
@@ -0,0 +1,88 @@
+import csv
+import gzip
+import io
+import json
+
+from app.export import csv_text, export_chunks
+
+
+def _export(client, query=''):
+    response = client.get(f'/api/posts/export?{query}')
+    assert response.status_code == 200
+    return response
+
+
+def test_geojson_export_is_a_feature_collection(admin_client, stories):
+    response = _export(admin_client)
+
+    assert response.mimetype == 'application/geo+json'
+    assert response.headers['Content-Disposition'].endswith('.geojson"')
+    collection = json.loads(response.get_data())
+    assert collection['type'] == 'FeatureCollection'
+    assert sorted(feature['properties']['title'] for feature in collection['features']) == [
+        'Flooded street', 'New sea wall', 'Smoke all summer']
+    assert collection['features'][0]['geometry']['type'] == 'Point'
+
+
+def test_ndjson_export_filters_by_status_and_date(admin_client, stories):
+    stories.stories.insert_one({'title': 'Draft', 'status': 'pending', 'tag': 'Neutral'})
+
+    pending = _export(admin_client, 'format=ndjson&status=pending').get_data(as_text=True).splitlines()
+    dated = _export(admin_client, 'format=ndjson&from=2024-05-02T00:00:00Z&to=2024-05-03T00:00:00Z')
+
+    assert [json.loads(line)['title'] for line in pending] == ['Draft']
+    assert [json.loads(line)['title'] for line in dated.get_data(as_text=True).splitlines()] == ['Smoke all summer']
+
+
+def test_csv_export_has_one_row_per_story(admin_client, stories):
+    rows = list(csv.DictReader(io.StringIO(_export(admin_client, 'format=csv&tag=Negative').get_data(as_text=True))))
+
+    assert sorted(row['title'] for row in rows) == ['Flooded street', 'Smoke all summer']
+    assert {row['longitude'] for row in rows} == {'-75.7', '-123.1'}
+
+
+def test_gzip_export_decompresses_to_the_same_content(admin_client, stories):
+    plain = _export(admin_client, 'format=ndjson').get_data()
+    compressed = _export(admin_client, 'format=ndjson&gzip=true')
+
+    assert compressed.mimetype == 'application/gzip'
+    assert gzip.decompress(compressed.get_data()) == plain
+
+
+def test_export_is_for_admins(app, stories):
+    assert app.test_client().get('/api/posts/export').status_code == 302
+
+
+def test_export_command_writes_a_file(app, stories, tmp_path):
+    target = tmp_path / 'stories.ndjson'
+
+    result = app.test_cli_runner().invoke(args=['posts', 'export', '--format', 'ndjson', '-o', str(target)])
+
+    assert result.exit_code == 0, result.output
+    assert len(target.read_text().splitlines()) == 3
+
+
+def test_csv_text_quotes_formula_prefixes():
+    for value in ['=HYPERLINK("http://x")', '+1', '-2+3', '@SUM(A1)', '\tcmd']:
+        assert csv_text(value) == "'" + value
+    assert csv_text('Flooded road') == 'Flooded road'
+    assert csv_text(None) is None
+
+
+def test_csv_export_neutralizes_formulas_in_user_text():
+    post = {
+        '_id': 'a' * 24,
+        'title': '=cmd|"/c calc"!A1',
+        'content': {'description': '@SUM(1,2)'},
+        'optionalTags': ['+Flooding'],
+        'location': {'type': 'Point', 'coordinates': [-75.7, 45.4]},
+    }
+
+    text = ''.join(export_chunks(iter([post]), 'csv', json.dumps))
+    row = next(csv.DictReader(io.StringIO(text)))
+
+    assert row['title'] == '\'=cmd|"/c calc"!A1'
+    assert row['description'] == "'@SUM(1,2)"
+    assert row['optionalTags'] == "'+Flooding"
+    # Coordinates are numbers, a negative longitude stays as it is
+    assert row['longitude'] == '-75.7'
@@ -0,0 +1,102 @@
+import datetime
+
+import pytest
+
+from app import facets
+
+
+@pytest.fixture
+def reconciles(monkeypatch):
+    """Record background reconciles instead of starting threads"""
+    started = []
+    monkeypatch.setattr(facets, '_next_check', 0.0)
+    monkeypatch.setattr(facets, '_reconcile_in_background', lambda app: started.append(app))
+    return started
+
+
+def _counter(db, field, value, count):
+    db.post_facets.insert_one({'_id': f'{field}:{value}', 'field': field, 'value': value, 'count': count})
+
+
+def test_global_facets_count_approved_posts(app, stories):
+    stories.stories.insert_one({'title': 'Draft', 'tag': 'Positive', 'status': 'pending'})
+
+    response = app.test_client().get('/api/posts/facets')
+
+    assert response.status_code == 200
+    assert response.get_json() == {'tag': {'Negative': 2, 'Positive': 1}, 'optionalTags': {}}
+
+
+def test_counters_follow_creates_and_deletes(app, stories, create_story):
+    client = app.test_client()
+    post_id = create_story(tag='Positive', optionalTags=['Heat', 'Heat'])
+
+    assert client.get('/api/posts/facets').get_json() == {
+        'tag': {'Negative': 2, 'Positive': 2}, 'optionalTags': {'Heat': 1},
+    }
+
+    assert client.delete(f'/api/posts/delete/{post_id}').status_code == 200
+    assert client.get('/api/posts/facets').get_json() == {'tag': {'Negative': 2, 'Positive': 1}, 'optionalTags': {}}
+
+
+def test_global_facets_serve_counters_without_writing(app, db, reconciles):
+    db.meta.insert_one({'_id': facets.RECONCILE_PROGRESS_ID, 'at': datetime.datetime.now(datetime.timezone.utc)})
+    before = db.meta.find_one({'_id': facets.RECONCILE_PROGRESS_ID})
+    _counter(db, 'tag', 'Positive', 3)
+    _counter(db, 'optional_tags', 'Smoke', 1)
+
+    response = app.test_client().get('/api/posts/facets')
+
+    assert response.get_json() == {'tag': {'Positive': 3}, 'optionalTags': {'Smoke': 1}}
+    assert reconciles == []
+    assert db.meta.find_one({'_id': facets.RECONCILE_PROGRESS_ID}) == before
+
+
+def test_overdue_reconcile_runs_in_background_once(app, db, reconciles):
+    _counter(db, 'tag', 'Neutral', 2)
+    client = app.test_client()
+
+    first = client.get('/api/posts/facets')
+    facets._next_check = 0.0
+    client.get('/api/posts/facets')
+
+    assert first.get_json()['tag'] == {'Neutral': 2}
+    assert len(reconciles) == 1
+
+
+def test_background_reconcile_repairs_drifted_counters(app, stories, monkeypatch):
+    stories.post_facets.update_one({'_id': 'tag:Negative'}, {'$set': {'count': 7}})
+    monkeypatch.setattr(facets, '_next_check', 0.0)
+    monkeypatch.setattr('app.facets.Config.FACETS_RECONCILE_INTERVAL', -1)
+    monkeypatch.setattr(facets, '_reconcile_in_background', lambda app: facets.reconcile_facets())
+
+    assert app.test_client().get('/api/posts/facets').get_json()['tag']['Negative'] == 2
+
+
+def test_bbox_facets_are_counted_live(app, stories):
+    response = app.test_client().get('/api/posts/facets?bbox=-130,40,-70,50')
+
+    assert response.get_json() == {'tag': {'Negative': 2}, 'optionalTags': {}}
+
+
+def test_date_range_facets(app, stories):
+    response = app.test_client().get('/api/posts/facets?from=2024-05-02T00:00:00Z&to=2024-05-03T00:00:00Z')
+
+    assert response.get_json() == {'tag': {'Negative': 1}, 'optionalTags': {}}
+
+
+def test_invalid_facet_filters_are_rejected(app, stories):
+    response = app.test_client().get('/api/posts/facets?bbox=1,2,3')
+
+    assert response.status_code == 400
+    assert 'bbox' in response.get_json()['errors']
+
+
+def test_reconcile_facets_command(app, stories):
+    stories.post_facets.delete_many({})
+
+    result = app.test_cli_runner().invoke(args=['posts', 'reconcile-facets'])
+
+    assert result.exit_code == 0
+    assert 'tag: 2 values, 3 posts' in result.output
+    assert stories.post_facets.find_one({'_id': 'tag:Negative'})['count'] == 2
@@ -0,0 +1,47 @@
+import pytest
+
+from app.geo import MAX_EDGE_DEGREES, MAX_MERCATOR_LAT, bbox_to_polygon, lat_to_tile_y, lon_to_tile_x, snap_bbox, tile_bounds
+
+
+def test_snap_bbox_grows_to_the_tile_grid():
+    bbox = (-75.8, 45.3, -75.6, 45.5)
+
+    snapped = snap_bbox(bbox, 10)
+
+    assert snapped[0] <= bbox[0] and snapped[1] <= bbox[1]
+    assert snapped[2] >= bbox[2] and snapped[3] >= bbox[3]
+    # The corners are tile corners
+    west, _, _, north = tile_bounds(10, lon_to_tile_x(bbox[0], 10), lat_to_tile_y(bbox[3], 10))
+    assert snapped[0] == pytest.approx(west)
+    assert snapped[3] == pytest.approx(north)
+
+
+def test_snap_bbox_is_stable_under_small_pans():
+    assert snap_bbox((-75.80, 45.30, -75.60, 45.50), 8) == snap_bbox((-75.79, 45.31, -75.61, 45.49), 8)
+
+
+def test_snap_bbox_keeps_boxes_open_to_the_poles():
+    snapped = snap_bbox((-180, -90, 180, 90), 3)
+
+    assert snapped == (-180.0, -90, 180.0, 90)
+    assert snap_bbox((0, 0, 10, MAX_MERCATOR_LAT + 1), 4)[3] == MAX_MERCATOR_LAT + 1
+
+
+def test_bbox_to_polygon_is_a_closed_counter_clockwise_ring():
+    polygon = bbox_to_polygon((-10.0, -5.0, 10.0, 5.0))
+
+    ring = polygon['coordinates'][0]
+    assert polygon['type'] == 'Polygon'
+    assert ring[0] == ring[-1] == [-10.0, -5.0]
+    # Signed area (shoelace) is positive for a counter-clockwise ring
+    area = sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:]))
+    assert area > 0
+    assert 'strictwinding' in polygon['crs']['properties']['name']
+
+
+def test_bbox_to_polygon_densifies_long_edges():
+    ring = bbox_to_polygon((-140.0, 40.0, -50.0, 80.0))['coordinates'][0]
+
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:]):
+        assert abs(x2 - x1) <= MAX_EDGE_DEGREES + 1e-9
+        assert abs(y2 - y1) <= MAX_EDGE_DEGREES + 1e-9
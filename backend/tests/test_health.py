@@ -0,0 +1,30 @@
+import pymongo
+
+from app.config import Config
+from app.extensions import mongo, mongo_client_options
+
+
+def test_ready_when_mongo_answers(app, db):
+    response = app.test_client().get('/api/health/ready')
+
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'ready'
+    assert response.headers['Cache-Control'] == 'no-store'
+
+
+def test_not_ready_when_mongo_is_unreachable(app, monkeypatch):
+    monkeypatch.setattr(Config, 'READY_TIMEOUT', 0.05)
+    client = pymongo.MongoClient('mongodb://127.0.0.1:1', **mongo_client_options())
+    mongo.db = client.climate_stories_test
+
+    response = app.test_client().get('/api/health/ready')
+    client.close()
+
+    assert response.status_code == 503
+    # Hosts stay out of the response
+    assert response.get_json() == {'status': 'unavailable', 'error': 'ServerSelectionTimeoutError'}
+
+
+def test_mongo_clients_connect_lazily():
+    assert mongo_client_options()['connect'] is False
+    assert mongo_client_options()['maxPoolSize'] == Config.MONGO_MAX_POOL_SIZE
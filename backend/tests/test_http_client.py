@@ -0,0 +1,109 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app import http_client
+from app.http_client import get_upstream_metrics, verify_captcha
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(http_client, '_metrics', {})
+
+    def install(result):
+        fake = FakeSession(result)
+        monkeypatch.setattr(http_client, 'get_session', lambda: fake)
+        return fake
+    return install
+
+
+def test_captcha_is_verified_with_timeouts(session):
+    fake = session(FakeResponse(200, {'success': True}))
+
+    assert verify_captcha('token') == {'success': True}
+    url, kwargs = fake.calls[0]
+    assert kwargs['data']['response'] == 'token'
+    assert kwargs['timeout'] == (http_client.Config.HTTP_CONNECT_TIMEOUT, http_client.Config.HTTP_READ_TIMEOUT)
+    assert get_upstream_metrics()['hcaptcha']['requests'] == 1
+
+
+def test_unreachable_captcha_service_fails_verification(session):
+    session(requests.ConnectTimeout('too slow'))
+
+    assert verify_captcha('token')['success'] is False
+    assert get_upstream_metrics()['hcaptcha']['errors'] == 1
+
+
+def test_server_errors_count_as_failures(session):
+    session(FakeResponse(503, {}))
+
+    verify_captcha('token')
+
+    assert get_upstream_metrics()['hcaptcha']['errors'] == 1
+
+
+def test_session_is_reused_within_a_process():
+    assert http_client.get_session() is http_client.get_session()
+
+
+def test_posts_are_sent_once_even_on_a_server_error():
+    hits = []
+
+    class Unavailable(BaseHTTPRequestHandler):
+        def do_POST(self):
+            hits.append(self.path)
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Unavailable)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        response = http_client._build_session().post(f'http://127.0.0.1:{server.server_port}/1/upload', data={'image': 'x'})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # A retried upload could store the image twice
+    assert response.status_code == 503
+    assert hits == ['/1/upload']
+
+
+def test_only_connection_failures_are_retried():
+    retry = http_client._build_session().get_adapter('https://api.imgbb.com').max_retries
+
+    assert retry.connect == http_client.Config.HTTP_RETRIES
+    assert (retry.read, retry.status, retry.other) == (0, 0, 0)
+    assert not retry.is_retry('POST', 503)
+
+
+def test_upstream_metrics_are_for_admins(app, admin_client):
+    assert app.test_client().get('/api/metrics/upstreams').status_code == 302
+    assert admin_client.get('/api/metrics/upstreams').status_code == 200
@@ -0,0 +1,114 @@
+import datetime
+import io
+import json
+
+from PIL import Image
+
+from app.config import Config
+from app.image_jobs import claim_image_job, drain_image_jobs, enqueue_image_job
+
+
+def _png():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), (40, 120, 180)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _upload(image_file):
+    return f'https://cdn.test/{image_file.name}'
+
+
+def test_job_carries_the_image_so_any_worker_can_run_it(app, db):
+    post_id = db.stories.insert_one({'content': {'image': None}, 'image_status': 'pending'}).inserted_id
+    enqueue_image_job(post_id, _png(), 'abc')
+
+    assert drain_image_jobs(_upload) == 1
+
+    post = db.stories.find_one({'_id': post_id})
+    assert post['image_status'] == 'ready'
+    assert post['content']['image'].startswith('https://cdn.test/abc.')
+    assert post['content']['thumbnail'].startswith('https://cdn.test/abc-thumb.')
+    assert db.image_jobs.count_documents({}) == 0
+
+
+def test_failed_upload_is_retried_with_backoff(app, db):
+    post_id = db.stories.insert_one({'content': {}, 'image_status': 'pending'}).inserted_id
+    enqueue_image_job(post_id, _png())
+
+    drain_image_jobs(lambda image_file: None)
+
+    job = db.image_jobs.find_one()
+    assert job['status'] == 'queued'
+    assert job['attempts'] == 1
+    assert job['next_attempt_at'] > job['created_at']
+    # Not due yet
+    assert claim_image_job() is None
+
+
+def test_job_gives_up_after_the_last_attempt(app, db, monkeypatch):
+    monkeypatch.setattr(Config, 'IMAGE_JOB_MAX_ATTEMPTS', 1)
+    post_id = db.stories.insert_one({'content': {}, 'image_status': 'pending'}).inserted_id
+    enqueue_image_job(post_id, _png())
+
+    drain_image_jobs(lambda image_file: None)
+
+    assert db.stories.find_one({'_id': post_id})['image_status'] == 'failed'
+    assert db.image_jobs.count_documents({}) == 0
+
+
+def test_job_that_is_not_an_image_fails_without_retrying(app, db):
+    post_id = db.stories.insert_one({'content': {}, 'image_status': 'pending'}).inserted_id
+    enqueue_image_job(post_id, b'not an image')
+
+    drain_image_jobs(_upload)
+
+    assert db.stories.find_one({'_id': post_id})['image_status'] == 'failed'
+    assert db.image_jobs.count_documents({}) == 0
+
+
+def test_job_without_image_data_fails(app, db):
+    post_id = db.stories.insert_one({'content': {}, 'image_status': 'pending'}).inserted_id
+    db.image_jobs.insert_one({'post_id': post_id, 'status': 'queued', 'attempts': 0,
+                              'next_attempt_at': datetime.datetime.now(datetime.timezone.utc)})
+
+    drain_image_jobs(_upload)
+
+    assert db.stories.find_one({'_id': post_id})['image_status'] == 'failed'
+
+
+def test_create_queues_the_image_instead_of_uploading(app, stories, monkeypatch):
+    monkeypatch.setattr(Config, 'IMAGE_UPLOADER', 'local')
+    story = {'title': 'Ice storm', 'content': {'description': 'Branches down'}, 'tag': 'Negative',
+             'location': {'type': 'Point', 'coordinates': [-73.6, 45.5]}, 'captchaToken': ''}
+
+    response = app.test_client().post('/api/posts/create', data={
+        'postData': json.dumps(story),
+        'image': (io.BytesIO(_png()), 'storm.png'),
+    })
+
+    assert response.status_code == 201
+    post = stories.stories.find_one({'title': 'Ice storm'})
+    assert post['image_status'] == 'pending'
+    job = stories.image_jobs.find_one()
+    assert job['post_id'] == post['_id']
+    assert bytes(job['data']) == _png()
+
+
+def test_same_picture_is_uploaded_once(app, stories, monkeypatch):
+    monkeypatch.setattr(Config, 'IMAGE_UPLOADER', 'local')
+    client = app.test_client()
+    story = {'content': {'description': 'Branches down'}, 'tag': 'Negative',
+             'location': {'type': 'Point', 'coordinates': [-73.6, 45.5]}, 'captchaToken': ''}
+
+    client.post('/api/posts/create', data={'postData': json.dumps(dict(story, title='First')),
+                                           'image': (io.BytesIO(_png()), 'storm.png')})
+    uploads = []
+    drain_image_jobs(lambda image_file: uploads.append(image_file.name) or f'https://cdn.test/{image_file.name}')
+    client.post('/api/posts/create', data={'postData': json.dumps(dict(story, title='Again')),
+                                           'image': (io.BytesIO(_png()), 'copy.png')})
+
+    first, again = (stories.stories.find_one({'title': title}) for title in ('First', 'Again'))
+    assert len(uploads) == 2  # The image and its thumbnail
+    assert again['image_status'] == 'ready'
+    assert again['content']['image'] == first['content']['image']
+    assert stories.image_jobs.count_documents({}) == 0
@@ -0,0 +1,59 @@
+import io
+import warnings
+
+import pytest
+from PIL import Image
+
+from app.config import Config
+from app.image_processing import hash_image, process_image
+
+
+def _jpeg(width, height, exif=None):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (40, 120, 180)).save(buffer, 'JPEG', exif=exif or Image.Exif())
+    return buffer.getvalue()
+
+
+def test_image_is_downscaled_and_gets_a_thumbnail(monkeypatch):
+    monkeypatch.setattr(Config, 'IMAGE_MAX_DIMENSION', 100)
+    monkeypatch.setattr(Config, 'IMAGE_THUMBNAIL_SIZE', 20)
+
+    processed = process_image(_jpeg(400, 200))
+
+    assert Image.open(io.BytesIO(processed.image)).size == (100, 50)
+    assert Image.open(io.BytesIO(processed.thumbnail)).size == (20, 10)
+    assert processed.extension in ('.webp', '.jpg')
+
+
+def test_exif_rotation_is_applied_and_metadata_dropped():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise
+    exif[0x010F] = 'Camera maker'
+
+    image = Image.open(io.BytesIO(process_image(_jpeg(80, 40, exif)).image))
+
+    assert image.size == (40, 80)
+    assert not image.getexif()
+
+
+def test_hash_rewinds_the_stream():
+    stream = io.BytesIO(b'picture')
+
+    assert hash_image(stream) == hash_image(io.BytesIO(b'picture'))
+    assert stream.read() == b'picture'
+
+
+@pytest.mark.filterwarnings('ignore::PIL.Image.DecompressionBombWarning')
+def test_images_over_the_pixel_limit_are_refused(monkeypatch):
+    # Between the limit and twice the limit, where Pillow itself only warns
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 2000)
+
+    with pytest.raises(ValueError, match='too large'):
+        process_image(_jpeg(64, 48))
+
+
+def test_importing_leaves_the_warning_filters_alone():
+    assert not any(
+        action == 'error' and category is Image.DecompressionBombWarning
+        for action, _, category, _, _ in warnings.filters
+    )
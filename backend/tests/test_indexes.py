@@ -0,0 +1,136 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+from repos import indexes
+from repos.indexes import _same_keys, _same_options, check_indexes, log_index_report, sync_indexes
+
+DECLARED = {
+    'stories': [
+        IndexModel([('status', ASCENDING), ('created_at', DESCENDING)], name='status_created_at'),
+        IndexModel([('tag', ASCENDING)], name='tag'),
+    ],
+}
+
+
+def test_sync_creates_the_declared_indexes(app, db, monkeypatch):
+    monkeypatch.setattr(indexes, 'INDEXES', DECLARED)
+
+    with app.app_context():
+        result = sync_indexes()
+
+    assert result == {'created': ['stories.status_created_at', 'stories.tag'], 'existing': [], 'conflicting': []}
+    assert {'status_created_at', 'tag'} <= set(db.stories.index_information())
+
+
+def test_sync_reports_existing_and_conflicting(app, db, monkeypatch):
+    monkeypatch.setattr(indexes, 'INDEXES', DECLARED)
+    db.stories.create_index([('status', ASCENDING), ('created_at', DESCENDING)], name='status_created_at')
+    # Same name, other keys: MongoDB would refuse to create the declared one
+    db.stories.create_index([('tag', DESCENDING)], name='tag')
+
+    with app.app_context():
+        result = sync_indexes()
+
+    assert result == {'created': [], 'existing': ['stories.status_created_at'], 'conflicting': ['stories.tag']}
+
+
+def test_sync_command_fails_on_a_conflict(app, db, monkeypatch):
+    monkeypatch.setattr(indexes, 'INDEXES', DECLARED)
+    db.stories.create_index([('tag', DESCENDING)], name='tag')
+
+    result = app.test_cli_runner().invoke(args=['indexes', 'sync'])
+
+    assert result.exit_code == 1
+    assert '1 indexes created, 0 already existed, 1 conflicting' in result.output
+
+
+def test_second_sync_creates_nothing(app, db, monkeypatch):
+    monkeypatch.setattr(indexes, 'INDEXES', DECLARED)
+    with app.app_context():
+        sync_indexes()
+        result = sync_indexes()
+
+    assert result['created'] == []
+    assert len(result['existing']) == 2
+
+
+def test_text_index_matches_what_the_server_reports():
+    model = IndexModel([('status', ASCENDING), ('title', TEXT), ('content.description', TEXT)],
+                       name='status_title_description_text', weights={'title': 3, 'content.description': 1})
+    info = {
+        'v': 2,
+        'key': [('status', 1), ('_fts', 'text'), ('_ftsx', 1)],
+        'weights': {'content.description': 1, 'title': 3},
+        'default_language': 'english',
+        'language_override': 'language',
+        'textIndexVersion': 3,
+    }
+
+    assert _same_keys(model, info)
+    assert _same_options(model, info)
+    assert not _same_options(model, dict(info, weights={'content.description': 1, 'title': 1}))
+
+
+def test_options_must_match():
+    model = IndexModel([('username', ASCENDING)], name='username_unique', unique=True)
+
+    assert _same_options(model, {'key': [('username', 1)], 'unique': True})
+    assert not _same_options(model, {'key': [('username', 1)]})
+
+
+def test_check_reports_missing_undeclared_and_unused(app, db, monkeypatch, capsys):
+    monkeypatch.setattr(indexes, 'INDEXES', DECLARED)
+    db.stories.create_index([('status', ASCENDING), ('created_at', DESCENDING)], name='status_created_at')
+    db.stories.create_index([('title', ASCENDING)], name='title')
+
+    with app.app_context():
+        report = check_indexes()
+
+    assert report == {'stories': {
+        'missing': ['tag'],
+        'undeclared': ['title'],
+        'unused': ['status_created_at', 'title'],
+    }}
+    assert log_index_report(report) is False
+    assert 'Missing index stories.tag' in capsys.readouterr().out
+
+
+def test_check_passes_once_synced(app, db, monkeypatch):
+    monkeypatch.setattr(indexes, 'INDEXES', DECLARED)
+
+    with app.app_context():
+        sync_indexes()
+        assert log_index_report(check_indexes()) is True
+
+
+def test_every_declared_index_can_be_created(app, db):
+    with app.app_context():
+        sync_indexes()
+        report = check_indexes()
+
+    assert all(not result['missing'] for result in report.values())
+
+
+def test_startup_index_work_is_bounded_and_cannot_stop_the_app(app, db, monkeypatch, capsys):
+    from pymongo import _csot
+    from pymongo.errors import ExecutionTimeout
+
+    from app.__init__ import prepare_indexes
+
+    deadlines = []
+
+    def times_out():
+        # Time left before the pymongo.timeout() deadline, None outside of one
+        deadlines.append(_csot.get_timeout())
+        raise ExecutionTimeout('operation exceeded time limit')
+
+    monkeypatch.setitem(app.config, 'SYNC_INDEXES_ON_STARTUP', True)
+    monkeypatch.setitem(app.config, 'STARTUP_INDEX_TIMEOUT', 0.5)
+    monkeypatch.setattr('app.__init__.sync_indexes', times_out)
+    monkeypatch.setattr('app.__init__.check_indexes', times_out)
+
+    prepare_indexes(app)
+
+    assert len(deadlines) == 2 and all(0 < deadline <= 0.5 for deadline in deadlines)
+    output = capsys.readouterr().out
+    assert 'Could not sync indexes on startup' in output
+    assert 'Could not check indexes on startup' in output
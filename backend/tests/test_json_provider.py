@@ -0,0 +1,60 @@
+import datetime
+import json
+
+import pytest
+from bson.objectid import ObjectId
+
+from app.json_provider import JSON_PROVIDERS, init_json
+
+DOCUMENT = {
+    '_id': ObjectId('65a1b2c3d4e5f60718293a4b'),
+    'created_at': datetime.datetime(2024, 5, 1, 12, 30),
+    'updated_at': datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+    'title': 'Flooded street',
+    'tags': ['Flooding'],
+}
+
+
+@pytest.fixture(params=sorted(JSON_PROVIDERS))
+def provider(request, app):
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    return JSON_PROVIDERS[request.param](app)
+
+
+def test_mongo_types_are_encoded(provider):
+    assert json.loads(provider.dumpb(DOCUMENT)) == {
+        '_id': '65a1b2c3d4e5f60718293a4b',
+        'created_at': '2024-05-01T12:30:00Z',
+        'updated_at': '2024-05-01T12:30:00Z',
+        'title': 'Flooded street',
+        'tags': ['Flooding'],
+    }
+
+
+def test_keys_keep_their_order(provider):
+    assert list(json.loads(provider.dumps({'b': 1, 'a': 2}))) == ['b', 'a']
+
+
+def test_providers_agree_on_compact_output(app):
+    pytest.importorskip('orjson')
+    stdlib, fast = JSON_PROVIDERS['stdlib'](app), JSON_PROVIDERS['orjson'](app)
+
+    assert stdlib.dumpb(DOCUMENT, separators=(',', ':')) == fast.dumpb(DOCUMENT, separators=(',', ':'))
+
+
+def test_listing_is_the_same_with_either_provider(app, stories, monkeypatch):
+    from app.post_events import posts_reset
+
+    pytest.importorskip('orjson')
+    client = app.test_client()
+    bodies = []
+    for name in ('stdlib', 'orjson'):
+        monkeypatch.setitem(app.config, 'JSON_PROVIDER', name)
+        monkeypatch.setattr(app, 'json', app.json)
+        init_json(app)
+        # Not from the body cache the other provider filled
+        posts_reset()
+        bodies.append(client.get('/api/posts?format=array').get_data())
+
+    assert bodies[0] == bodies[1]
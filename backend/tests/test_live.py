@@ -0,0 +1,158 @@
+import datetime
+import json
+
+import pytest
+
+from app.config import Config
+from app.live import LiveFeed, Subscriber, format_changes
+from app.pagination import encode_sync_token
+
+
+@pytest.fixture
+def feed(app, monkeypatch):
+    """A feed whose thread is never started: tests publish by hand"""
+    feed = LiveFeed(app)
+    monkeypatch.setattr('app.posts_routes.get_live_feed', lambda app: feed)
+    return feed
+
+
+def _events(chunks):
+    events = []
+    for chunk in ''.join(chunks).split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in chunk.splitlines() if not line.startswith(':') and ': ' in line)
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data']), fields.get('id')))
+    return events
+
+
+def test_format_changes_tags_every_event_with_the_sync_token():
+    changes = {'posts': [{'_id': 'a', 'title': 'Ice storm'}], 'deleted': ['b'], 'sync_token': 'T', 'reset': False}
+
+    assert _events(format_changes(changes, json.dumps)) == [
+        ('post', {'_id': 'a', 'title': 'Ice storm'}, 'T'),
+        ('delete', {'_id': 'b'}, 'T'),
+    ]
+    assert _events(format_changes(dict(changes, reset=True), json.dumps)) == [('reset', {}, 'T')]
+
+
+def test_subscriber_overflows_instead_of_growing():
+    subscriber = Subscriber(2)
+    for chunk in 'abc':
+        subscriber.push(chunk)
+
+    assert subscriber.overflowed
+    assert subscriber.pull(0) == ['a', 'b']
+
+
+def test_feed_broadcasts_each_change_once(app, stories, create_story, feed):
+    subscriber = feed.subscribe()
+    with app.app_context():
+        feed.publish_changes()
+        assert subscriber.pull(0) == []
+
+        create_story(title='Ice storm')
+        feed.publish_changes()
+        events = _events(subscriber.pull(0))
+        # The next poll re-reads the SYNC_OVERLAP window, which still holds the post
+        feed.publish_changes()
+
+    assert [(event, data['title']) for event, data, _ in events] == [('post', 'Ice storm')]
+    assert subscriber.pull(0) == []
+
+
+def test_stream_catches_up_from_last_event_id(app, stories, create_story, feed, monkeypatch):
+    monkeypatch.setattr(Config, 'LIVE_MAX_DURATION', 0)
+    token = app.test_client().get('/api/posts/changes').get_json()['sync_token']
+    create_story(title='Ice storm')
+
+    response = app.test_client().get('/api/posts/stream', headers={'Last-Event-ID': token})
+
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    body = response.get_data(as_text=True)
+    assert body.startswith(f'retry: {Config.LIVE_RETRY_MS}\n\n')
+    assert [(event, data['title']) for event, data, _ in _events([body])] == [('post', 'Ice storm')]
+    assert not feed._subscribers
+
+
+def test_stream_starts_from_the_listing_sync_token(app, stories, create_story, feed, monkeypatch):
+    monkeypatch.setattr(Config, 'LIVE_MAX_DURATION', 0)
+    client = app.test_client()
+    token = client.get('/api/posts/changes').get_json()['sync_token']
+    create_story(title='Ice storm')
+
+    body = client.get(f'/api/posts/stream?since={token}').get_data(as_text=True)
+
+    assert [(event, data['title']) for event, data, _ in _events([body])] == [('post', 'Ice storm')]
+
+
+def test_last_event_id_takes_precedence_over_since(app, stories, feed, monkeypatch):
+    monkeypatch.setattr(Config, 'LIVE_MAX_DURATION', 0)
+    client = app.test_client()
+    token = client.get('/api/posts/changes').get_json()['sync_token']
+    stale = encode_sync_token(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc))
+
+    body = client.get(f'/api/posts/stream?since={token}', headers={'Last-Event-ID': stale}).get_data(as_text=True)
+
+    assert [event for event, _, _ in _events([body])] == ['reset']
+
+
+def test_invalid_since_is_rejected(app, db, feed):
+    response = app.test_client().get('/api/posts/stream?since=not-a-token')
+
+    assert response.status_code == 400
+    assert 'since' in response.get_json()['errors']
+    assert not feed._subscribers
+
+
+def test_idle_feed_keeps_its_window_moving(app, stories, create_story, feed, monkeypatch):
+    monkeypatch.setattr(Config, 'LIVE_POLL_INTERVAL', 0)
+    before = feed._since
+    with app.app_context():
+        feed._poll()
+        assert feed._since > before
+
+        subscriber = feed.subscribe()
+        create_story(title='Ice storm')
+        feed._poll()
+
+    assert [(event, data['title']) for event, data, _ in _events(subscriber.pull(0))] == [('post', 'Ice storm')]
+
+
+def test_first_poll_of_a_new_feed_sends_changes(app, stories, create_story, feed):
+    subscriber = feed.subscribe()
+    create_story(title='Ice storm')
+
+    with app.app_context():
+        feed.publish_changes()
+
+    assert [event for event, _, _ in _events(subscriber.pull(0))] == ['post']
+
+
+def test_stale_last_event_id_gets_a_reset(app, stories, feed, monkeypatch):
+    monkeypatch.setattr(Config, 'LIVE_MAX_DURATION', 0)
+    token = encode_sync_token(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc))
+
+    body = app.test_client().get('/api/posts/stream', headers={'Last-Event-ID': token}).get_data(as_text=True)
+
+    assert [event for event, _, _ in _events([body])] == ['reset']
+
+
+def test_stream_refused_beyond_max_clients(app, db, feed, monkeypatch):
+    monkeypatch.setattr(Config, 'LIVE_MAX_CLIENTS', 1)
+    feed.subscribe()
+
+    response = app.test_client().get('/api/posts/stream')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+
+
+def test_stream_refused_without_starting_the_feed_when_live_clients_are_off(app, db, monkeypatch):
+    monkeypatch.setattr(Config, 'LIVE_MAX_CLIENTS', 0)
+    monkeypatch.setattr('app.posts_routes.get_live_feed', lambda app: pytest.fail('feed started'))
+
+    response = app.test_client().get('/api/posts/stream')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
@@ -0,0 +1,61 @@
+import datetime
+
+from bson.objectid import ObjectId
+
+from repos.migrations import normalize_post
+
+POST_ID = ObjectId('65a1b2c3d4e5f60718293a4b')
+
+
+def test_canonical_post_needs_no_update():
+    post = {'_id': POST_ID, 'created_at': datetime.datetime(2024, 5, 1), 'optional_tags': ['Smoke']}
+
+    assert normalize_post(post) is None
+
+
+def test_legacy_camel_case_fields_are_renamed():
+    post = {'_id': POST_ID, 'createdAt': '2024-05-01T12:30:00Z', 'optionalTags': ['Flooding']}
+
+    assert normalize_post(post) == {
+        '$set': {
+            'created_at': datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            'optional_tags': ['Flooding'],
+        },
+        '$unset': {'createdAt': '', 'optionalTags': ''},
+    }
+
+
+def test_string_created_at_is_parsed():
+    post = {'_id': POST_ID, 'created_at': '2024-05-01T12:30:00+00:00', 'optional_tags': []}
+
+    assert normalize_post(post)['$set']['created_at'] == datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc)
+
+
+def test_missing_or_unparseable_date_falls_back_to_the_object_id_time():
+    post = {'_id': POST_ID, 'created_at': 'last spring', 'optionalTags': 'Flooding'}
+
+    update = normalize_post(post)
+
+    assert update['$set'] == {'created_at': POST_ID.generation_time, 'optional_tags': []}
+    assert update['$unset'] == {'optionalTags': ''}
+
+
+def test_normalize_command_rewrites_legacy_stories_and_resumes(app, db):
+    db.stories.insert_many([
+        {'_id': ObjectId('65a1b2c3d4e5f60718293a01'), 'createdAt': '2024-05-01T12:30:00Z', 'optionalTags': ['Flooding']},
+        {'_id': ObjectId('65a1b2c3d4e5f60718293a02'), 'created_at': datetime.datetime(2024, 5, 2), 'optional_tags': []},
+        {'_id': ObjectId('65a1b2c3d4e5f60718293a03')},
+    ])
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['posts', 'normalize', '--batch-size', '1'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Done: 2 legacy stories scanned, 2 modified' in result.output
+    for post in db.stories.find():
+        assert isinstance(post['created_at'], datetime.datetime)
+        assert isinstance(post['optional_tags'], list)
+        assert 'createdAt' not in post and 'optionalTags' not in post
+
+    # The saved progress points past the last story, so a resumed run has nothing left
+    assert 'Done: 0 legacy stories scanned' in runner.invoke(args=['posts', 'normalize', '--resume']).output
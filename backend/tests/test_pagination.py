@@ -0,0 +1,115 @@
+import datetime
+
+import pytest
+from bson.objectid import ObjectId
+
+from app.pagination import (
+    InvalidCursorError,
+    _pack,
+    after_cursor,
+    after_search_cursor,
+    decode_cursor,
+    decode_search_cursor,
+    decode_sync_token,
+    encode_cursor,
+    encode_search_cursor,
+    encode_sync_token,
+)
+
+POST_ID = ObjectId('65a1b2c3d4e5f60718293a4b')
+CREATED_AT = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc)
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(CREATED_AT, POST_ID)) == (CREATED_AT, POST_ID)
+    # The API returns createdAt as an ISO string
+    assert decode_cursor(encode_cursor(CREATED_AT.isoformat(), str(POST_ID))) == (CREATED_AT, POST_ID)
+
+
+def test_cursor_without_created_at():
+    assert decode_cursor(encode_cursor(None, POST_ID)) == (None, POST_ID)
+    assert decode_cursor(encode_cursor(12345, POST_ID)) == (None, POST_ID)
+
+
+def test_cursor_is_url_safe():
+    token = encode_cursor(CREATED_AT, POST_ID)
+
+    assert set(token) <= set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_')
+
+
+@pytest.mark.parametrize('token', [
+    '',
+    'not base64 !',
+    encode_cursor(CREATED_AT, POST_ID)[:-4],
+    encode_cursor(CREATED_AT, POST_ID) + 'AAAA',
+])
+def test_tampered_cursor_is_rejected(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token)
+
+
+@pytest.mark.parametrize('values', [
+    [CREATED_AT.isoformat(), 'not-an-id'],
+    [CREATED_AT.isoformat(), 12345],
+    ['yesterday', str(POST_ID)],
+    [CREATED_AT.isoformat()],
+])
+def test_cursor_with_bad_values_is_rejected(values):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(_pack(values))
+
+
+def test_after_cursor_keyset():
+    query = {'status': 'approved'}
+
+    assert after_cursor(query, (CREATED_AT, POST_ID)) == {'$and': [query, {'$or': [
+        {'created_at': {'$lt': CREATED_AT}},
+        {'created_at': CREATED_AT, '_id': {'$lt': POST_ID}},
+        {'created_at': None},
+    ]}]}
+
+
+def test_after_cursor_past_posts_without_created_at():
+    query = {'status': 'approved'}
+
+    assert after_cursor(query, (None, POST_ID)) == {'$and': [query, {'created_at': None, '_id': {'$lt': POST_ID}}]}
+
+
+def test_search_cursor_round_trip():
+    assert decode_search_cursor(encode_search_cursor(2.5, POST_ID)) == (2.5, POST_ID)
+    assert decode_search_cursor(encode_search_cursor(1, str(POST_ID))) == (1.0, POST_ID)
+
+
+@pytest.mark.parametrize('token', [
+    'not base64 !',
+    encode_cursor(CREATED_AT, POST_ID),
+    encode_search_cursor(2.5, POST_ID)[:-4],
+])
+def test_tampered_search_cursor_is_rejected(token):
+    with pytest.raises(InvalidCursorError):
+        decode_search_cursor(token)
+
+
+@pytest.mark.parametrize('values', [[2.5, 'not-an-id'], ['high', str(POST_ID)], [2.5]])
+def test_search_cursor_with_bad_values_is_rejected(values):
+    with pytest.raises(InvalidCursorError):
+        decode_search_cursor(_pack(values))
+
+
+def test_after_search_cursor_keyset():
+    assert after_search_cursor((2.5, POST_ID)) == {'$or': [
+        {'score': {'$lt': 2.5}},
+        {'score': 2.5, '_id': {'$lt': POST_ID}},
+    ]}
+
+
+def test_sync_token_round_trip():
+    assert decode_sync_token(encode_sync_token(CREATED_AT)) == CREATED_AT
+    # Naive datetimes are UTC, as PyMongo returns them
+    assert decode_sync_token(encode_sync_token(CREATED_AT.replace(tzinfo=None))) == CREATED_AT
+
+
+@pytest.mark.parametrize('token', ['', 'not base64 !', encode_cursor(CREATED_AT, POST_ID)])
+def test_tampered_sync_token_is_rejected(token):
+    with pytest.raises(InvalidCursorError):
+        decode_sync_token(token)
@@ -0,0 +1,163 @@
+import json
+
+from app.pagination import _pack
+
+
+def _titles(response):
+    return sorted(post['title'] for post in response.get_json()['posts'])
+
+
+def test_bbox_returns_only_posts_inside(app, stories):
+    response = app.test_client().get('/api/posts?bbox=-80,40,-70,50')
+
+    assert response.status_code == 200
+    assert _titles(response) == ['Flooded street']
+
+
+def test_bbox_snapped_to_zoom_keeps_posts_near_the_edge(app, stories):
+    # -75.7 lies just west of the box, inside the zoom 4 tile the box snaps out to
+    response = app.test_client().get('/api/posts?bbox=-75.6,45,-75,46&zoom=4')
+
+    assert _titles(response) == ['Flooded street']
+
+
+def test_bbox_combines_with_tag_filter(app, stories):
+    response = app.test_client().get('/api/posts?bbox=-130,40,-60,50&tag=Positive')
+
+    assert _titles(response) == ['New sea wall']
+
+
+def test_from_to_is_a_half_open_created_at_range(app, stories):
+    response = app.test_client().get('/api/posts?from=2024-05-02T00:00:00Z&to=2024-05-03T00:00:00Z')
+
+    assert _titles(response) == ['Smoke all summer']
+
+
+def test_invalid_bbox_is_rejected(app, stories):
+    response = app.test_client().get('/api/posts?bbox=-70,40,-80,50')
+
+    assert response.status_code == 400
+    assert 'bbox' in response.get_json()['errors']
+
+
+def test_pages_follow_next_cursor_newest_first(app, stories):
+    client = app.test_client()
+    titles, cursor = [], None
+    for _ in range(3):
+        page = client.get('/api/posts?limit=1' + (f'&cursor={cursor}' if cursor else '')).get_json()
+        titles += [post['title'] for post in page['posts']]
+        cursor = page['next_cursor']
+
+    assert titles == ['New sea wall', 'Smoke all summer', 'Flooded street']
+    assert cursor is None
+
+
+def test_last_page_has_no_next_cursor(app, stories):
+    page = app.test_client().get('/api/posts?limit=3').get_json()
+
+    assert len(page['posts']) == 3
+    assert page['next_cursor'] is None
+
+
+def test_array_format_returns_every_post_as_a_list(app, stories):
+    posts = app.test_client().get('/api/posts?format=array&limit=1').get_json()
+
+    assert sorted(post['title'] for post in posts) == ['Flooded street', 'New sea wall', 'Smoke all summer']
+    assert all(post['optionalTags'] == [] and 'createdAt' in post for post in posts)
+
+
+def test_invalid_cursor_is_rejected(app, stories):
+    response = app.test_client().get('/api/posts?cursor=not-a-cursor')
+
+    assert response.status_code == 400
+    assert 'cursor' in response.get_json()['errors']
+
+
+def test_cursor_with_a_malformed_id_is_rejected(app, stories):
+    cursor = _pack(['2024-05-02T00:00:00+00:00', 'not-an-id'])
+
+    response = app.test_client().get(f'/api/posts?cursor={cursor}')
+
+    assert response.status_code == 400
+    assert 'cursor' in response.get_json()['errors']
+
+
+def test_ndjson_streams_one_post_per_line_newest_first(app, stories):
+    response = app.test_client().get('/api/posts', headers={'Accept': 'application/x-ndjson'})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['title'] for line in lines] == ['New sea wall', 'Smoke all summer', 'Flooded street']
+
+
+def test_stream_returns_a_json_array(app, stories):
+    response = app.test_client().get('/api/posts?stream=1&tag=Negative')
+
+    assert response.status_code == 200
+    assert [post['title'] for post in json.loads(response.get_data())] == ['Smoke all summer', 'Flooded street']
+
+
+def test_stream_of_nothing_is_an_empty_array(app, stories):
+    response = app.test_client().get('/api/posts?stream=1&bbox=0,0,1,1')
+
+    assert json.loads(response.get_data()) == []
+
+
+def test_fields_limit_the_response_keys(app, stories):
+    page = app.test_client().get('/api/posts?fields=title,tag&limit=2').get_json()
+
+    # _id is always returned, it is what clients key posts by
+    assert [sorted(post) for post in page['posts']] == [['_id', 'tag', 'title']] * 2
+    assert [post['title'] for post in page['posts']] == ['New sea wall', 'Smoke all summer']
+    # The cursor still comes from created_at, which was looked up but not returned
+    assert page['next_cursor']
+
+
+def test_summary_fields_apply_to_streams(app, stories):
+    response = app.test_client().get('/api/posts?fields=summary', headers={'Accept': 'application/x-ndjson'})
+
+    for line in response.get_data(as_text=True).splitlines():
+        assert sorted(json.loads(line)) == ['_id', 'location', 'optionalTags', 'tag', 'title']
+
+
+def test_unknown_field_is_rejected(app, stories):
+    response = app.test_client().get('/api/posts?fields=title,password')
+
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == {'fields': ['Unknown field: password']}
+
+
+def test_post_detail_has_the_full_content(app, stories):
+    client = app.test_client()
+    summary = client.get('/api/posts?fields=_id,title&limit=1').get_json()['posts'][0]
+
+    post = client.get(f"/api/posts/{summary['_id']}").get_json()
+
+    assert post['title'] == 'New sea wall'
+    assert post['content']['description'] == 'The harbour got a higher wall'
+
+
+def test_post_detail_hides_unapproved_and_bad_ids(app, stories):
+    pending = stories.stories.insert_one({'title': 'Draft', 'status': 'pending'}).inserted_id
+    client = app.test_client()
+
+    assert client.get(f'/api/posts/{pending}').status_code == 404
+    assert client.get('/api/posts/not-an-id').status_code == 400
+
+
+def test_legacy_stories_are_shaped_like_normalized_ones(app, stories):
+    stories.stories.insert_one({'title': 'Old story', 'status': 'approved', 'tag': 'Neutral',
+                                'createdAt': '2023-01-01T00:00:00Z', 'optionalTags': ['Heat']})
+
+    posts = app.test_client().get('/api/posts?format=array&tag=Neutral').get_json()
+
+    assert posts == [{'_id': posts[0]['_id'], 'title': 'Old story', 'tag': 'Neutral', 'status': 'approved',
+                      'createdAt': '2023-01-01T00:00:00Z', 'optionalTags': ['Heat']}]
+
+
+def test_created_at_is_sent_in_utc_with_milliseconds(app, stories):
+    post = app.test_client().get('/api/posts?fields=createdAt,optionalTags&tag=Positive').get_json()['posts'][0]
+
+    assert post['createdAt'] == '2024-05-03T00:00:00.000Z'
+    assert post['optionalTags'] == []
@@ -0,0 +1,39 @@
+from app.versioning import VERSION_ID, posts_version
+
+
+def _titles(client, query=''):
+    return sorted(post['title'] for post in client.get(f'/api/posts?{query}').get_json()['posts'])
+
+
+def test_listing_is_served_from_the_cache(app, stories):
+    client = app.test_client()
+    before = _titles(client)
+
+    # Not reported through post_events, so the cached body stays current
+    stories.stories.delete_many({'tag': 'Positive'})
+
+    assert _titles(client) == before
+    assert _titles(client, 'tag=Positive') == []
+
+
+def test_a_write_invalidates_cached_listings(app, stories, create_story):
+    client = app.test_client()
+    _titles(client)
+
+    create_story(title='Ice storm')
+
+    assert 'Ice storm' in _titles(client)
+
+
+def test_cached_body_follows_the_shared_version(app, stories, monkeypatch):
+    monkeypatch.setattr(posts_version, 'check_interval', 0)
+    client = app.test_client()
+    etag = client.get('/api/posts').headers['ETag']
+
+    # Another worker's write only shows up as the shared counter moving
+    stories.stories.delete_many({'tag': 'Positive'})
+    stories.meta.update_one({'_id': VERSION_ID}, {'$inc': {'value': 1}})
+
+    response = client.get('/api/posts')
+    assert response.headers['ETag'] != etag
+    assert sorted(post['title'] for post in response.get_json()['posts']) == ['Flooded street', 'Smoke all summer']
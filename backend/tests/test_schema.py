@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from marshmallow import ValidationError
+
+from app.config import Config
+from schemas.schema import PostQuerySchema, PostSchema, SearchQuerySchema
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_schema_module_imports_on_its_own():
+    # A fresh interpreter, so nothing from the app package is loaded first
+    result = subprocess.run([sys.executable, '-c', 'import schemas.schema'], cwd=BACKEND_DIR,
+                            env=dict(os.environ), capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_field_list_expands_summary_and_keeps_order():
+    args = PostQuerySchema().load({'fields': 'tag, summary,title'})
+
+    assert args['fieldset'] == ['tag', '_id', 'title', 'location', 'optionalTags']
+
+
+def test_field_list_rejects_unknown_fields():
+    with pytest.raises(ValidationError) as excinfo:
+        PostQuerySchema().load({'fields': 'title,password'})
+
+    assert excinfo.value.messages == {'fields': ['Unknown field: password']}
+
+
+def test_page_sizes_follow_the_config_when_loaded(monkeypatch):
+    monkeypatch.setattr(Config, 'POSTS_PAGE_SIZE', 7)
+    monkeypatch.setattr(Config, 'POSTS_MAX_PAGE_SIZE', 10)
+
+    assert PostQuerySchema().load({})['limit'] == 7
+    with pytest.raises(ValidationError) as excinfo:
+        PostQuerySchema().load({'limit': '11'})
+    assert 'limit' in excinfo.value.messages
+
+
+def test_search_text_length_follows_the_config(monkeypatch):
+    monkeypatch.setattr(Config, 'SEARCH_MAX_QUERY_LENGTH', 5)
+
+    assert SearchQuerySchema().load({'q': 'smoke'})['q'] == 'smoke'
+    with pytest.raises(ValidationError):
+        SearchQuerySchema().load({'q': 'wildfire'})
+
+
+def _location_errors(location):
+    story = {'title': 't', 'content': {}, 'tag': 'Neutral', 'captchaToken': 'x', 'location': location}
+    try:
+        PostSchema().load(story)
+    except ValidationError as err:
+        return err.messages.get('location')
+    return None
+
+
+def test_post_location_accepts_a_geojson_point():
+    assert _location_errors({'type': 'Point', 'coordinates': [-75.7, 45.4]}) is None
+    assert _location_errors({'type': 'Point', 'coordinates': [180, -90]}) is None
+
+
+@pytest.mark.parametrize('location', [
+    {'type': 'Polygon', 'coordinates': [-75.7, 45.4]},
+    {'type': 'Point'},
+    {'type': 'Point', 'coordinates': [-75.7]},
+    {'type': 'Point', 'coordinates': ['-75.7', '45.4']},
+    {'type': 'Point', 'coordinates': [True, 45.4]},
+    {'type': 'Point', 'coordinates': [-181, 45.4]},
+    {'type': 'Point', 'coordinates': [-75.7, 91]},
+    {'type': 'Point', 'coordinates': [float('nan'), 45.4]},
+])
+def test_post_location_rejects_what_the_2dsphere_index_would(location):
+    assert _location_errors(location)
@@ -0,0 +1,74 @@
+def _titles(response):
+    return [post['title'] for post in response.get_json()['posts']]
+
+
+def test_search_matches_title_and_description(app, stories):
+    response = app.test_client().get('/api/posts/search?q=wildfire')
+
+    assert response.status_code == 200
+    posts = response.get_json()['posts']
+    assert [post['title'] for post in posts] == ['Smoke all summer']
+    assert posts[0]['score'] > 0
+    assert 'content' not in posts[0]
+
+
+def test_more_relevant_results_come_first(app, stories):
+    # "wall" appears twice in the sea wall story, "river" once in the flood one
+    response = app.test_client().get('/api/posts/search?q=wall river')
+
+    assert _titles(response) == ['New sea wall', 'Flooded street']
+
+
+def test_excluded_words_drop_results(app, stories):
+    response = app.test_client().get('/api/posts/search?q=the -river')
+
+    assert 'Flooded street' not in _titles(response)
+
+
+def test_search_combines_with_tag_and_bbox(app, stories):
+    client = app.test_client()
+
+    assert _titles(client.get('/api/posts/search?q=the&tag=Positive')) == ['New sea wall']
+    assert _titles(client.get('/api/posts/search?q=the&bbox=-80,40,-70,50')) == ['Flooded street']
+
+
+def test_search_hides_unapproved_posts(app, stories):
+    stories.stories.insert_one({'title': 'Wildfire draft', 'status': 'pending'})
+
+    assert _titles(app.test_client().get('/api/posts/search?q=wildfire')) == ['Smoke all summer']
+
+
+def test_search_pages_follow_next_cursor(app, stories):
+    client = app.test_client()
+    titles, cursor = [], None
+    for _ in range(3):
+        page = client.get('/api/posts/search?q=the&limit=1' + (f'&cursor={cursor}' if cursor else '')).get_json()
+        titles += [post['title'] for post in page['posts']]
+        cursor = page['next_cursor']
+
+    assert sorted(titles) == ['Flooded street', 'New sea wall', 'Smoke all summer']
+    assert cursor is None
+
+
+def test_search_text_is_required(app, stories):
+    client = app.test_client()
+
+    assert 'q' in client.get('/api/posts/search').get_json()['errors']
+    response = client.get('/api/posts/search?q=%20%20')
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == {'q': ['Search text is required.']}
+
+
+def test_invalid_search_cursor_is_rejected(app, stories):
+    response = app.test_client().get('/api/posts/search?q=the&cursor=not-a-cursor')
+
+    assert response.status_code == 400
+    assert 'cursor' in response.get_json()['errors']
+
+
+def test_unchanged_search_is_not_modified(app, stories):
+    client = app.test_client()
+    etag = client.get('/api/posts/search?q=wildfire').headers['ETag']
+
+    assert client.get('/api/posts/search?q=wildfire', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/posts/search?q=wall', headers={'If-None-Match': etag}).status_code == 200
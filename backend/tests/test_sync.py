@@ -0,0 +1,89 @@
+import datetime
+
+from app.pagination import encode_sync_token
+
+
+def _changes(client, token=None):
+    response = client.get('/api/posts/changes' + (f'?since={token}' if token else ''))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_first_request_asks_for_a_full_load(app, stories):
+    response = app.test_client().get('/api/posts/changes')
+
+    changes = response.get_json()
+    assert changes['reset'] is True
+    assert changes['sync_token']
+    assert response.headers['Cache-Control'] == 'no-store'
+
+
+def test_changes_since_a_token(app, stories, create_story):
+    client = app.test_client()
+    token = _changes(client)['sync_token']
+
+    post_id = create_story(title='Ice storm')
+    changes = _changes(client, token)
+
+    assert changes['reset'] is False
+    assert [(post['_id'], post['title']) for post in changes['posts']] == [(post_id, 'Ice storm')]
+    assert changes['deleted'] == []
+    assert changes['sync_token'] != token
+
+
+def test_deleted_posts_come_back_as_tombstones(app, stories):
+    client = app.test_client()
+    token = _changes(client)['sync_token']
+    flooded = stories.stories.find_one({'title': 'Flooded street'})
+
+    client.delete(f"/api/posts/delete/{flooded['_id']}")
+    changes = _changes(client, token)
+
+    assert changes['posts'] == []
+    assert changes['deleted'] == [str(flooded['_id'])]
+
+
+def test_fields_apply_to_changed_posts(app, stories, create_story):
+    client = app.test_client()
+    token = _changes(client)['sync_token']
+    create_story()
+
+    posts = client.get(f'/api/posts/changes?since={token}&fields=title').get_json()['posts']
+
+    assert [sorted(post) for post in posts] == [['_id', 'title']]
+
+
+def test_tokens_before_a_reset_or_past_the_tombstone_ttl_reload(app, stories, monkeypatch):
+    from app.post_events import posts_reset
+
+    client = app.test_client()
+    token = _changes(client)['sync_token']
+    posts_reset()
+    assert _changes(client, token)['reset'] is True
+
+    token = _changes(client)['sync_token']
+    monkeypatch.setattr('app.sync.Config.SYNC_TOMBSTONE_TTL', -1)
+    assert _changes(client, token)['reset'] is True
+
+
+def test_too_many_changes_reload(app, stories, create_story, monkeypatch):
+    client = app.test_client()
+    token = _changes(client)['sync_token']
+    create_story()
+    create_story()
+
+    monkeypatch.setattr('app.sync.Config.SYNC_MAX_CHANGES', 1)
+    changes = _changes(client, token)
+
+    assert changes['reset'] is True
+    assert changes['posts'] == []
+
+
+def test_invalid_sync_token_is_rejected(app, stories):
+    client = app.test_client()
+    truncated = encode_sync_token(datetime.datetime(2024, 5, 1))[:-2]
+
+    for token in ('not-a-token', truncated):
+        response = client.get(f'/api/posts/changes?since={token}')
+        assert response.status_code == 400
+        assert 'since' in response.get_json()['errors']
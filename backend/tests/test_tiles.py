@@ -0,0 +1,70 @@
+from app.config import Config
+
+
+def _titles(response):
+    return sorted(feature['properties']['title'] for feature in response.get_json()['features'])
+
+
+def test_world_tile_holds_every_post(app, stories):
+    response = app.test_client().get('/api/tiles/0/0/0')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/geo+json'
+    assert _titles(response) == ['Flooded street', 'New sea wall', 'Smoke all summer']
+
+
+def test_tile_holds_only_its_posts(app, stories):
+    # At zoom 2 Vancouver sits in tile x=0, Ottawa and Halifax in x=1
+    client = app.test_client()
+
+    assert _titles(client.get('/api/tiles/2/0/1.geojson')) == ['Smoke all summer']
+    assert _titles(client.get('/api/tiles/2/1/1.geojson')) == ['Flooded street', 'New sea wall']
+
+
+def test_unchanged_tile_is_not_resent(app, stories):
+    client = app.test_client()
+    first = client.get('/api/tiles/0/0/0')
+
+    again = client.get('/api/tiles/0/0/0', headers={'If-None-Match': first.headers['ETag']})
+
+    assert again.status_code == 304
+
+
+def test_cached_tile_follows_a_new_post(app, stories, create_story):
+    client = app.test_client()
+    client.get('/api/tiles/2/1/1')
+
+    create_story(title='Ice storm', lon=-73.6, lat=45.5)
+
+    assert 'Ice storm' in _titles(client.get('/api/tiles/2/1/1'))
+
+
+def test_tile_outside_the_grid_is_not_found(app, stories):
+    assert app.test_client().get('/api/tiles/2/4/0').status_code == 404
+
+
+def test_expired_tile_sees_writes_from_other_workers(app, stories, monkeypatch):
+    from app import tiles
+
+    monkeypatch.setattr(tiles.tile_cache, 'ttl', 0)
+    client = app.test_client()
+    client.get('/api/tiles/0/0/0')
+
+    # Written by another worker, so no eviction ran here
+    stories.stories.update_many({'tag': 'Positive'}, {'$set': {'status': 'pending'}})
+
+    assert _titles(client.get('/api/tiles/0/0/0')) == ['Flooded street', 'Smoke all summer']
+
+
+def test_tile_etag_round_trip_with_gzip(app, stories, monkeypatch):
+    monkeypatch.setattr(Config, 'COMPRESS_MIN_SIZE', 0)
+    client = app.test_client()
+
+    first = client.get('/api/tiles/0/0/0', headers={'Accept-Encoding': 'gzip'})
+    again = client.get('/api/tiles/0/0/0', headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+
+    assert first.headers['Content-Encoding'] == 'gzip'
+    assert first.headers['ETag'].startswith('W/')
+    assert first.headers['ETag'] == again.headers['ETag']
+    assert again.status_code == 304
+    assert 'Accept-Encoding' in again.headers['Vary']
@@ -0,0 +1,67 @@
+import datetime
+
+
+def _buckets(response):
+    return [(bucket['start'], bucket['counts']) for bucket in response.get_json()['buckets']]
+
+
+def test_daily_buckets_split_by_tag(app, stories):
+    response = app.test_client().get('/api/posts/timeline')
+
+    assert response.status_code == 200
+    assert response.get_json()['bucket'] == 'day'
+    assert _buckets(response) == [
+        ('2024-05-01T00:00:00Z', {'Negative': 1}),
+        ('2024-05-02T00:00:00Z', {'Negative': 1}),
+        ('2024-05-03T00:00:00Z', {'Positive': 1}),
+    ]
+
+
+def test_weeks_start_on_monday(app, stories):
+    response = app.test_client().get('/api/posts/timeline?bucket=week')
+
+    assert response.get_json()['buckets'] == [
+        {'start': '2024-04-29T00:00:00Z', 'counts': {'Negative': 2, 'Positive': 1}, 'total': 3},
+    ]
+
+
+def test_timeline_filters(app, stories):
+    client = app.test_client()
+
+    assert _buckets(client.get('/api/posts/timeline?bucket=month&tag=Negative')) == [
+        ('2024-05-01T00:00:00Z', {'Negative': 2}),
+    ]
+    assert _buckets(client.get('/api/posts/timeline?from=2024-05-02T00:00:00Z&to=2024-05-03T00:00:00Z')) == [
+        ('2024-05-02T00:00:00Z', {'Negative': 1}),
+    ]
+
+
+def test_unknown_bucket_is_rejected(app, stories):
+    response = app.test_client().get('/api/posts/timeline?bucket=year')
+
+    assert response.status_code == 400
+    assert 'bucket' in response.get_json()['errors']
+
+
+def test_new_posts_land_in_the_open_bucket(app, stories, create_story):
+    client = app.test_client()
+    client.get('/api/posts/timeline')
+
+    create_story()
+
+    buckets = client.get('/api/posts/timeline').get_json()['buckets']
+    today = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT00:00:00Z')
+    assert len(buckets) == 4
+    assert buckets[-1] == {'start': today, 'counts': {'Negative': 1}, 'total': 1}
+
+
+def test_changes_to_closed_buckets_evict_them(app, stories):
+    client = app.test_client()
+    client.get('/api/posts/timeline')
+    flooded = stories.stories.find_one({'title': 'Flooded street'})
+
+    assert client.delete(f"/api/posts/delete/{flooded['_id']}").status_code == 200
+
+    assert [start for start, _ in _buckets(client.get('/api/posts/timeline'))] == [
+        '2024-05-02T00:00:00Z', '2024-05-03T00:00:00Z',
+    ]
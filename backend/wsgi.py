@@ -0,0 +1,6 @@
+# WSGI entry point for gunicorn (gunicorn.conf.py); `app:app` would resolve to the app/ package, not app.py
+from app.__init__ import create_app
+from app.posts_routes import posts_routes_blueprint
+
+app = create_app()
+app.register_blueprint(posts_routes_blueprint)
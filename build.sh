@@ -9,17 +9,22 @@ cd frontend
 npm install
 npm run build
 
-# Create the static directory in backend if it doesn't exist
+# Create the static directory Flask serves from (Config.STATIC_DIR) if it doesn't exist
 echo "Creating static directory in backend..."
-mkdir -p ../backend/static
+mkdir -p ../backend/app/static
 
 # Copy the frontend build files to the backend static directory
-echo "Copying frontend build to backend/static..."
+echo "Copying frontend build to backend/app/static..."
 if [ -d "dist" ] && [ "$(ls -A dist)" ]; then
-    cp -R dist/* ../backend/static/
+    cp -R dist/* ../backend/app/static/
 else
     echo "Error: Frontend build directory is empty or doesn't exist"
     exit 1
 fi
 
-echo "Build and copy complete!"
\ No newline at end of file
+# Write .br/.gz siblings so Flask can serve compressed files without compressing per request
+echo "Precompressing static files..."
+cd ../backend
+python -m app.assets app/static
+
+echo "Build and copy complete!"
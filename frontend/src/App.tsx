@@ -1,5 +1,5 @@
 // App.tsx
-import { useCallback, useEffect, useState } from 'react';
+import { useCallback, useEffect, useRef, useState } from 'react';
 import { NotificationProvider } from './components/common/NotificationContext';
 import { ThemeProvider } from './themes/ThemeContext';
 
@@ -8,7 +8,7 @@ import './App.css';
 import './components/Overlay.css';
 import MapWithForm from './components/MapWithForm';
 import Taskbar from './components/Taskbar';
-import { createPost, fetchPosts } from './services/postService';
+import { createPost, fetchChanges, fetchPosts, subscribeToPosts } from './services/postService';
 import { Post } from './components/posts/types';
 import Home from './components/Home';
 import WelcomePopup from './components/WelcomePopup';
@@ -19,6 +19,9 @@ import TermsOfUsePopUp from './components/TermsOfUsePopUp';
 import PrivacyPolicyPopup from './components/PrivacyPolicyPopup';
 import CreatePostInstructionsPopup from './components/CreatePostInstructionsPopup';
 
+// How often to fetch the deltas when the server has no live stream slot left
+const CHANGES_POLL_INTERVAL_MS = 30000;
+
 const AppContent: React.FC = () => {
   const location = useLocation();
   const navigate = useNavigate();
@@ -35,26 +38,76 @@ const AppContent: React.FC = () => {
   const isOtherPage = ['/about', '/faqs', '/moderation'].includes(location.pathname);
   const [isInstructionsPopupOpen, setIsInstructionsPopupOpen] = useState(false);
 
+  const syncToken = useRef<string | null>(null);
+  // Token of the first load, where the live stream starts
+  const [streamSince, setStreamSince] = useState<string | null>(null);
+
   const loadPosts = useCallback(async () => {
     try {
+      // Take the token first so changes made during the download come back in the next delta
+      const { syncToken: token } = await fetchChanges();
       const data = await fetchPosts();
+      syncToken.current = token;
+      setStreamSince(current => current ?? token);
       setPosts(data);
     } catch (error) {
       console.error('Error loading posts:', error);
     }
   }, []);
 
+  // Apply only what changed since the last load instead of downloading every post again
+  const refreshPosts = useCallback(async () => {
+    if (!syncToken.current) {
+      return loadPosts();
+    }
+    try {
+      const changes = await fetchChanges(syncToken.current);
+      if (changes.reset) {
+        return loadPosts();
+      }
+      syncToken.current = changes.syncToken;
+      const removed = new Set([...changes.deleted, ...changes.posts.map(post => post._id)]);
+      setPosts(current => [...changes.posts, ...current.filter(post => !removed.has(post._id))]);
+    } catch (error) {
+      console.error('Error refreshing posts:', error);
+    }
+  }, [loadPosts]);
+
   useEffect(() => {
     loadPosts();
     setIsWelcomePopupOpen(true);
   }, [loadPosts]);
+
+  // Newly approved and moderated posts show up on the map without reloading
+  useEffect(() => {
+    if (!streamSince) {
+      return;
+    }
+    let pollTimer: ReturnType<typeof setInterval> | undefined;
+    const unsubscribe = subscribeToPosts({
+      onPost: post => setPosts(current => [post, ...current.filter(existing => existing._id !== post._id)]),
+      onDelete: id => setPosts(current => current.filter(existing => existing._id !== id)),
+      onReset: () => loadPosts(),
+      onToken: token => { syncToken.current = token; },
+      // No live slot left on the server: fetch the deltas now and then instead
+      onUnavailable: () => {
+        if (!pollTimer) {
+          pollTimer = setInterval(refreshPosts, CHANGES_POLL_INTERVAL_MS);
+        }
+      },
+    }, streamSince);
+    return () => {
+      unsubscribe();
+      clearInterval(pollTimer);
+    };
+  }, [streamSince, loadPosts, refreshPosts]);
     
   const handlePostSubmit = async (formData: any): Promise<void> => {
     try {
       await createPost(formData);
-      // Delay the posts reload to ensure smooth notification
+      // Delay the posts refresh to ensure smooth notification
       setTimeout(() => {
-        loadPosts();
+        refreshPosts();
       }, 500);
     } catch (error) {
       console.error('Error creating post:', error);
@@ -236,7 +236,7 @@ const CRCMap: React.FC<MapProps> = ({ posts, onMapClick, onMapRightClick, taskba
                 <p className="map-popup-description">{popupInfo.content.description}</p>
                 {popupInfo.content.image && (
                   <img 
-                    src={popupInfo.content.image} 
+                    src={popupInfo.content.thumbnail || popupInfo.content.image} 
                     alt={popupInfo.title} 
                     className="map-popup-image" 
                     onClick={() => {
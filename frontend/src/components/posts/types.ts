@@ -5,6 +5,8 @@ export interface Location {
 
 export interface PostContent {
   description: string;
+  image?: string;
+  thumbnail?: string; // Downscaled copy of image for inline display
 }
 
 export interface Post {
@@ -7,7 +7,8 @@ const API_URL = import.meta.env.VITE_POST_API_URL || '/api/posts';
 export const fetchPosts = async (tag?: string, optionalTags?: string[]): Promise<Post[]> => {
   try {
     let url = API_URL;
-    const params: Record<string, string | string[]> = {};
+    // The map still loads every post at once, ask for the plain array instead of a page
+    const params: Record<string, string | string[]> = { format: 'array' };
     
     if (tag && typeof tag === 'string' && tag.trim() !== '') {
       params.tag = tag.trim();
@@ -25,6 +26,58 @@ export const fetchPosts = async (tag?: string, optionalTags?: string[]): Promise
   }
 };
 
+export interface PostChanges {
+  posts: Post[];
+  deleted: string[];
+  syncToken: string;
+  reset: boolean;
+}
+
+// Posts added, edited and removed since a sync token; without one only a fresh token comes back
+export const fetchChanges = async (since?: string): Promise<PostChanges> => {
+  const params: Record<string, string> = {};
+  if (since) {
+    params.since = since;
+  }
+  const response = await axios.get(`${API_URL}/changes`, { params });
+  return transformKeysToCamel(response.data);
+};
+
+export interface LiveHandlers {
+  onPost: (post: Post) => void;
+  onDelete: (id: string) => void;
+  onReset: () => void;
+  // Event ids are sync tokens, usable with fetchChanges
+  onToken?: (token: string) => void;
+  // The server refused the stream (all its live slots are taken) and the browser gave up; poll fetchChanges instead
+  onUnavailable?: () => void;
+}
+
+// Live post updates over Server-Sent Events; the browser reconnects and resumes by itself. Returns the unsubscribe function.
+// since is the sync token of the posts already loaded (from fetchChanges), so nothing between the load and the connection is missed.
+export const subscribeToPosts = (handlers: LiveHandlers, since?: string): (() => void) => {
+  const url = since ? `${API_URL}/stream?since=${encodeURIComponent(since)}` : `${API_URL}/stream`;
+  const source = new EventSource(url);
+  const listen = (event: string, handle: (data: any) => void) => {
+    source.addEventListener(event, (message: MessageEvent) => {
+      handle(transformKeysToCamel(JSON.parse(message.data)));
+      if (message.lastEventId) {
+        handlers.onToken?.(message.lastEventId);
+      }
+    });
+  };
+  listen('post', handlers.onPost);
+  listen('delete', data => handlers.onDelete(data._id));
+  listen('reset', () => handlers.onReset());
+  source.onerror = () => {
+    // A dropped connection is retried by the browser (readyState CONNECTING); a 503 closes the source for good
+    if (source.readyState === EventSource.CLOSED) {
+      handlers.onUnavailable?.();
+    }
+  };
+  return () => source.close();
+};
+
 export const fetchPostById = async (id: string): Promise<Post> => {
   if (!/^[a-fA-F0-9]{24}$/.test(id)) {
     throw new Error('Invalid ID format');